@@ -1,17 +1,31 @@
-from flask import Flask, request, g
+from flask import Flask
 from flask_cors import CORS
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
 
 from app.extensions import db, migrate, jwt, swagger
 from config import config
 from app.schemas.swagger_definitions import swagger_config, swagger_template
 from app.errors.handlers import register_error_handlers
+from app.services.cache import user_cache, revoked_refresh_tokens
+from app.auth.hashing import password_hasher
+from app.services.catalog import CategoryCatalog
+from app.commands import register_commands
+from app.binds import register_bind_routing
+from app.pool import engine_options
+from app.sqlite_profile import apply_sqlite_profile
+from app.instrumentation import end_jwt_phase, register_instrumentation
+from app.metrics import register_metrics
+from app.profiling import register_profiler
 
-def create_app(config_name='default'):
+def create_app(config_name='default', config_overrides=None):
     app = Flask(__name__)
     CORS(app)
-    app.config.from_object(config[config_name])  
+    app.config.from_object(config[config_name])
+    # Permite a tests y benchmarks apuntar a otra base sin crear una clase nueva
+    app.config.update(config_overrides or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config.get('SQLALCHEMY_DATABASE_URI'),
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+    )
 
     # Swagger UI config
     app.config['SWAGGER'] = {
@@ -25,57 +39,69 @@ def create_app(config_name='default'):
     jwt.init_app(app)
     swagger.init_app(app)
 
-    # DB temporal si se accede desde Swagger
-    @app.before_request
-    def switch_to_swagger_db():
-        if request.headers.get("X-Demo-ModeDespues") == "true":
-            if not hasattr(app, 'swagger_engine'):
-                app.swagger_engine = create_engine('sqlite:///db_swagger.db')
-                app.swagger_session = scoped_session(sessionmaker(bind=app.swagger_engine))
+    user_cache.configure(
+        maxsize=app.config.get('USER_CACHE_MAXSIZE', 10000),
+        ttl=app.config.get('USER_CACHE_TTL', 300)
+    )
+    revoked_refresh_tokens.configure(
+        maxsize=app.config.get('REVOKED_TOKEN_CACHE_MAXSIZE', 100000),
+        ttl=app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 2592000)
+    )
+    password_hasher.configure(app.config)
+    app.extensions['category_catalog'] = CategoryCatalog(
+        refresh_interval=app.config.get('CATEGORY_CATALOG_REFRESH', 30)
+    )
 
-            g.original_session = db.session
-            db.session = app.swagger_session
+    from app.auth.services import (
+        is_token_revoked, on_expired_token, on_invalid_token, on_missing_token,
+        on_revoked_token, on_scope_mismatch, token_matches_scope
+    )
+    jwt.token_in_blocklist_loader(end_jwt_phase(is_token_revoked))
+    jwt.revoked_token_loader(on_revoked_token)
+    # Tokens de demo no valen en la principal ni al revés
+    jwt.token_verification_loader(token_matches_scope)
+    jwt.token_verification_failed_loader(on_scope_mismatch)
+    jwt.unauthorized_loader(on_missing_token)
+    jwt.invalid_token_loader(on_invalid_token)
+    jwt.expired_token_loader(on_expired_token)
 
-    @app.teardown_request
-    def restore_db_session(exception=None):
-        if hasattr(g, 'original_session'):
-            db.session.remove()
-            db.session = g.original_session
+    # Conteo de queries y Server-Timing; antes que el ruteo de bases
+    register_instrumentation(app, jwt)
+    # Latencia por endpoint para /internal/metrics
+    register_metrics(app)
+    # Profiler por muestreo o con X-Profile-Token (sin hooks si está apagado)
+    register_profiler(app)
+    # Access log JSON por una cola (nunca bloquea la request)
+    from app.access_log import register_access_log
+    register_access_log(app)
 
-    @app.after_request
-    def inject_swagger_interceptor(response):
-        if request.path == "/swagger/" and response.content_type.startswith("text/html"):
-            content = response.get_data(as_text=True)
-            interceptor_script = """
-            <script>
-            window.onload = function () {
-                const ui = SwaggerUIBundle({
-                    url: '/apispec.json',
-                    dom_id: '#swagger-ui',
-                    presets: [SwaggerUIBundle.presets.apis],
-                    layout: "BaseLayout",
-                    requestInterceptor: function (req) {
-                        req.headers['X-Demo-Mode'] = 'true';
-                        return req;
-                    }
-                });
-            }
-            </script>
-            """
-            content = content.replace('</body>', interceptor_script + '</body>')
-            response.set_data(content)
-        return response
+    # Requests de Swagger (modo demo) van a su propia base, con su propio pool
+    register_bind_routing(app, db)
+
+    if app.config.get('SQLITE_PROFILE_ENABLED'):
+        with app.app_context():
+            for engine in [db.engine, *app.extensions['db_engines'].values()]:
+                apply_sqlite_profile(engine, app.config)
 
     # Registrar blueprints
     from app.routes.home import home_bp
     from app.routes.subscription import subscription_bp
+    from app.routes.fanout import fanout_bp
     from app.auth.routes import auth_bp
+    from app.routes.internal import internal_bp
 
     app.register_blueprint(subscription_bp, url_prefix='/api')
+    app.register_blueprint(fanout_bp, url_prefix='/api/service')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(internal_bp, url_prefix='/internal')
     app.register_blueprint(home_bp)
 
+    # Spec OpenAPI y Swagger UI servidos desde memoria
+    from app.routes.docs import register_docs_cache
+    register_docs_cache(app)
+
     # Manejadores de errores
     register_error_handlers(app)
+    register_commands(app)
     
     return app
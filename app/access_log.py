@@ -0,0 +1,233 @@
+# app/access_log.py
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request
+from flask_jwt_extended import get_jwt
+
+from app.auth.services import USER_ID_CLAIM
+from app.binds import db_scope
+from app.instrumentation import current_metrics
+from app.metrics import ACCESS_LOG_DROPPED
+from app.services.cache import user_cache
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Ids entrantes aceptados tal cual; cualquier otra cosa se reemplaza
+_valid_request_id = re.compile(r'[A-Za-z0-9._:-]{1,128}')
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloquea al thread de la request.
+
+    Pasado `high_water` (fracción de la cola) se descartan las líneas de
+    nivel menor a WARNING (requests exitosas); con la cola llena se descarta
+    cualquier línea. Los descartes se cuentan en `dropped` y en Prometheus.
+    """
+
+    def __init__(self, log_queue, high_water=0.8):
+        super().__init__(log_queue)
+        self._soft_limit = int(log_queue.maxsize * high_water) if log_queue.maxsize else 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        # El JSON se arma en el thread del listener, no en el de la request
+        return record
+
+    def enqueue(self, record):
+        if self._soft_limit and record.levelno < logging.WARNING \
+                and self.queue.qsize() >= self._soft_limit:
+            self._drop(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop(record)
+
+    def _drop(self, record):
+        self.dropped += 1
+        ACCESS_LOG_DROPPED.labels(logging.getLevelName(record.levelno)).inc()
+
+
+class JsonLinesHandler(logging.Handler):
+    """Escribe un JSON por línea, juntando las líneas en un solo write.
+
+    Corre en el thread del listener: acumula hasta `batch_size` líneas y las
+    baja de una vez, o antes si la cola se vació (ver BatchingQueueListener).
+    """
+
+    def __init__(self, stream, batch_size=100):
+        super().__init__()
+        self.stream = stream
+        self.batch_size = batch_size
+        self._buffer = []
+
+    def format(self, record):
+        return json.dumps({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+                    + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            **record.access
+        }, ensure_ascii=False, separators=(',', ':'))
+
+    def emit(self, record):
+        self._buffer.append(self.format(record))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                self.stream.write('\n'.join(self._buffer) + '\n')
+                self.stream.flush()
+                self._buffer = []
+        except Exception:
+            self._buffer = []
+            self.handleError(None)
+        finally:
+            self.release()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener que baja el buffer de los handlers cuando la cola se vacía."""
+
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+    def stop(self):
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class AccessLog:
+    """Log de acceso en JSON a través de una cola y un thread escritor.
+
+    La request solo arma un LogRecord y lo encola. El listener se crea en el
+    primer uso de cada proceso: con gunicorn y preload los threads del
+    master no sobreviven al fork.
+    """
+
+    def __init__(self, path='-', queue_size=10000, batch_size=100, high_water=0.8):
+        self.path = path
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.high_water = high_water
+        self.handler = None
+        self._listener = None
+        self._stream = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._logger = logging.Logger('news_bot.access')
+        self._logger.propagate = False
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self.path == '-':
+                self._stream = sys.stdout
+            else:
+                self._stream = open(self.path, 'a', encoding='utf-8')
+            log_queue = queue.Queue(maxsize=self.queue_size)
+            self.handler = DroppingQueueHandler(log_queue, self.high_water)
+            self._listener = BatchingQueueListener(
+                log_queue, JsonLinesHandler(self._stream, self.batch_size)
+            )
+            self._listener.start()
+            self._logger.handlers = [self.handler]
+            self._pid = os.getpid()
+
+    def log(self, level, fields):
+        self._ensure_started()
+        self._logger.log(level, 'access', extra={'access': fields})
+
+    def stop(self):
+        """Baja lo pendiente y cierra el thread (al apagar el worker)."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            self._listener.stop()
+            if self._stream is not sys.stdout:
+                self._stream.close()
+            self._pid = None
+
+
+def _level_for(status):
+    if status >= 500:
+        return logging.ERROR
+    if status >= 400:
+        return logging.WARNING
+    return logging.INFO
+
+
+def _user_id():
+    """Id del usuario del JWT verificado en esta request, sin ir a la base."""
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        return None  # la ruta no verificó un JWT
+    user_id = claims.get(USER_ID_CLAIM)
+    if user_id is None and claims.get('sub'):
+        cached = user_cache.get((db_scope(), claims['sub']))
+        user_id = cached.id if cached is not None else None
+    return user_id
+
+
+def register_access_log(app):
+    """Una línea JSON por request si ACCESS_LOG_ENABLED.
+
+    El id de request viene del header X-Request-ID (si es válido) o se
+    genera, y se devuelve en la respuesta. El tiempo en la base sale de la
+    instrumentación (app/instrumentation.py), que se activa con este log.
+    """
+    if not app.config.get('ACCESS_LOG_ENABLED'):
+        return
+
+    access_log = AccessLog(
+        path=app.config.get('ACCESS_LOG_FILE', '-'),
+        queue_size=app.config.get('ACCESS_LOG_QUEUE_SIZE', 10000),
+        batch_size=app.config.get('ACCESS_LOG_BATCH_SIZE', 100),
+        high_water=app.config.get('ACCESS_LOG_HIGH_WATER', 0.8)
+    )
+    app.extensions['access_log'] = access_log
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = incoming if _valid_request_id.fullmatch(incoming) else uuid.uuid4().hex
+        g._access_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        started = g.pop('_access_started', None)
+        if started is None:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        metrics = current_metrics()
+        access_log.log(_level_for(response.status_code), {
+            'request_id': g.request_id,
+            'method': request.method,
+            'path': request.path,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2) if metrics else None,
+            'db_queries': metrics.statements if metrics else None,
+            'user_id': _user_id()
+        })
+        return response
@@ -0,0 +1,170 @@
+# app/asgi.py
+import asyncio
+import io
+import sys
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from flask import request, request_started
+
+from app.async_db import AsyncEngines
+from app.lifecycle import shutdown, warm_up
+from app.routes.async_api import async_bp
+
+ASYNC_PREFIX = '/api/async'
+
+
+class _ThreadedWsgi(WsgiToAsgiInstance):
+    """WsgiToAsgi de asgiref con cada request en un thread del pool del loop.
+
+    El original corre todo el WSGI en un único thread (thread_sensitive),
+    así que las rutas sync se atenderían de a una.
+    """
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.run_wsgi_app.__wrapped__, thread_sensitive=False)
+
+
+class AsgiApp:
+    """Aplicación ASGI: /api/async en el event loop, el resto en la app Flask.
+
+    Las vistas de /api/async (app/routes/async_api.py) se awaitean en el
+    loop del servidor dentro del request context de Flask, así que corren
+    los mismos before/after_request (métricas, access log, ruteo de demo y
+    réplica), los mismos loaders de JWT y los mismos manejadores de errores.
+    Mientras una espera a la base el loop atiende otras requests, con el
+    pool persistente de app/async_db.py. Las demás rutas van a la app WSGI,
+    cada request en un thread. Con sharding no se registran rutas async.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.engines = app.extensions['async_engines'] = AsyncEngines(app)
+        self.async_enabled = not app.config.get('SHARD_DATABASE_URLS')
+        if self.async_enabled:
+            app.register_blueprint(async_bp, url_prefix=ASYNC_PREFIX)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and self.async_enabled and _under(scope['path'], ASYNC_PREFIX):
+            await self._handle(scope, receive, send)
+        else:
+            await _ThreadedWsgi(self.app)(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        # Lo mismo que hace gunicorn.conf.py con warm_up y shutdown
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.to_thread(warm_up, self.app)
+                if self.async_enabled:
+                    await self.engines.warm()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engines.dispose()
+                await asyncio.to_thread(shutdown, self.app)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle(self, scope, receive, send):
+        """Equivalente async de Flask.wsgi_app para una request de /api/async."""
+        body = await _read_body(receive)
+        environ = _environ(scope, body)
+        ctx = self.app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                response = await self._full_dispatch()
+            except Exception as e:
+                error = e
+                response = self.app.handle_exception(e)
+            app_iter, status, headers = response.get_wsgi_response(environ)
+            try:
+                content = b''.join(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+        finally:
+            if error is not None and self.app.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _full_dispatch(self):
+        # Flask.full_dispatch_request, pero la vista se awaitea en este loop
+        # en lugar de pasar por ensure_sync (que abriría un loop nuevo)
+        app = self.app
+        try:
+            request_started.send(app, _async_wrapper=app.ensure_sync)
+            rv = app.preprocess_request()
+            if rv is None:
+                rv = await self._dispatch()
+        except Exception as e:
+            rv = app.handle_user_exception(e)
+        return app.finalize_request(rv)
+
+    async def _dispatch(self):
+        if request.routing_exception is not None:
+            self.app.raise_routing_exception(request)
+        rule = request.url_rule
+        if getattr(rule, 'provide_automatic_options', False) and request.method == 'OPTIONS':
+            return self.app.make_default_options_response()
+        return await self.app.view_functions[rule.endpoint](**request.view_args)
+
+
+def _under(path, prefix):
+    return path == prefix or path.startswith(prefix + '/')
+
+
+def _environ(scope, body):
+    """Environ WSGI de una request ASGI, para armar el request context de Flask."""
+    script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+    path_info = scope['path'].encode('utf8').decode('latin1')
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope.get('query_string', b'').decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin1')
+        # Headers repetidos se unen con coma, como los junta un servidor WSGI
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    # El body ya está leído entero (también si vino chunked, sin Content-Length)
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break  # el cliente se desconectó
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
@@ -0,0 +1,115 @@
+# app/async_db.py
+from contextlib import asynccontextmanager
+
+from flask import current_app, g
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.replica import read_engine
+from app.sqlite_profile import apply_sqlite_profile
+
+# Driver async para cada backend sync
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_url(url):
+    """URL equivalente con driver asyncio (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Backend sin driver async configurado: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+class AsyncEngines:
+    """Engines asyncio de /api/async (ver app/asgi.py), con el mismo ruteo que db.session.
+
+    Hay uno por base (principal, réplica, demo compartida) y cada uno tiene
+    un pool persistente. Las conexiones async quedan atadas al event loop
+    que las abrió: los engines se crean en el loop del servidor ASGI la
+    primera vez que se usan y se cierran en el shutdown (dispose). Los
+    sandboxes de demo son uno por sesión de Swagger, así que esos usan un
+    engine sin pool que se descarta al terminar la request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._engines = {}
+
+    def for_request(self):
+        """(engine, descartable) para la request actual."""
+        from app.extensions import db
+
+        sync_engine = g.get('db_engine')
+        if sync_engine is not None and g.get('sandbox_session'):
+            return create_async_engine(async_url(sync_engine.url), poolclass=NullPool), True
+        if sync_engine is None:
+            sync_engine = read_engine()
+        if sync_engine is None:
+            url = self.app.config.get('ASYNC_DATABASE_URL') or async_url(db.engine.url)
+            return self._get(url), False
+
+        # Los errores de conexión del engine async también marcan la réplica caída
+        router = self.app.extensions.get('replica_router')
+        watch = router if router is not None and sync_engine is router.engine else None
+        return self._get(async_url(sync_engine.url), watch), False
+
+    def _get(self, url, watch=None):
+        url = make_url(url)
+        key = url.render_as_string(hide_password=False)
+        engine = self._engines.get(key)
+        if engine is None:
+            # Sin awaits de por medio: dos corrutinas del mismo loop no pueden crear el mismo
+            engine = self._engines[key] = self._create(url)
+            if watch is not None:
+                watch.watch(engine.sync_engine)
+        return engine
+
+    def _create(self, url):
+        config = self.app.config
+        if _is_memory_sqlite(url):
+            engine = create_async_engine(url)
+        else:
+            engine = create_async_engine(
+                url,
+                pool_size=config.get('ASYNC_POOL_SIZE', 10),
+                max_overflow=config.get('ASYNC_POOL_MAX_OVERFLOW', 10),
+                pool_recycle=1800,
+                pool_pre_ping=True
+            )
+        if config.get('SQLITE_PROFILE_ENABLED'):
+            apply_sqlite_profile(engine.sync_engine, config)
+        return engine
+
+    async def warm(self):
+        """Abre la primera conexión del engine de la principal (ver lifecycle.warm_up)."""
+        with self.app.app_context():
+            engine, _ = self.for_request()
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    async def dispose(self):
+        engines, self._engines = self._engines, {}
+        for engine in engines.values():
+            await engine.dispose()
+
+
+@asynccontextmanager
+async def async_session():
+    """Sesión async para una request: `async with async_session() as session:`."""
+    engine, disposable = current_app.extensions['async_engines'].for_request()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        if disposable:
+            await engine.dispose()
@@ -0,0 +1,64 @@
+# app/auth/async_services.py
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.auth.hashing import password_hasher
+from app.auth.services import AuthService
+from app.binds import db_scope
+from app.errors.exceptions import ValidationError, AuthError
+from app.services.cache import user_cache
+from .models import User
+
+
+class AsyncAuthService:
+    """Versión asyncio de AuthService (registro, login y emisión de tokens).
+
+    Cada método recibe la AsyncSession de la request. El hashing de
+    contraseñas es CPU: corre en un thread (y de ahí, si está configurado,
+    en el pool de procesos) para no frenar el event loop.
+    """
+
+    @classmethod
+    async def register_user(cls, session, phone_number, password):
+        exists = (await session.execute(
+            select(User.id).where(User.phone_number == phone_number)
+        )).first()
+        if exists:
+            raise ValidationError("El número está registrado")
+
+        user = User(phone_number=phone_number)
+        user.password_hash = await asyncio.to_thread(password_hasher.hash, password)
+        session.add(user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Otro registro concurrente con el mismo número ganó la carrera
+            await session.rollback()
+            raise ValidationError("El número está registrado")
+        user_cache.invalidate((db_scope(), phone_number))
+
+        return user
+
+    @staticmethod
+    async def authenticate_user(session, phone_number, password):
+        user = (await session.execute(
+            select(User).where(User.phone_number == phone_number)
+        )).scalar_one_or_none()
+        if not user or not await asyncio.to_thread(password_hasher.verify, user.password_hash, password):
+            raise AuthError("Credenciales inválidas")
+
+        # Migra de forma transparente hashes con parámetros viejos
+        if user.needs_rehash():
+            user.password_hash = await asyncio.to_thread(password_hasher.hash, password)
+            await session.commit()
+        return user
+
+    @staticmethod
+    async def issue_tokens(session, user):
+        """Access token + refresh token persistido, como AuthService.issue_tokens."""
+        refresh_token, row = AuthService.build_refresh_token(user)
+        session.add(row)
+        await session.commit()
+        return AuthService.issue_access_token(user), refresh_token
@@ -0,0 +1,25 @@
+# app/auth/decorators.py
+import hmac
+from functools import wraps
+
+from flask import current_app, request
+
+from app.errors.exceptions import AuthError
+
+SERVICE_KEY_HEADER = "X-Service-Key"
+
+
+def service_key_required(fn):
+    """Protege endpoints internos usados por los workers del bot.
+
+    El header X-Service-Key debe coincidir con SERVICE_API_KEY. Si la clave
+    no está configurada, el endpoint queda cerrado.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get("SERVICE_API_KEY")
+        provided = request.headers.get(SERVICE_KEY_HEADER, "")
+        if not expected or not hmac.compare_digest(provided, expected):
+            raise AuthError("Clave de servicio inválida")
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,119 @@
+# app/auth/hashing.py
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app.errors.exceptions import ServiceUnavailableError
+from app.metrics import PASSWORD_HASH_LATENCY
+
+# El default de werkzeug ("scrypt:32768:8:1"): los hashes existentes no se
+# recalculan salvo que se configure otra política
+DEFAULT_ALGORITHM = "scrypt"
+DEFAULT_ITERATIONS = 32768
+
+
+def build_method(algorithm, iterations):
+    """Arma el string de método que entiende werkzeug.
+
+    pbkdf2:<hash> usa iterations como cantidad de iteraciones y scrypt lo usa
+    como factor de costo N (r=8, p=1).
+    """
+    if algorithm.startswith("pbkdf2"):
+        return f"{algorithm}:{iterations}"
+    if algorithm == "scrypt":
+        return f"scrypt:{iterations}:8:1"
+    raise ValueError(f"Algoritmo de hash no soportado: {algorithm}")
+
+
+# Funciones de módulo para que se puedan serializar hacia el pool de procesos
+def _generate(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+def _ping():
+    return True
+
+
+class PasswordHasher:
+    """Política de hashing de contraseñas configurable desde Config.
+
+    Con PASSWORD_HASH_POOL_SIZE > 0 el cálculo corre en un pool de procesos
+    acotado: el thread de la request espera sin ocupar CPU del worker y como
+    mucho PASSWORD_HASH_MAX_PENDING hashes quedan en cola. Si la cola está
+    llena se responde 503 en lugar de frenar al resto de la API.
+    """
+
+    def __init__(self):
+        self.method = build_method(DEFAULT_ALGORITHM, DEFAULT_ITERATIONS)
+        self.pool_size = 0
+        self.max_pending = 32
+        self.queue_timeout = 5.0
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.shutdown()
+        self.method = build_method(
+            config.get("PASSWORD_HASH_ALGORITHM", DEFAULT_ALGORITHM),
+            config.get("PASSWORD_HASH_ITERATIONS", DEFAULT_ITERATIONS)
+        )
+        self.pool_size = config.get("PASSWORD_HASH_POOL_SIZE", 0)
+        self.max_pending = config.get("PASSWORD_HASH_MAX_PENDING", 32)
+        self.queue_timeout = config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5.0)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def hash(self, password):
+        with PASSWORD_HASH_LATENCY.labels("hash").time():
+            return self._run(_generate, password, self.method)
+
+    def verify(self, pwhash, password):
+        with PASSWORD_HASH_LATENCY.labels("verify").time():
+            return self._run(_check, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True si el hash guardado usa parámetros distintos a la política actual."""
+        return pwhash.split("$", 1)[0] != self.method
+
+    def warm(self):
+        """Levanta los procesos del pool antes del primer login."""
+        if self.pool_size > 0:
+            executor = self._get_executor()
+            for future in [executor.submit(_ping) for _ in range(self.pool_size)]:
+                future.result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _run(self, fn, *args):
+        if self.pool_size <= 0:
+            return fn(*args)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise ServiceUnavailableError("Demasiados logins en curso, reintente en unos segundos")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        # Se crea en el primer uso para que cada worker (post-fork) tenga el suyo
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+
+password_hasher = PasswordHasher()
@@ -1,13 +1,24 @@
 # app/auth/models.py
-from werkzeug.security import generate_password_hash, check_password_hash
+from collections import namedtuple
+
+from sqlalchemy import event
+from app.binds import db_scope
 from app.extensions import db
+from app.auth.hashing import password_hasher
+from app.services.cache import user_cache
+
+# Referencia liviana a un usuario: alcanza para consultar por user_id sin
+# tener un objeto ORM atado a una sesión (se puede cachear entre requests)
+UserRef = namedtuple('UserRef', ['id', 'phone_number'])
 
 class User(db.Model):
     __tablename__ = 'users'
 
     id = db.Column(db.Integer, primary_key=True)
     phone_number = db.Column(db.String(20), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    # Se incrementa en cada cambio de suscripciones (ETag de GET /subscriptions)
+    subscriptions_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     subscriptions = db.relationship(
         'Subscription', 
@@ -16,7 +27,30 @@ class User(db.Model):
         cascade='all, delete-orphan')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+    def to_ref(self):
+        return UserRef(self.id, self.phone_number)
+
+
+class RefreshToken(db.Model):
+    """Refresh tokens emitidos, para rotarlos y detectar reutilización."""
+    __tablename__ = 'refresh_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Los vencidos se borran con `flask tokens prune`
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked = db.Column(db.Boolean, nullable=False, default=False)
+    replaced_by = db.Column(db.String(36), nullable=True)
+
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_user_cache(mapper, connection, target):
+    user_cache.invalidate((db_scope(), target.phone_number))
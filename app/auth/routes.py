@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import jwt_required, get_jwt
 from marshmallow import ValidationError as MarshmallowValidationError
 
 from app.auth.services import AuthService
 from app.auth.schemas import RegisterSchema, LoginSchema
-from app.errors.exceptions import ValidationError, AuthError
+from app.errors.exceptions import ValidationError, AuthError, ServiceUnavailableError
+from app.instrumentation import phase
 
 auth_bp = Blueprint('auth', __name__)
 register_schema = RegisterSchema()
@@ -34,6 +35,9 @@ def register():
                 access_token:
                   type: string
                   example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
+                refresh_token:
+                  type: string
+                  example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
                 user:
                   type: object
                   properties:
@@ -54,15 +58,16 @@ def register():
               $ref: '#/components/schemas/Error'
     """
     try:
-        data = register_schema.load(request.get_json())
+        with phase('validation'):
+            data = register_schema.load(request.get_json())
         user = AuthService.register_user(
             data['phone_number'],
             data['password']
         )
-
-        access_token = create_access_token(identity=user.phone_number)
+        access_token, refresh_token = AuthService.issue_tokens(user)
         return jsonify({
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "user": {
                 "phone_number": user.phone_number
             }
@@ -70,7 +75,7 @@ def register():
 
     except MarshmallowValidationError as err:
         raise ValidationError("Datos inválidos", payload=err.messages)
-    except ValidationError as e:
+    except (ValidationError, ServiceUnavailableError) as e:
         return jsonify(e.to_dict()), e.status_code
     except Exception:
         return jsonify({
@@ -105,6 +110,9 @@ def login():
                 access_token:
                   type: string
                   example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
+                refresh_token:
+                  type: string
+                  example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
                 user:
                   type: object
                   properties:
@@ -124,15 +132,17 @@ def login():
               $ref: '#/components/schemas/Error'
     """
     try:
-        data = login_schema.load(request.get_json())
+        with phase('validation'):
+            data = login_schema.load(request.get_json())
         user = AuthService.authenticate_user(
             data['phone_number'],
             data['password']
         )
 
-        access_token = create_access_token(identity=user.phone_number)
+        access_token, refresh_token = AuthService.issue_tokens(user)
         return jsonify({
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "user": {
                 "phone_number": user.phone_number
             }
@@ -140,7 +150,7 @@ def login():
 
     except MarshmallowValidationError as err:
         raise ValidationError("Datos inválidos", payload=err.messages)
-    except AuthError as e:
+    except (AuthError, ServiceUnavailableError) as e:
         return jsonify(e.to_dict()), e.status_code
     except Exception:
         return jsonify({
@@ -150,3 +160,54 @@ def login():
                 "details": {}
             }
         }), 500
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Renovar el access token
+    ---
+    tags:
+      - Autenticación
+    security:
+      - BearerAuth: []
+    summary: Canjea un refresh token por un access token y un refresh token nuevos
+    description: El refresh token usado queda revocado (rotación); volver a usarlo revoca todos los refresh tokens del usuario.
+    responses:
+      200:
+        description: Tokens renovados
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                access_token:
+                  type: string
+                  example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
+                refresh_token:
+                  type: string
+                  example: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
+      401:
+        description: Refresh token inválido o revocado
+        content:
+          application/json:
+            schema:
+              $ref: '#/components/schemas/Error'
+    """
+    try:
+        access_token, refresh_token = AuthService.rotate_refresh_token(get_jwt())
+        return jsonify({
+            "access_token": access_token,
+            "refresh_token": refresh_token
+        }), 200
+
+    except AuthError as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error": {
+                "type": "AuthenticationError",
+                "message": "Error renovando el token",
+                "details": {}
+            }
+        }), 500
@@ -1,11 +1,26 @@
 # app/auth/services.py
+from datetime import datetime, timezone
+
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from sqlalchemy import delete, update
+
+from app.binds import PRIMARY_SCOPE, db_scope
 from app.extensions import db
 from app.errors.exceptions import ValidationError, AuthError
-from .models import User
+from app.services.cache import user_cache, revoked_refresh_tokens
+from app.sharding import get_shards, route_to_shard
+from .models import User, UserRef, RefreshToken
+
+# Claim con el id numérico del usuario en los tokens nuevos
+USER_ID_CLAIM = "uid"
+# Claim con la base que emitió el token (ver app.binds.db_scope)
+ENV_CLAIM = "env"
 
 class AuthService:
     @classmethod
     def register_user(cls, phone_number, password):
+        route_to_shard(phone_number)
         user = User.query.filter_by(phone_number=phone_number).first()
         if user:
             raise ValidationError("El número está registrado")
@@ -16,12 +31,183 @@ class AuthService:
 
         db.session.add(user)
         db.session.commit()
+        user_cache.invalidate((db_scope(), phone_number))
 
         return user
 
     @staticmethod
     def authenticate_user(phone_number, password):
+        route_to_shard(phone_number)
         user = User.query.filter_by(phone_number=phone_number).first()
         if not user or not user.check_password(password):
             raise AuthError("Credenciales inválidas")
+
+        # Migra de forma transparente hashes con parámetros viejos
+        if user.needs_rehash():
+            user.set_password(password)
+            db.session.commit()
         return user
+
+    @staticmethod
+    def issue_access_token(user):
+        """Genera el access token del usuario.
+
+        La identidad sigue siendo el teléfono, así que los tokens viejos (sin
+        "uid") siguen funcionando. Con JWT_USER_ID_CLAIM activo se agrega el
+        id numérico, que tiene que coincidir con el del usuario. El claim
+        "env" ata el token a la base en la que se emitió (principal o demo).
+        """
+        claims = {ENV_CLAIM: db_scope()}
+        if current_app.config.get('JWT_USER_ID_CLAIM'):
+            claims[USER_ID_CLAIM] = user.id
+        return create_access_token(identity=user.phone_number, additional_claims=claims)
+
+    @classmethod
+    def issue_tokens(cls, user):
+        """Access token + refresh token persistido para poder rotarlo."""
+        refresh_token, _ = cls._create_refresh_token(user)
+        db.session.commit()
+        return cls.issue_access_token(user), refresh_token
+
+    @classmethod
+    def rotate_refresh_token(cls, claims):
+        """Canjea un refresh token por un access token y un refresh token nuevos.
+
+        No vuelve a verificar la contraseña. El token usado queda revocado de
+        forma atómica (UPDATE condicionado a revoked = false); si ya estaba
+        revocado es una reutilización y se revocan todos los del usuario.
+        """
+        route_to_shard(claims["sub"])
+        token = db.session.get(RefreshToken, claims["jti"])
+        if token is None:
+            raise AuthError("Refresh token inválido")
+        if token.revoked:
+            cls.revoke_refresh_tokens(token.user_id)
+            raise AuthError("Refresh token revocado")
+
+        user = UserRef(token.user_id, claims["sub"])
+        new_refresh_token, new_jti = cls._create_refresh_token(user)
+
+        rotated = db.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == token.jti, RefreshToken.revoked.is_(False))
+            .values(revoked=True, replaced_by=new_jti)
+        ).rowcount
+
+        if not rotated:
+            db.session.rollback()
+            cls.revoke_refresh_tokens(token.user_id)
+            raise AuthError("Refresh token revocado")
+
+        db.session.commit()
+        revoked_refresh_tokens.set(token.jti, True)
+        return cls.issue_access_token(user), new_refresh_token
+
+    @staticmethod
+    def revoke_refresh_tokens(user_id):
+        jtis = db.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+            .values(revoked=True)
+            .returning(RefreshToken.jti)
+        ).scalars().all()
+        db.session.commit()
+        for jti in jtis:
+            revoked_refresh_tokens.set(jti, True)
+
+    @staticmethod
+    def prune_refresh_tokens(now=None):
+        """Borra los refresh tokens vencidos, en todos los shards.
+
+        Un token vencido ya no pasa la verificación del JWT, así que su fila
+        no hace falta ni para rotarlo ni para detectar una reutilización.
+        Devuelve cuántos se borraron.
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        stmt = delete(RefreshToken).where(RefreshToken.expires_at < now)
+        shards = get_shards()
+        if shards is None:
+            deleted = db.session.execute(stmt).rowcount
+            db.session.commit()
+            return deleted
+
+        deleted = 0
+        for engine in shards.engines:
+            with engine.begin() as conn:
+                deleted += conn.execute(stmt).rowcount
+        return deleted
+
+    @staticmethod
+    def build_refresh_token(user):
+        """Refresh token nuevo y la fila RefreshToken que lo registra (sin persistir)."""
+        token = create_refresh_token(identity=user.phone_number, additional_claims={ENV_CLAIM: db_scope()})
+        claims = decode_token(token)
+        return token, RefreshToken(
+            jti=claims["jti"],
+            user_id=user.id,
+            expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc).replace(tzinfo=None)
+        )
+
+    @classmethod
+    def _create_refresh_token(cls, user):
+        token, row = cls.build_refresh_token(user)
+        db.session.add(row)
+        return token, row.jti
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """Callback de blocklist de flask-jwt-extended.
+
+    Corre en todas las requests autenticadas, así que solo mira la cache en
+    memoria: los access tokens nunca se revocan y para los refresh tokens la
+    verificación definitiva es el UPDATE atómico de rotate_refresh_token.
+    """
+    if jwt_payload.get("type") != "refresh":
+        return False
+    return revoked_refresh_tokens.get(jwt_payload["jti"], False)
+
+
+def on_revoked_token(jwt_header, jwt_payload):
+    """Respuesta para tokens rechazados por is_token_revoked.
+
+    Presentar un refresh token ya rotado es señal de robo: se revocan todos
+    los refresh tokens del usuario. Esto solo corre ante una reutilización.
+    """
+    route_to_shard(jwt_payload["sub"])
+    token = db.session.get(RefreshToken, jwt_payload["jti"])
+    if token is not None:
+        AuthService.revoke_refresh_tokens(token.user_id)
+    error = AuthError("Refresh token revocado")
+    return jsonify(error.to_dict()), error.status_code
+
+
+def token_matches_scope(jwt_header, jwt_payload):
+    """Callback de verificación de flask-jwt-extended.
+
+    Un token solo vale en la base que lo emitió: la identidad es el teléfono,
+    y el mismo teléfono puede estar registrado en la demo por cualquiera. Los
+    tokens sin claim "env" (emitidos antes) valen solo en la principal.
+    """
+    return jwt_payload.get(ENV_CLAIM, PRIMARY_SCOPE) == db_scope()
+
+
+def on_scope_mismatch(jwt_header, jwt_payload):
+    error = AuthError("Token emitido para otro entorno")
+    return jsonify(error.to_dict()), error.status_code
+
+
+# Rechazos propios de flask-jwt-extended, con la misma forma que AuthError
+# para que se cuenten en api_errors como cualquier otro error de la API
+def on_missing_token(reason):
+    error = AuthError("Falta el token de acceso")
+    return jsonify(error.to_dict()), error.status_code
+
+
+def on_invalid_token(reason):
+    error = AuthError("Token inválido")
+    return jsonify(error.to_dict()), error.status_code
+
+
+def on_expired_token(jwt_header, jwt_payload):
+    error = AuthError("Token expirado")
+    return jsonify(error.to_dict()), error.status_code
@@ -0,0 +1,150 @@
+# app/binds.py
+import threading
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, select
+
+from app.pool import InstrumentedQueuePool
+from app.replica import REPLICA_BIND, read_engine, register_replica_routing
+from app.sharding import ShardSet
+
+DEMO_BIND = 'demo'
+# Valores de db_scope() para la principal y la base de demo compartida
+PRIMARY_SCOPE = 'prod'
+DEMO_SCOPE = 'demo'
+
+
+class RoutingSession(Session):
+    """Sesión que elige el engine por request.
+
+    db.session ya es una sesión distinta por app context (una por request),
+    así que alcanza con que cada request deje en `g.db_engine` el engine que
+    le toca: no se muta nada global y los threads no se pisan entre sí.
+    Si no hay uno fijado se usa el shard del usuario (app/sharding.py) y, en
+    lecturas, la réplica (app/replica.py).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            engine = g.get('db_engine') or g.get('shard_engine') or read_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def db_scope():
+    """Base de datos de los datos de usuario de la request actual.
+
+    Los tokens llevan este valor en el claim "env" y solo valen en esa base,
+    y las caches por teléfono lo usan en la clave: el mismo teléfono es otro
+    usuario (con otro id) en la demo.
+    """
+    if not has_request_context():
+        return PRIMARY_SCOPE
+    return g.get('db_scope', PRIMARY_SCOPE)
+
+
+def get_engine(name):
+    """Engine de un destino de ruteo (demo, etc.) de la app actual."""
+    return current_app.extensions['db_engines'][name]
+
+
+def create_pooled_engine(url, pool_size=5, max_overflow=5, pre_ping=True):
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=1800,
+        pool_pre_ping=pre_ping
+    )
+
+
+class _DemoSchema:
+    """Crea las tablas de la base de demo la primera vez que se usa."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = set()
+
+    def ensure(self, db, engine):
+        if engine.url in self._ready:
+            return
+        with self._lock:
+            if engine.url in self._ready:
+                return
+            copy_schema(db, engine)
+            self._ready.add(engine.url)
+
+
+def copy_schema(db, engine):
+    """Crea las tablas en `engine` y copia el catálogo de categorías de la
+    base principal con los mismos ids (la cache de categorías es una sola)."""
+    from app.models import Category
+
+    db.metadata.create_all(engine)
+    categories = db.session.execute(
+        select(Category.id, Category.name),
+        bind_arguments={'bind': db.engine}
+    ).all()
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(Category.id)).scalars())
+        missing = [{'id': c.id, 'name': c.name} for c in categories if c.id not in existing]
+        if missing:
+            conn.execute(Category.__table__.insert(), missing)
+
+
+demo_schema = _DemoSchema()
+
+
+def register_bind_routing(app, db):
+    engines = app.extensions.setdefault('db_engines', {})
+
+    shard_urls = app.config.get('SHARD_DATABASE_URLS') or []
+    if shard_urls:
+        # users, subscriptions y refresh_tokens repartidos por hash del teléfono
+        shard_engines = []
+        for index, url in enumerate(shard_urls):
+            engines[f'shard{index}'] = create_pooled_engine(
+                url,
+                pool_size=app.config.get('SHARD_POOL_SIZE', 5),
+                max_overflow=app.config.get('SHARD_POOL_MAX_OVERFLOW', 5)
+            )
+            shard_engines.append(engines[f'shard{index}'])
+        app.extensions['shards'] = ShardSet(shard_engines)
+
+    if app.config.get('REPLICA_DATABASE_URL'):
+        # Lecturas (GET) a la réplica; la demo, si aplica, tiene prioridad
+        engines[REPLICA_BIND] = create_pooled_engine(
+            app.config['REPLICA_DATABASE_URL'],
+            pool_size=app.config.get('REPLICA_POOL_SIZE', 5),
+            max_overflow=app.config.get('REPLICA_POOL_MAX_OVERFLOW', 5),
+            # Sin ping por checkout: los errores de conexión marcan la réplica caída
+            pre_ping=False
+        )
+        register_replica_routing(app, engines[REPLICA_BIND])
+
+    if not app.config.get('DEMO_MODE_ENABLED'):
+        return
+
+    header = app.config.get('DEMO_MODE_HEADER', 'X-Demo-Mode')
+    if app.config.get('DEMO_SANDBOX_ENABLED'):
+        # Un sandbox por sesión de Swagger en lugar de una base compartida
+        from app.sandbox import register_sandbox_routing
+        register_sandbox_routing(app, db, header)
+        return
+
+    engines[DEMO_BIND] = create_pooled_engine(
+        app.config['DEMO_DATABASE_URL'],
+        pool_size=app.config.get('DEMO_POOL_SIZE', 5),
+        max_overflow=app.config.get('DEMO_POOL_MAX_OVERFLOW', 5)
+    )
+
+    @app.before_request
+    def route_demo_requests():
+        if request.headers.get(header) == 'true':
+            engine = engines[DEMO_BIND]
+            demo_schema.ensure(db, engine)
+            g.db_engine = engine
+            g.db_scope = DEMO_SCOPE
@@ -0,0 +1,174 @@
+# app/commands.py
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.auth.services import AuthService
+from app.extensions import db
+
+from app.schemas.subscription_schema import VALID_CATEGORIES
+from app.services.catalog import get_catalog, seed_categories
+from app.binds import copy_schema
+from app.profiling import SORT_KEYS, ProfileStore, sign_token
+from app.replica import refresh_sqlite_replica
+from app.sharding import get_shards
+from app.sqlite_profile import analyze, checkpoint, is_file_sqlite
+
+categories_cli = AppGroup('categories', help='Administración del catálogo de categorías.')
+sqlite_cli = AppGroup('sqlite', help='Mantenimiento de la base SQLite.')
+replica_cli = AppGroup('replica', help='Réplica de lectura.')
+shards_cli = AppGroup('shards', help='Shards de usuarios y suscripciones.')
+profiles_cli = AppGroup('profiles', help='Perfiles de requests (cProfile).')
+tokens_cli = AppGroup('tokens', help='Refresh tokens.')
+
+
+def _sync_shards():
+    """Copia el esquema y el catálogo de categorías a cada shard."""
+    shards = get_shards()
+    for engine in (shards.engines if shards else []):
+        copy_schema(db, engine)
+
+
+@categories_cli.command('seed')
+def seed_categories_command():
+    """Carga las categorías iniciales que falten."""
+    seed_categories(VALID_CATEGORIES)
+    _sync_shards()
+    click.echo(f"Categorías: {', '.join(sorted(get_catalog().names()))}")
+
+
+@categories_cli.command('add')
+@click.argument('name')
+def add_category_command(name):
+    """Agrega una categoría nueva (los workers la ven en el próximo refresh)."""
+    seed_categories([name])
+    _sync_shards()
+    click.echo(f"Categoría agregada: {name}")
+
+
+@categories_cli.command('list')
+def list_categories_command():
+    for name in sorted(get_catalog().names()):
+        click.echo(name)
+
+
+def _sqlite_engine():
+    if not is_file_sqlite(db.engine):
+        raise click.ClickException("La base configurada no es un archivo SQLite")
+    return db.engine
+
+
+@sqlite_cli.command('checkpoint')
+def checkpoint_command():
+    """Pasa el WAL a la base y lo trunca."""
+    busy, log_pages, copied = checkpoint(_sqlite_engine())
+    click.echo(f"Checkpoint: {copied}/{log_pages} páginas copiadas{' (base ocupada)' if busy else ''}")
+
+
+@sqlite_cli.command('analyze')
+def analyze_command():
+    """Actualiza las estadísticas del planner (ANALYZE + PRAGMA optimize)."""
+    analyze(_sqlite_engine())
+    click.echo("Estadísticas actualizadas")
+
+
+@sqlite_cli.command('maintain')
+@click.option('--interval', type=int, default=0,
+              help='Segundos entre corridas; 0 corre una sola vez.')
+def maintain_command(interval):
+    """Checkpoint + ANALYZE, una vez o cada --interval segundos."""
+    engine = _sqlite_engine()
+    while True:
+        busy, log_pages, copied = checkpoint(engine)
+        analyze(engine)
+        click.echo(f"Mantenimiento: checkpoint {copied}/{log_pages} páginas, ANALYZE ok")
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+@replica_cli.command('refresh')
+@click.option('--interval', type=int, default=0,
+              help='Segundos entre copias; 0 copia una sola vez.')
+def refresh_replica_command(interval):
+    """Copia la base principal sobre la réplica (solo SQLite, para desarrollo)."""
+    replica_url = current_app.config.get('REPLICA_DATABASE_URL')
+    if not replica_url:
+        raise click.ClickException("REPLICA_DATABASE_URL no está configurada")
+    while True:
+        try:
+            size = refresh_sqlite_replica(db.engine.url, replica_url)
+        except ValueError as err:
+            raise click.ClickException(str(err))
+        click.echo(f"Réplica actualizada ({size} bytes)")
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+@shards_cli.command('init')
+def init_shards_command():
+    """Crea las tablas en cada shard y copia el catálogo de categorías."""
+    shards = get_shards()
+    if shards is None:
+        raise click.ClickException("SHARD_DATABASE_URLS no está configurada")
+    _sync_shards()
+    click.echo(f"{len(shards)} shards listos")
+
+
+@shards_cli.command('locate')
+@click.argument('phone_number')
+def locate_shard_command(phone_number):
+    """Muestra en qué shard vive un teléfono."""
+    shards = get_shards()
+    if shards is None:
+        raise click.ClickException("SHARD_DATABASE_URLS no está configurada")
+    index = shards.index_for(phone_number)
+    click.echo(f"{phone_number}: shard {index} ({shards.engines[index].url.render_as_string(hide_password=True)})")
+
+
+@profiles_cli.command('report')
+@click.option('--top', type=int, default=20, help='Cantidad de funciones a mostrar.')
+@click.option('--sort', type=click.Choice(SORT_KEYS), default='cumulative')
+@click.option('--endpoint', default=None, help='Solo perfiles de este endpoint (ej. auth.login).')
+def profiles_report_command(top, sort, endpoint):
+    """Hotspots sumando los perfiles guardados en PROFILER_DIR."""
+    store = ProfileStore(current_app.config['PROFILER_DIR'])
+    report, count = store.report(top=top, sort=sort, endpoint=endpoint)
+    if report is None:
+        raise click.ClickException(f"No hay perfiles en {store.directory}")
+    click.echo(f"{count} perfiles")
+    click.echo(report)
+
+
+@profiles_cli.command('token')
+@click.option('--ttl', type=int, default=300, help='Segundos de validez del token.')
+def profiles_token_command(ttl):
+    """Genera un valor para el header X-Profile-Token."""
+    secret = current_app.config.get('PROFILER_SECRET')
+    if not secret:
+        raise click.ClickException("PROFILER_SECRET no está configurada")
+    click.echo(sign_token(secret, int(time.time()) + ttl))
+
+
+@tokens_cli.command('prune')
+@click.option('--interval', type=int, default=0,
+              help='Segundos entre corridas; 0 corre una sola vez.')
+def prune_tokens_command(interval):
+    """Borra los refresh tokens vencidos."""
+    while True:
+        click.echo(f"Refresh tokens vencidos borrados: {AuthService.prune_refresh_tokens()}")
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+def register_commands(app):
+    app.cli.add_command(categories_cli)
+    app.cli.add_command(sqlite_cli)
+    app.cli.add_command(replica_cli)
+    app.cli.add_command(shards_cli)
+    app.cli.add_command(profiles_cli)
+    app.cli.add_command(tokens_cli)
@@ -33,3 +33,9 @@ class AuthError(APIError):
     """Raised for authentication/authorization failures"""
     def __init__(self, message="No autorizado", payload=None):
         super().__init__(message, status_code=401, payload=payload)
+
+# Error cuando el servidor no puede atender la operación en este momento
+class ServiceUnavailableError(APIError):
+    """Raised when a bounded resource (e.g. the hashing pool) is saturated"""
+    def __init__(self, message="Servicio no disponible", payload=None):
+        super().__init__(message, status_code=503, payload=payload)
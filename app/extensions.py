@@ -3,9 +3,10 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flasgger import Swagger
 from app.schemas.swagger_definitions import swagger_template
+from app.binds import RoutingSession
 
 jwt = JWTManager()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 # swagger = Swagger()
 swagger = Swagger(template=swagger_template)
\ No newline at end of file
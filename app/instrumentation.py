@@ -0,0 +1,174 @@
+# app/instrumentation.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended.config import config as jwt_config
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DB_QUERIES_HEADER = 'X-DB-Queries'
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Sentencias SQL, tiempo en la base y fases de una request.
+
+    Las fases se acumulan por nombre (una request puede validar o serializar
+    más de una vez). Los tiempos se guardan en segundos.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.statements = 0
+        self.db_time = 0.0
+        self.phases = {}
+        self._open = {}
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def start_phase(self, name):
+        self._open[name] = self._clock()
+
+    def end_phase(self, name):
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.add_phase(name, self._clock() - started)
+
+    def elapsed(self):
+        return self._clock() - self.started
+
+    def server_timing(self):
+        """Valor del header Server-Timing (duraciones en milisegundos)."""
+        entries = [f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"']
+        entries += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.phases.items()]
+        entries.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def current_metrics():
+    """Métricas de la request en curso, o None si la instrumentación está apagada."""
+    return _current.get()
+
+
+@contextmanager
+def phase(name):
+    """Mide el bloque como la fase `name` de la request actual (si se mide)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = conn.info.get('query_started')
+    if metrics is None or not started:
+        return
+    metrics.statements += 1
+    metrics.db_time += time.perf_counter() - started.pop()
+
+
+def _listen_engines():
+    # A nivel clase para cubrir también demo, shards y réplica; fuera de
+    # una request medida los listeners no hacen nada
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class InstrumentedJSONProvider(DefaultJSONProvider):
+    """Provider de JSON que mide la serialización de jsonify como fase."""
+
+    def dumps(self, obj, **kwargs):
+        with phase('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def timed_decode_key(jwt_header, jwt_payload):
+    """decode_key_loader que abre la fase "jwt" justo antes de verificar la firma."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.start_phase('jwt')
+    return jwt_config.decode_key
+
+
+def end_jwt_phase(callback):
+    """Envuelve el callback de blocklist, que corre apenas se decodificó el token."""
+
+    def wrapper(jwt_header, jwt_payload):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.end_phase('jwt')
+        return callback(jwt_header, jwt_payload)
+
+    return wrapper
+
+
+def register_instrumentation(app, jwt):
+    """Cuenta sentencias y mide fases por request si REQUEST_METRICS_ENABLED.
+
+    ACCESS_LOG_ENABLED también activa la medición (sin los headers). Se lee
+    la config en cada request para poder prenderla en tests sin recrear la
+    app. Debe registrarse antes que los demás before_request para que el
+    total incluya el ruteo de bases.
+    """
+    _listen_engines()
+    app.json = InstrumentedJSONProvider(app)
+    jwt.decode_key_loader(timed_decode_key)
+
+    @app.before_request
+    def start_request_metrics():
+        # El access log también usa el tiempo en la base, sin los headers
+        if app.config.get('REQUEST_METRICS_ENABLED') or app.config.get('ACCESS_LOG_ENABLED'):
+            g._request_metrics_token = _current.set(RequestMetrics())
+
+    @app.after_request
+    def add_timing_headers(response):
+        metrics = _current.get()
+        if metrics is not None and app.config.get('REQUEST_METRICS_ENABLED'):
+            response.headers[DB_QUERIES_HEADER] = str(metrics.statements)
+            response.headers[SERVER_TIMING_HEADER] = metrics.server_timing()
+        return response
+
+    @app.teardown_request
+    def stop_request_metrics(exc):
+        token = g.pop('_request_metrics_token', None)
+        if token is not None:
+            _current.reset(token)
+
+
+def db_query_count(response):
+    """Cantidad de sentencias SQL que informó la respuesta (header X-DB-Queries)."""
+    value = response.headers.get(DB_QUERIES_HEADER)
+    if value is None:
+        raise AssertionError(f"La respuesta no trae {DB_QUERIES_HEADER}: ¿REQUEST_METRICS_ENABLED?")
+    return int(value)
+
+
+def parse_server_timing(header):
+    """{nombre: milisegundos} de un header Server-Timing."""
+    timings = {}
+    for entry in header.split(','):
+        name, *params = [part.strip() for part in entry.split(';')]
+        for param in params:
+            key, _, value = param.partition('=')
+            if key == 'dur':
+                timings[name] = float(value)
+    return timings
@@ -0,0 +1,60 @@
+# app/lifecycle.py
+from sqlalchemy import text
+
+from app.extensions import db
+from app.auth.hashing import password_hasher
+from app.services.catalog import get_catalog
+
+
+def all_engines(app):
+    """Engine principal más los registrados por request (modo demo)."""
+    with app.app_context():
+        return [db.engine, *app.extensions.get('db_engines', {}).values()]
+
+
+def warm_up(app):
+    """Deja el worker listo antes de aceptar tráfico.
+
+    Abre una conexión por engine (pool), carga el catálogo de categorías,
+    arma el spec de Swagger, levanta el pool de hashing y, con sandboxes de
+    demo, arma el template y arranca su barrido. Al terminar marca la app
+    como lista para /internal/ready.
+    """
+    from app.routes.docs import warm_docs_cache
+
+    for engine in all_engines(app):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    with app.app_context():
+        get_catalog().names()
+    warm_docs_cache(app)
+    password_hasher.warm()
+    sandbox_pool = app.extensions.get('sandbox_pool')
+    if sandbox_pool is not None:
+        sandbox_pool.warm(app, db)
+
+    app.extensions['ready'] = True
+
+
+def dispose_engines(app, close=True):
+    """Descarta las conexiones de los pools.
+
+    Después de un fork se usa close=False: las conexiones heredadas del
+    proceso padre no se cierran (siguen siendo suyas), solo se olvidan.
+    """
+    for engine in all_engines(app):
+        engine.dispose(close=close)
+
+
+def shutdown(app):
+    """Libera recursos al apagar el worker."""
+    app.extensions['ready'] = False
+    sandbox_pool = app.extensions.get('sandbox_pool')
+    if sandbox_pool is not None:
+        sandbox_pool.stop()
+    password_hasher.shutdown()
+    access_log = app.extensions.get('access_log')
+    if access_log is not None:
+        access_log.stop()
+    dispose_engines(app)
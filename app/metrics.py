@@ -0,0 +1,171 @@
+# app/metrics.py
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+from app.extensions import db
+from app.pool import pool_stats
+from app.services.cache import revoked_refresh_tokens, user_cache
+
+# Con esta variable (la setea gunicorn.conf.py) cada worker escribe sus
+# métricas en archivos mmap de ese directorio y /internal/metrics suma todos
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+UNMATCHED_ENDPOINT = '<unmatched>'
+# Respuestas de error sin error_type en el cuerpo
+UNTYPED_ERROR = '<untyped>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latencia de las requests por endpoint',
+    ['endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    'http_requests', 'Requests atendidas por endpoint y status',
+    ['endpoint', 'method', 'status']
+)
+API_ERRORS = Counter(
+    'api_errors', 'Respuestas con status >= 400 por error_type (APIError y handlers genéricos)',
+    ['error_type']
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    'password_hash_duration_seconds', 'Duración del hashing de contraseñas, con la espera en cola',
+    ['operation'], buckets=HASH_BUCKETS
+)
+ACCESS_LOG_DROPPED = Counter(
+    'access_log_dropped', 'Líneas del access log descartadas (cola pasada del high-water o llena)',
+    ['level']
+)
+# Gauges por proceso; livesum suma los workers vivos
+POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Conexiones del pool por estado',
+    ['engine', 'state'], multiprocess_mode='livesum'
+)
+POOL_CHECKOUTS = Gauge(
+    'db_pool_checkouts', 'Checkouts acumulados desde que arrancó el worker',
+    ['engine'], multiprocess_mode='livesum'
+)
+POOL_TIMEOUTS = Gauge(
+    'db_pool_timeouts', 'Timeouts esperando una conexión desde que arrancó el worker',
+    ['engine'], multiprocess_mode='livesum'
+)
+POOL_WAIT = Gauge(
+    'db_pool_wait_seconds', 'Segundos esperando una conexión desde que arrancó el worker',
+    ['engine'], multiprocess_mode='livesum'
+)
+CACHE_HITS = Gauge(
+    'cache_hits', 'Aciertos de la cache desde que arrancó el worker',
+    ['cache'], multiprocess_mode='livesum'
+)
+CACHE_MISSES = Gauge(
+    'cache_misses', 'Fallos de la cache desde que arrancó el worker',
+    ['cache'], multiprocess_mode='livesum'
+)
+CACHE_EVICTIONS = Gauge(
+    'cache_evictions', 'Entradas desalojadas por tamaño desde que arrancó el worker',
+    ['cache'], multiprocess_mode='livesum'
+)
+CACHE_ENTRIES = Gauge(
+    'cache_entries', 'Entradas en la cache',
+    ['cache'], multiprocess_mode='livesum'
+)
+
+
+def error_type_of(response):
+    """error_type del cuerpo de una respuesta de error.
+
+    APIError responde {"error": {"type": ...}} y los handlers genéricos y las
+    rutas {"error_type": ...}. Solo se lee el cuerpo de respuestas JSON no
+    streameadas.
+    """
+    if not response.is_json or response.is_streamed:
+        return UNTYPED_ERROR
+    body = response.get_json(silent=True)
+    if not isinstance(body, dict):
+        return UNTYPED_ERROR
+    error = body.get('error')
+    if isinstance(error, dict) and error.get('type'):
+        return str(error['type'])
+    return str(body.get('error_type') or UNTYPED_ERROR)
+
+
+def update_pool_gauges(engines):
+    """Copia pool_stats de cada engine (solo QueuePool) a los gauges."""
+    for name, engine in engines.items():
+        stats = pool_stats(engine)
+        if 'checkouts' not in stats:
+            continue
+        for state in ('checked_out', 'checked_in', 'overflow'):
+            POOL_CONNECTIONS.labels(name, state).set(stats[state])
+        POOL_CHECKOUTS.labels(name).set(stats['checkouts'])
+        POOL_TIMEOUTS.labels(name).set(stats['timeouts'])
+        POOL_WAIT.labels(name).set(stats['wait_seconds_total'])
+
+
+def update_cache_gauges(caches):
+    """Copia los contadores de cada LRUTTLCache a los gauges."""
+    for name, cache in caches.items():
+        stats = cache.stats()
+        CACHE_HITS.labels(name).set(stats['hits'])
+        CACHE_MISSES.labels(name).set(stats['misses'])
+        CACHE_EVICTIONS.labels(name).set(stats['evictions'])
+        CACHE_ENTRIES.labels(name).set(stats['size'])
+
+
+def render_metrics():
+    """(body, content_type) en formato de texto de Prometheus."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def register_metrics(app):
+    """Mide latencia y status de cada request si METRICS_ENABLED.
+
+    Por request solo se observa un histograma y un contador (sin locks
+    compartidos entre workers: cada proceso escribe su propio archivo). Los
+    errores se cuentan acá, desde la respuesta: las rutas devuelven sus
+    propios errores sin pasar por los handlers de app/errors. Los
+    gauges del pool y de las caches se refrescan como mucho cada
+    METRICS_POOL_INTERVAL segundos por worker.
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    interval = app.config.get('METRICS_POOL_INTERVAL', 5)
+    state = {'pool_updated': 0.0}
+
+    @app.before_request
+    def start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        if response.status_code >= 400:
+            API_ERRORS.labels(error_type_of(response)).inc()
+
+        now = time.monotonic()
+        if now - state['pool_updated'] >= interval:
+            state['pool_updated'] = now
+            refresh_gauges(app)
+        return response
+
+
+def refresh_gauges(app):
+    update_pool_gauges({'primary': db.engine, **app.extensions.get('db_engines', {})})
+    update_cache_gauges({'users': user_cache, 'revoked_refresh_tokens': revoked_refresh_tokens})
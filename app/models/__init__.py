@@ -1,4 +1,5 @@
+from .category import Category
 from .subscription import Subscription
-from ..auth.models import User
+from ..auth.models import User, RefreshToken
 
-__all__ = ['Subscription', 'User']
\ No newline at end of file
+__all__ = ['Category', 'Subscription', 'User', 'RefreshToken']
\ No newline at end of file
@@ -0,0 +1,9 @@
+from app.extensions import db
+
+
+class Category(db.Model):
+    __tablename__ = 'categories'
+
+    # SMALLINT en PostgreSQL; en SQLite tiene que ser INTEGER para autoincrementar
+    id = db.Column(db.SmallInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
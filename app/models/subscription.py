@@ -1,12 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.ext.hybrid import hybrid_property
+
 from app.extensions import db
+from app.models.category import Category
+from app.services import catalog
 
 class Subscription(db.Model):
     __tablename__ = 'subscriptions'
     
     id = db.Column(db.Integer, primary_key=True)
-    category = db.Column(db.String(50), nullable=False)
+    category_id = db.Column(db.SmallInteger, db.ForeignKey('categories.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     __table_args__ = (
-        db.UniqueConstraint('user_id', 'category', name='unique_user_category'),
-    )
\ No newline at end of file
+        db.UniqueConstraint('user_id', 'category_id', name='unique_user_category'),
+        # Fan-out por categoría: cada página es un rango (category_id, id > x)
+        # del índice, ya ordenado (ver SubscriptionService.iter_subscribers)
+        db.Index('ix_subscriptions_category_id_id', 'category_id', 'id'),
+    )
+
+    # El nombre de la categoría se resuelve con el catálogo en memoria; en
+    # consultas ORM (filter_by(category=...)) se usa una subconsulta
+    @hybrid_property
+    def category(self):
+        return catalog.get_catalog().name_for(self.category_id)
+
+    @category.inplace.setter
+    def _category_setter(self, name):
+        self.category_id = catalog.get_catalog().id_for(name)
+
+    @category.inplace.expression
+    @classmethod
+    def _category_expression(cls):
+        return select(Category.name).where(Category.id == cls.category_id).scalar_subquery()
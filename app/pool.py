@@ -0,0 +1,85 @@
+# app/pool.py
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Opciones que solo tienen sentido con un pool de conexiones (QueuePool)
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto esperan las requests por una conexión.
+
+    Además del estado del pool (en uso, overflow) acumula checkouts, tiempo
+    de espera total y máximo, y timeouts. Una espera alta con overflow al
+    máximo indica que el pool es más chico que los threads del worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def stats(self):
+        with self._stats_lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size(),
+                'checked_in': self.checkedin(),
+                'checked_out': self.checkedout(),
+                'overflow': max(self.overflow(), 0),
+                'max_overflow': self._max_overflow,
+                'timeout': self.timeout(),
+                'checkouts': checkouts,
+                'timeouts': self._timeouts,
+                'wait_seconds_total': round(self._wait_total, 6),
+                'wait_seconds_max': round(self._wait_max, 6),
+                'wait_seconds_avg': round(self._wait_total / checkouts, 6) if checkouts else 0.0
+            }
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    # StaticPool / SingletonThreadPool (SQLite en memoria): no hay nada que medir
+    return {'pool': type(pool).__name__, 'status': pool.status()}
+
+
+def engine_options(url, options):
+    """Completa SQLALCHEMY_ENGINE_OPTIONS con el pool instrumentado.
+
+    SQLite en memoria usa un StaticPool (una sola conexión), así que ahí se
+    descartan las opciones de tamaño del pool en lugar de romper el arranque.
+    """
+    options = dict(options or {})
+    parsed = make_url(url) if url else None
+    if parsed is not None and parsed.get_backend_name() == 'sqlite' \
+            and parsed.database in (None, '', ':memory:'):
+        for key in QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+        return options
+
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    return options
@@ -0,0 +1,132 @@
+# app/profiling.py
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import time
+
+from flask import g, request
+
+PROFILE_SUFFIX = '.prof'
+PROFILE_TOKEN_HEADER = 'X-Profile-Token'
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+_unsafe = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def sign_token(secret, expires):
+    """Token para el header X-Profile-Token: "<expira>.<hmac>"."""
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_token(secret, token, now=None):
+    """True si el token lo firmó `secret` y todavía no venció."""
+    if not secret or not token:
+        return False
+    expires, _, _ = token.partition('.')
+    if not expires.isdigit():
+        return False
+    if int(expires) < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(sign_token(secret, int(expires)), token)
+
+
+class ProfileStore:
+    """Directorio de perfiles con rotación por cantidad de archivos.
+
+    Cada archivo se llama <timestamp>_<endpoint>_<ms>ms_<pid>.prof, así varios
+    workers pueden escribir en el mismo directorio y el orden por nombre es
+    el orden temporal. Al pasar de `max_files` se borran los más viejos.
+    """
+
+    def __init__(self, directory, max_files=200):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, profile, endpoint, seconds):
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}.{int(now % 1 * 1e6):06d}"
+        name = f"{stamp}_{_unsafe.sub('_', endpoint)}_{seconds * 1000:.0f}ms_{os.getpid()}{PROFILE_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path)
+        self.rotate()
+        return path
+
+    def files(self, endpoint=None):
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name) for name in names
+            if name.endswith(PROFILE_SUFFIX) and (endpoint is None or f"_{endpoint}_" in name)
+        ]
+
+    def rotate(self):
+        files = self.files()
+        for path in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # otro worker ya lo borró
+
+    def report(self, top=20, sort='cumulative', endpoint=None):
+        """Top-N de funciones sumando todos los perfiles guardados (texto de pstats)."""
+        files = self.files(endpoint)
+        if not files:
+            return None, 0
+        stream = io.StringIO()
+        stats = pstats.Stats(*files, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+        return stream.getvalue(), len(files)
+
+
+def register_profiler(app):
+    """Perfila con cProfile una fracción de las requests si PROFILER_ENABLED.
+
+    Se perfila una request al azar con probabilidad PROFILER_SAMPLE_RATE, o
+    cualquier request con un X-Profile-Token válido (firmado con
+    PROFILER_SECRET, ver `flask profiles token`). Apagado no registra hooks.
+    """
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    store = ProfileStore(app.config['PROFILER_DIR'], app.config.get('PROFILER_MAX_FILES', 200))
+    sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0.0)
+    secret = app.config.get('PROFILER_SECRET')
+    app.extensions['profile_store'] = store
+
+    @app.before_request
+    def start_profile():
+        token = request.headers.get(PROFILE_TOKEN_HEADER)
+        if not (token and verify_token(secret, token)) and random.random() >= sample_rate:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return  # ya hay otro profiler activo en este proceso
+        g._profile = (profile, time.perf_counter())
+
+    @app.after_request
+    def save_profile(response):
+        started = g.pop('_profile', None)
+        if started is None:
+            return response
+        profile, start = started
+        profile.disable()
+        store.save(profile, request.endpoint or 'unmatched', time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # Si after_request no corrió (excepción sin manejar) se apaga igual
+        started = g.pop('_profile', None)
+        if started is not None:
+            started[0].disable()
@@ -0,0 +1,168 @@
+# app/replica.py
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_BIND = 'replica'
+READ_METHODS = frozenset({'GET', 'HEAD'})
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# Momento de la última escritura del cliente, en milisegundos desde epoch
+LAST_WRITE_HEADER = 'X-Last-Write'
+LAST_WRITE_COOKIE = 'last_write'
+
+
+class ReplicaRouter:
+    """Decide si una request lee de la réplica o de la principal.
+
+    Solo GET/HEAD van a la réplica, y no si el cliente escribió hace menos
+    de `sticky_seconds` (read-your-writes: la réplica puede estar atrasada).
+    El momento de la última escritura lo guarda el cliente (cookie o header
+    X-Last-Write, ver register_replica_routing), así vale para cualquier
+    worker. Si la réplica falla se marca caída por `retry_seconds` y las
+    lecturas vuelven a la principal; solo mientras no se sabe si responde
+    (al arrancar o al cumplirse el reintento) se prueba con una conexión.
+    """
+
+    def __init__(self, engine, sticky_seconds=5, retry_seconds=30, clock=time.time):
+        self.engine = engine
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._down_until = 0.0
+        self._verified = False
+        self._lock = threading.Lock()
+        self.watch(engine)
+
+    def watch(self, engine):
+        """Marca la réplica caída también ante errores de conexión de `engine`
+        (otro engine sobre la misma base, como el async de app/async_db.py)."""
+        event.listen(engine, 'handle_error', self._on_error)
+
+    @property
+    def available(self):
+        return self._clock() >= self._down_until
+
+    def mark_down(self):
+        with self._lock:
+            self._down_until = self._clock() + self.retry_seconds
+            self._verified = False
+
+    def stamp(self):
+        """Valor de X-Last-Write para una escritura de ahora."""
+        return str(int(self._clock() * 1000))
+
+    def wrote_recently(self, last_write):
+        """True si `last_write` (epoch en segundos) cae dentro de la ventana."""
+        if last_write is None:
+            return False
+        now = self._clock()
+        # Un valor en el futuro no es una escritura real: se ignora
+        return now - self.sticky_seconds < last_write <= now + 1
+
+    def engine_for_read(self, last_write=None):
+        """La réplica si corresponde y responde; None para usar la principal."""
+        if not self.available or self.wrote_recently(last_write):
+            return None
+        if not self._verified and not self._probe():
+            return None
+        return self.engine
+
+    def _probe(self):
+        try:
+            # La conexión vuelve al pool y la reusa la sesión
+            with self.engine.connect():
+                pass
+        except DBAPIError:
+            self.mark_down()
+            return False
+        self._verified = True
+        return True
+
+    def _on_error(self, context):
+        # Errores de conexión (al abrirla o caída): las próximas lecturas van a la principal
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+
+def _last_write():
+    """Última escritura que informó el cliente (header o cookie), o None."""
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return int(value) / 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def read_engine():
+    """Engine de lectura de la request actual (se decide una vez por request)."""
+    if not has_request_context():
+        return None
+    if '_read_engine' not in g:
+        router = current_app.extensions.get('replica_router')
+        engine = None
+        if router is not None and request.method in READ_METHODS:
+            engine = router.engine_for_read(_last_write())
+        g._read_engine = engine
+    return g._read_engine
+
+
+def register_replica_routing(app, engine):
+    router = ReplicaRouter(
+        engine,
+        sticky_seconds=app.config.get('REPLICA_STICKY_SECONDS', 5),
+        retry_seconds=app.config.get('REPLICA_RETRY_SECONDS', 30)
+    )
+    app.extensions['replica_router'] = router
+
+    @app.after_request
+    def mark_writer(response):
+        # El cliente devuelve el momento de la escritura (la cookie sola, o el
+        # header a mano): con varios workers cualquiera puede atender la lectura
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            last_write = router.stamp()
+            response.headers[LAST_WRITE_HEADER] = last_write
+            response.set_cookie(
+                LAST_WRITE_COOKIE, last_write,
+                max_age=router.sticky_seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+    return router
+
+
+def sqlite_file(url):
+    """Ruta del archivo de una URL SQLite (acepta la forma file:...?mode=ro&uri=true)."""
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    path = url.database
+    if url.query.get('uri') and path.startswith('file:'):
+        path = path[len('file:'):]
+    return path
+
+
+def refresh_sqlite_replica(primary_url, replica_url):
+    """Copia la base principal sobre la réplica con la API de backup de SQLite.
+
+    La copia se escribe dentro del archivo de la réplica (no lo reemplaza),
+    así los workers que ya tienen conexiones abiertas ven los datos nuevos.
+    """
+    source_path, target_path = sqlite_file(primary_url), sqlite_file(replica_url)
+    if source_path is None or target_path is None:
+        raise ValueError('La principal y la réplica tienen que ser archivos SQLite')
+
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return os.path.getsize(target_path)
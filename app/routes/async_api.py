@@ -0,0 +1,225 @@
+# app/routes/async_api.py
+from functools import wraps
+
+from flask import Blueprint, request, jsonify, make_response
+from flask_jwt_extended import verify_jwt_in_request
+from marshmallow import ValidationError as MarshmallowValidationError
+
+from app.async_db import async_session
+from app.auth.async_services import AsyncAuthService
+from app.auth.schemas import RegisterSchema, LoginSchema
+from app.errors.exceptions import ValidationError, NotFoundError, AuthError, ServiceUnavailableError
+from app.instrumentation import phase
+from app.routes.subscription import _subscriptions_etag
+from app.services.async_subscription import AsyncSubscriptionService
+from app.services.subscription import SubscriptionService
+
+# Mismas rutas y respuestas que /api/auth y /api/subscriptions, como vistas
+# async sobre el engine asyncio. Solo las registra el entrypoint ASGI
+# (app/asgi.py), que las corre en el event loop del servidor
+async_bp = Blueprint('async_api', __name__)
+register_schema = RegisterSchema()
+login_schema = LoginSchema()
+
+
+def async_jwt_required(fn):
+    """jwt_required() para vistas async.
+
+    El de flask-jwt-extended llama a la vista con ensure_sync, que abre un
+    event loop nuevo: acá la vista ya corre dentro del loop del servidor.
+    """
+    @wraps(fn)
+    async def decorator(*args, **kwargs):
+        verify_jwt_in_request()
+        return await fn(*args, **kwargs)
+
+    return decorator
+
+
+def _auth_response(user, access_token, refresh_token, status):
+    return jsonify({
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "user": {
+            "phone_number": user.phone_number
+        }
+    }), status
+
+
+@async_bp.route('/auth/register', methods=['POST'])
+async def register():
+    """Registro de nuevo usuario (async)."""
+    try:
+        with phase('validation'):
+            data = register_schema.load(request.get_json())
+        async with async_session() as session:
+            user = await AsyncAuthService.register_user(session, data['phone_number'], data['password'])
+            access_token, refresh_token = await AsyncAuthService.issue_tokens(session, user)
+        return _auth_response(user, access_token, refresh_token, 201)
+
+    except MarshmallowValidationError as err:
+        raise ValidationError("Datos inválidos", payload=err.messages)
+    except (ValidationError, ServiceUnavailableError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error": {
+                "type": "AuthenticationError",
+                "message": "Error en el registro",
+                "details": {}
+            }
+        }), 500
+
+
+@async_bp.route('/auth/login', methods=['POST'])
+async def login():
+    """Login de usuario (async)."""
+    try:
+        with phase('validation'):
+            data = login_schema.load(request.get_json())
+        async with async_session() as session:
+            user = await AsyncAuthService.authenticate_user(session, data['phone_number'], data['password'])
+            access_token, refresh_token = await AsyncAuthService.issue_tokens(session, user)
+        return _auth_response(user, access_token, refresh_token, 200)
+
+    except MarshmallowValidationError as err:
+        raise ValidationError("Datos inválidos", payload=err.messages)
+    except (AuthError, ServiceUnavailableError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error": {
+                "type": "AuthenticationError",
+                "message": "Error en el login",
+                "details": {}
+            }
+        }), 500
+
+
+@async_bp.route('/subscriptions', methods=['POST'])
+@async_jwt_required
+async def create_subscription():
+    """Crear suscripciones (async)."""
+    try:
+        data = request.get_json()
+        async with async_session() as session:
+            user = await AsyncSubscriptionService.get_current_user(session)
+            subscriptions = await AsyncSubscriptionService.create_subscription(session, user, data['categories'])
+
+        return jsonify([{
+            'category': sub.category
+        } for sub in subscriptions]), 201
+
+    except (ValidationError, NotFoundError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "CreateSubscriptionError",
+            "message": "Error creando suscripciones"
+        }), 500
+
+
+@async_bp.route('/subscriptions', methods=['GET'])
+@async_jwt_required
+async def get_subscriptions():
+    """Obtener suscripciones del usuario (async, con ETag)."""
+    try:
+        async with async_session() as session:
+            user = await AsyncSubscriptionService.get_current_user(session)
+
+            if request.if_none_match:
+                version = await AsyncSubscriptionService.get_subscriptions_version(session, user)
+                if request.if_none_match.contains_weak(_subscriptions_etag(user, version)):
+                    response = make_response('', 304)
+                    response.set_etag(_subscriptions_etag(user, version))
+                    return response
+
+            version, subscriptions = await AsyncSubscriptionService.get_subscriptions_with_version(session, user)
+
+        response = jsonify([{
+            'category': sub.category
+        } for sub in subscriptions])
+        response.set_etag(_subscriptions_etag(user, version))
+        return response, 200
+
+    except NotFoundError as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "GetSubscriptionsError",
+            "message": "Error obteniendo suscripciones"
+        }), 500
+
+
+@async_bp.route('/subscriptions', methods=['PUT'])
+@async_jwt_required
+async def update_subscriptions():
+    """Reemplazar las suscripciones del usuario (async)."""
+    try:
+        data = request.get_json()
+        async with async_session() as session:
+            user = await AsyncSubscriptionService.get_current_user(session)
+            updated_subs, changed = await AsyncSubscriptionService.sync_subscriptions(
+                session, user, data['categories']
+            )
+
+        response = jsonify([{'category': sub.category} for sub in updated_subs])
+        response.headers['X-Subscriptions-Changed'] = 'true' if changed else 'false'
+        return response, 200
+
+    except (ValidationError, NotFoundError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "UpdateSubscriptionsError",
+            "message": "Error actualizando suscripciones"
+        }), 500
+
+
+@async_bp.route('/subscriptions', methods=['PATCH'])
+@async_jwt_required
+async def patch_subscriptions():
+    """Agregar y quitar categorías en una sola operación (async)."""
+    try:
+        # Un body inválido es 400 sin ir a buscar al usuario
+        changes = SubscriptionService.validate_changes(request.get_json())
+        async with async_session() as session:
+            user = await AsyncSubscriptionService.get_current_user(session)
+            result = await AsyncSubscriptionService.apply_changes(session, user, changes)
+
+        return jsonify({
+            'added': result['added'],
+            'removed': result['removed'],
+            'subscriptions': [{'category': sub.category} for sub in result['subscriptions']]
+        }), 200
+
+    except (ValidationError, NotFoundError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "PatchSubscriptionsError",
+            "message": "Error modificando suscripciones"
+        }), 500
+
+
+@async_bp.route('/subscriptions/<string:category>', methods=['DELETE'])
+@async_jwt_required
+async def delete_subscription(category):
+    """Eliminar una suscripción por categoría (async)."""
+    try:
+        async with async_session() as session:
+            user = await AsyncSubscriptionService.get_current_user(session)
+            await AsyncSubscriptionService.delete_subscription(session, user, category)
+
+        return jsonify({
+            "message": "Suscripción eliminada exitosamente",
+            "category": category
+        }), 200
+
+    except NotFoundError as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "DeleteSubscriptionError",
+            "message": "Error eliminando suscripción"
+        }), 500
@@ -0,0 +1,101 @@
+# app/routes/docs.py
+import gzip
+import hashlib
+import threading
+from functools import wraps
+
+from flask import Response, current_app, request
+
+# Fuerza el header de modo demo en todas las requests hechas desde Swagger UI
+SWAGGER_INTERCEPTOR_SCRIPT = """
+            <script>
+            window.onload = function () {
+                const ui = SwaggerUIBundle({
+                    url: '/apispec.json',
+                    dom_id: '#swagger-ui',
+                    presets: [SwaggerUIBundle.presets.apis],
+                    layout: "BaseLayout",
+                    requestInterceptor: function (req) {
+                        req.headers['X-Demo-Mode'] = 'true';
+                        return req;
+                    }
+                });
+            }
+            </script>
+            """
+
+# Endpoints de flasgger que se sirven desde memoria
+SPEC_ENDPOINT = 'flasgger.apispec'
+UI_ENDPOINT = 'flasgger.apidocs'
+
+
+class CachedDocument:
+    """Respuesta precalculada: cuerpo, versión gzip y ETag fuerte."""
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9)
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+
+    def to_response(self, max_age):
+        if request.if_none_match.contains_weak(self.etag):
+            response = Response(status=304)
+        elif 'gzip' in request.accept_encodings:
+            response = Response(self.gzipped, mimetype=self.mimetype)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(self.body, mimetype=self.mimetype)
+
+        response.set_etag(self.etag)
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def _patch_swagger_ui(html):
+    return html.replace('</body>', SWAGGER_INTERCEPTOR_SCRIPT + '</body>')
+
+
+def _cached_view(view, transform=None):
+    """Envuelve una vista de flasgger: la primera request arma el documento
+    (parseo de docstrings, render del template) y las siguientes lo sirven
+    desde memoria."""
+    lock = threading.Lock()
+    cache = {}
+
+    def build():
+        response = current_app.make_response(view())
+        body = response.get_data(as_text=True)
+        if transform is not None:
+            body = transform(body)
+        return CachedDocument(body.encode('utf-8'), response.mimetype)
+
+    def get_document():
+        document = cache.get('document')
+        if document is None:
+            with lock:
+                document = cache.get('document')
+                if document is None:
+                    document = cache['document'] = build()
+        return document
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return get_document().to_response(current_app.config.get('DOCS_CACHE_MAX_AGE', 300))
+
+    wrapper.build = get_document
+    return wrapper
+
+
+def register_docs_cache(app):
+    app.view_functions[SPEC_ENDPOINT] = _cached_view(app.view_functions[SPEC_ENDPOINT])
+    app.view_functions[UI_ENDPOINT] = _cached_view(app.view_functions[UI_ENDPOINT], _patch_swagger_ui)
+
+
+def warm_docs_cache(app):
+    """Arma el spec y la página de Swagger antes de recibir tráfico."""
+    specs_route = app.config['SWAGGER'].get('specs_route', '/apidocs/')
+    for endpoint, path in ((SPEC_ENDPOINT, '/apispec.json'), (UI_ENDPOINT, specs_route)):
+        with app.test_request_context(path):
+            app.view_functions[endpoint].build()
@@ -0,0 +1,115 @@
+# app/routes/fanout.py
+import json
+
+from flask import Blueprint, Response, current_app, request, stream_with_context
+
+from app.auth.decorators import service_key_required
+from app.errors.exceptions import ValidationError
+from app.services.subscription import SubscriptionService
+
+fanout_bp = Blueprint('fanout', __name__)
+
+
+def _requested_categories():
+    """Acepta ?category=a&category=b y también ?category=a,b"""
+    categories = []
+    for value in request.args.getlist('category'):
+        categories.extend(c.strip() for c in value.split(',') if c.strip())
+    if not categories:
+        raise ValidationError("Debe indicar al menos una categoría")
+    return list(dict.fromkeys(categories))
+
+
+@fanout_bp.route('/subscribers', methods=['GET'])
+@service_key_required
+def stream_subscribers():
+    """
+    Streaming de suscriptores por categoría (NDJSON)
+    ---
+    tags:
+      - Servicio
+    security:
+      - ServiceKey: []
+    summary: Devuelve una línea JSON por suscripción de las categorías pedidas
+    parameters:
+      - name: category
+        in: query
+        required: true
+        schema:
+          type: array
+          items:
+            type: string
+            enum: ["deportes", "tecnología", "economía", "cultura"]
+        style: form
+        explode: true
+        description: Categorías a consultar (repetible o separadas por coma)
+      - name: after_id
+        in: query
+        required: false
+        schema:
+          type: integer
+          default: 0
+        description: Reanuda el stream a partir del último id recibido
+      - name: after_shard
+        in: query
+        required: false
+        schema:
+          type: integer
+        description: Con sharding, el shard de la última fila recibida (junto con after_id)
+    responses:
+      200:
+        description: Stream NDJSON ordenado por id de suscripción
+        content:
+          application/x-ndjson:
+            schema:
+              type: object
+              properties:
+                id:
+                  type: integer
+                  example: 1042
+                category:
+                  type: string
+                  example: deportes
+                phone_number:
+                  type: string
+                  example: +549123456789
+                shard:
+                  type: integer
+                  example: 2
+                  description: Solo con sharding
+      400:
+        description: Categorías inválidas
+        content:
+          application/json:
+            schema:
+              $ref: '#/components/schemas/Error'
+      401:
+        description: Clave de servicio inválida
+    """
+    categories = _requested_categories()
+    after_id = request.args.get('after_id', 0, type=int)
+    after_shard = request.args.get('after_shard', type=int)
+    batch_size = current_app.config.get('FANOUT_BATCH_SIZE', 1000)
+
+    # Validamos antes de empezar a streamear para poder responder 400
+    SubscriptionService.validate_categories(categories)
+    rows = SubscriptionService.iter_subscribers(
+        categories, batch_size, after_id, after_shard,
+        prefetch=current_app.config.get('FANOUT_SHARD_PREFETCH', 2)
+    )
+
+    def generate():
+        for row in rows:
+            item = {
+                "id": row.id,
+                "category": row.category,
+                "phone_number": row.phone_number
+            }
+            if row.shard is not None:
+                item["shard"] = row.shard
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson'
+    )
@@ -0,0 +1,52 @@
+# app/routes/internal.py
+from flask import Blueprint, Response, current_app, jsonify
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.auth.decorators import service_key_required
+from app.errors.exceptions import NotFoundError
+from app.extensions import db
+from app.metrics import refresh_gauges, render_metrics
+from app.pool import pool_stats
+
+internal_bp = Blueprint('internal', __name__)
+
+
+@internal_bp.route('/live', methods=['GET'])
+def live():
+    """El proceso responde (liveness)."""
+    return jsonify({"status": "ok"}), 200
+
+
+@internal_bp.route('/ready', methods=['GET'])
+def ready():
+    """El worker terminó el warm-up y llega a la base principal (readiness)."""
+    if not current_app.extensions.get('ready'):
+        return jsonify({"status": "starting"}), 503
+
+    try:
+        # Un GET iría a la réplica: se pregunta explícitamente a la principal
+        db.session.execute(text('SELECT 1'), bind_arguments={'bind': db.engine})
+    except SQLAlchemyError:
+        return jsonify({"status": "database unavailable"}), 503
+
+    return jsonify({"status": "ready"}), 200
+
+
+@internal_bp.route('/pool', methods=['GET'])
+@service_key_required
+def pool():
+    """Estado de los pools de conexiones de este worker."""
+    engines = {'primary': db.engine, **current_app.extensions.get('db_engines', {})}
+    return jsonify({name: pool_stats(engine) for name, engine in engines.items()}), 200
+
+
+@internal_bp.route('/metrics', methods=['GET'])
+@service_key_required
+def metrics():
+    """Métricas en formato Prometheus, sumadas entre workers bajo gunicorn."""
+    if not current_app.config.get('METRICS_ENABLED'):
+        raise NotFoundError("Métricas deshabilitadas")
+    refresh_gauges(current_app)
+    body, content_type = render_metrics()
+    return Response(body, mimetype=content_type)
@@ -1,11 +1,15 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, make_response
+from flask_jwt_extended import jwt_required
 from app.services.subscription import SubscriptionService
 from app.errors.exceptions import ValidationError, NotFoundError
-from app.schemas.subscription_schema import VALID_CATEGORIES
+from app.services.catalog import get_catalog
 
 subscription_bp = Blueprint('subscription', __name__)
 
+
+def _subscriptions_etag(user, version):
+    return f"{user.id}-{version}"
+
 @subscription_bp.route('/subscriptions', methods=['POST'])
 @jwt_required()
 def create_subscription():
@@ -46,10 +50,8 @@ def create_subscription():
         description: Error inesperado del servidor
     """
     try:
-        current_phone = get_jwt_identity()
         data = request.get_json()
-
-        user = SubscriptionService.get_user_by_phone(current_phone)
+        user = SubscriptionService.get_current_user()
         subscriptions = SubscriptionService.create_subscription(user, data['categories'])
 
         return jsonify([{
@@ -78,6 +80,11 @@ def get_subscriptions():
     responses:
       200:
         description: Lista de suscripciones activas
+        headers:
+          ETag:
+            description: Versión de las suscripciones del usuario
+            schema:
+              type: string
         content:
           application/json:
             schema:
@@ -88,18 +95,31 @@ def get_subscriptions():
                   category:
                     type: string
                     example: cultura
+      304:
+        description: Sin cambios desde el ETag enviado en If-None-Match
       404:
         description: Usuario no encontrado
       500:
         description: Error inesperado del servidor
     """
     try:
-        current_phone = get_jwt_identity()
-        user = SubscriptionService.get_user_by_phone(current_phone)
+        user = SubscriptionService.get_current_user()
 
-        return jsonify([{
+        # Los clientes que hacen polling mandan el ETag anterior: si la versión
+        # no cambió respondemos 304 sin leer las suscripciones
+        if request.if_none_match:
+            version = SubscriptionService.get_subscriptions_version(user)
+            if request.if_none_match.contains_weak(_subscriptions_etag(user, version)):
+                response = make_response('', 304)
+                response.set_etag(_subscriptions_etag(user, version))
+                return response
+
+        version, subscriptions = SubscriptionService.get_subscriptions_with_version(user)
+        response = jsonify([{
             'category': sub.category
-        } for sub in user.subscriptions]), 200
+        } for sub in subscriptions])
+        response.set_etag(_subscriptions_etag(user, version))
+        return response, 200
 
     except NotFoundError as e:
         return jsonify(e.to_dict()), e.status_code
@@ -129,6 +149,11 @@ def update_subscriptions():
     responses:
       200:
         description: Suscripciones actualizadas correctamente
+        headers:
+          X-Subscriptions-Changed:
+            description: false si el pedido no modificó ninguna suscripción
+            schema:
+              type: boolean
         content:
           application/json:
             schema:
@@ -149,12 +174,13 @@ def update_subscriptions():
         description: Error inesperado del servidor
     """
     try:
-        current_phone = get_jwt_identity()
         data = request.get_json()
-        user = SubscriptionService.get_user_by_phone(current_phone)
+        user = SubscriptionService.get_current_user()
 
-        updated_subs = SubscriptionService.replace_subscriptions(user, data['categories'])
-        return jsonify([{'category': sub.category} for sub in updated_subs]), 200
+        updated_subs, changed = SubscriptionService.sync_subscriptions(user, data['categories'])
+        response = jsonify([{'category': sub.category} for sub in updated_subs])
+        response.headers['X-Subscriptions-Changed'] = 'true' if changed else 'false'
+        return response, 200
 
     except (ValidationError, NotFoundError) as e:
         return jsonify(e.to_dict()), e.status_code
@@ -164,6 +190,78 @@ def update_subscriptions():
             "message": "Error actualizando suscripciones"
         }), 500
 
+@subscription_bp.route('/subscriptions', methods=['PATCH'])
+@jwt_required()
+def patch_subscriptions():
+    """
+    Agregar y quitar suscripciones en una sola operación
+    ---
+    tags:
+      - Suscripciones
+    security:
+      - BearerAuth: []
+    summary: Aplica altas y bajas de categorías de forma atómica
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            $ref: '#/components/schemas/SubscriptionPatchRequest'
+    responses:
+      200:
+        description: Cambios aplicados
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                added:
+                  type: array
+                  items:
+                    type: string
+                    example: cultura
+                removed:
+                  type: array
+                  items:
+                    type: string
+                    example: deportes
+                subscriptions:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      category:
+                        type: string
+                        example: cultura
+      400:
+        description: Datos inválidos
+        content:
+          application/json:
+            schema:
+              $ref: '#/components/schemas/Error'
+      500:
+        description: Error inesperado del servidor
+    """
+    try:
+        # Un body inválido es 400 sin ir a buscar al usuario
+        changes = SubscriptionService.validate_changes(request.get_json())
+        user = SubscriptionService.get_current_user()
+
+        result = SubscriptionService.apply_changes(user, changes)
+        return jsonify({
+            'added': result['added'],
+            'removed': result['removed'],
+            'subscriptions': [{'category': sub.category} for sub in result['subscriptions']]
+        }), 200
+
+    except (ValidationError, NotFoundError) as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception:
+        return jsonify({
+            "error_type": "PatchSubscriptionsError",
+            "message": "Error modificando suscripciones"
+        }), 500
+
 @subscription_bp.route('/subscriptions/<string:category>', methods=['DELETE'])
 @jwt_required()
 def delete_subscription(category):
@@ -203,8 +301,7 @@ def delete_subscription(category):
         description: Error inesperado del servidor
     """
     try:
-        current_phone = get_jwt_identity()
-        user = SubscriptionService.get_user_by_phone(current_phone)
+        user = SubscriptionService.get_current_user()
 
         SubscriptionService.delete_subscription(user, category)
         return jsonify({
@@ -242,4 +339,4 @@ def get_categories():
                     type: string
                     example: tecnología
     """
-    return jsonify({"categories": sorted(VALID_CATEGORIES)}), 200
+    return jsonify({"categories": sorted(get_catalog().names())}), 200
@@ -0,0 +1,268 @@
+# app/sandbox.py
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import g, request
+
+from app.binds import DEMO_SCOPE, copy_schema, create_pooled_engine
+from app.services.catalog import get_catalog
+
+SANDBOX_COOKIE = 'demo_sandbox'
+_SESSION_ID = re.compile(r'[0-9a-f]{32}')
+# Archivos que SQLite deja al lado de la base
+_SQLITE_SIDECARS = ('-journal', '-wal', '-shm')
+
+
+class SandboxPool:
+    """Bases SQLite de demo, una por sesión de Swagger.
+
+    Todo vive en un directorio compartido por los workers:
+      - template-<versión>.db: esquema + catálogo de categorías; la versión
+        es la del catálogo, así que si cambia se arma un template nuevo
+      - ready-<versión>-*.db: clones del template listos para asignar
+      - session-<id>.db: sandbox asignado a una sesión (cookie demo_sandbox)
+
+    Asignar un sandbox es un os.rename atómico de un clone listo, así que dos
+    workers nunca se llevan el mismo. El mtime del archivo marca el último uso
+    y funciona como lease: cada request lo renueva y ningún archivo usado en
+    los últimos `lease` segundos se borra, aunque esté vencido o sobre, porque
+    puede tenerlo abierto otro worker. El barrido en segundo plano borra los
+    vencidos (TTL) y los más viejos si se pasa de max_sessions (LRU), descarta
+    templates y clones de versiones viejas y vuelve a llenar la pila.
+    """
+
+    def __init__(self, directory, size=4, max_sessions=200, ttl=1800,
+                 sweep_interval=30, lease=60, clock=time.time):
+        self.directory = directory
+        self.size = size
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.lease = lease
+        self._clock = clock
+        self._version = None
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        self._template_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        """True si ya hay un template armado en este proceso."""
+        return self._version is not None
+
+    @property
+    def template_path(self):
+        return self._template_path(self._version)
+
+    def _template_path(self, version):
+        return os.path.join(self.directory, f'template-{version}.db')
+
+    def session_path(self, session_id):
+        return os.path.join(self.directory, f'session-{session_id}.db')
+
+    def ensure_template(self, db):
+        """Arma el template del catálogo actual si no existe (requiere app context)."""
+        version = '-'.join(str(value or 0) for value in get_catalog().version())
+        path = self._template_path(version)
+        if not os.path.exists(path):
+            with self._template_lock:
+                if not os.path.exists(path):
+                    os.makedirs(self.directory, exist_ok=True)
+                    tmp_path = os.path.join(self.directory, f'.template-{uuid.uuid4().hex}.db')
+                    engine = create_pooled_engine(f'sqlite:///{tmp_path}', pool_size=1, max_overflow=0)
+                    try:
+                        copy_schema(db, engine)
+                    finally:
+                        engine.dispose()
+                    os.replace(tmp_path, path)
+        self._version = version
+
+    def refill(self):
+        for _ in range(self.size - len(self._ready_files())):
+            self._clone(os.path.join(self.directory, f'ready-{self._version}-{uuid.uuid4().hex}.db'))
+
+    def acquire(self, session_id=None):
+        """Devuelve (session_id, path) del sandbox de la sesión, o asigna uno nuevo."""
+        if session_id and _SESSION_ID.fullmatch(session_id):
+            path = self.session_path(session_id)
+            try:
+                os.utime(path)
+                return session_id, path
+            except FileNotFoundError:
+                # Vencido o nunca existió: se asigna otro
+                self._forget(path)
+
+        session_id = secrets.token_hex(16)
+        path = self.session_path(session_id)
+        for ready in self._ready_files():
+            try:
+                os.rename(ready, path)
+                os.utime(path)
+                return session_id, path
+            except FileNotFoundError:
+                continue  # otro worker lo tomó primero
+
+        # Pila vacía: clonar en el momento (copia de un archivo chico, milisegundos)
+        self._clone(path)
+        return session_id, path
+
+    def engine_for(self, path):
+        with self._lock:
+            engine = self._engines.get(path)
+            if engine is None:
+                engine = self._engines[path] = create_pooled_engine(
+                    f'sqlite:///{path}', pool_size=1, max_overflow=4
+                )
+                while len(self._engines) > self.max_sessions:
+                    _, old = self._engines.popitem(last=False)
+                    old.dispose()
+            else:
+                self._engines.move_to_end(path)
+            return engine
+
+    def sweep(self):
+        """Borra sandboxes vencidos o que exceden max_sessions (los menos usados),
+        y templates y clones de otra versión del catálogo, salvo los que tienen
+        el lease vigente."""
+        now = self._clock()
+        leased_after = now - self.lease
+        sessions = []
+        for name in self._listdir():
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            if name.startswith('session-'):
+                sessions.append((mtime, path))
+            elif name.startswith(('template-', 'ready-')) and self._version \
+                    and not name.startswith((f'template-{self._version}.', f'ready-{self._version}-')) \
+                    and mtime < leased_after:
+                self._discard(path)
+
+        sessions.sort(reverse=True)
+        expired_before = now - self.ttl
+        for index, (mtime, path) in enumerate(sessions):
+            if (mtime < expired_before or index >= self.max_sessions) and mtime < leased_after:
+                self._discard(path)
+
+        # Engines propios de sandboxes que borró otro worker
+        with self._lock:
+            gone = [path for path in self._engines if not os.path.exists(path)]
+        for path in gone:
+            self._forget(path)
+
+    def warm(self, app, db):
+        """Arma el template y arranca el barrido/rellenado (lifecycle.warm_up)."""
+        with app.app_context():
+            self.ensure_template(db)
+        self.start(app, db)
+
+    def start(self, app, db):
+        """Arranca el barrido/rellenado en segundo plano (una vez por proceso)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(app, db), name='sandbox-pool', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+    def _run(self, app, db):
+        while not self._stop.is_set():
+            with app.app_context():
+                self.ensure_template(db)
+            self.sweep()
+            self.refill()
+            self._stop.wait(self.sweep_interval)
+
+    def _listdir(self):
+        try:
+            return os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+    def _ready_files(self):
+        prefix = f'ready-{self._version}-'
+        return [os.path.join(self.directory, n) for n in self._listdir() if n.startswith(prefix)]
+
+    def _clone(self, path):
+        tmp_path = os.path.join(self.directory, f'.clone-{uuid.uuid4().hex}.db')
+        # Solo lectura: si otro worker borró el template falla en lugar de crear uno vacío
+        source = sqlite3.connect(f'file:{self.template_path}?mode=ro', uri=True)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp_path, path)
+
+    def _forget(self, path):
+        with self._lock:
+            engine = self._engines.pop(path, None)
+        if engine is not None:
+            engine.dispose()
+
+    def _discard(self, path):
+        self._forget(path)
+        for file_path in (path, *(path + suffix for suffix in _SQLITE_SIDECARS)):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+
+def register_sandbox_routing(app, db, header):
+    pool = SandboxPool(
+        app.config['DEMO_SANDBOX_DIR'],
+        size=app.config.get('DEMO_SANDBOX_POOL_SIZE', 4),
+        max_sessions=app.config.get('DEMO_SANDBOX_MAX_SESSIONS', 200),
+        ttl=app.config.get('DEMO_SANDBOX_TTL', 1800),
+        sweep_interval=app.config.get('DEMO_SANDBOX_SWEEP_INTERVAL', 30),
+        lease=app.config.get('DEMO_SANDBOX_LEASE', 60)
+    )
+    app.extensions['sandbox_pool'] = pool
+
+    @app.before_request
+    def route_demo_to_sandbox():
+        if request.headers.get(header) != 'true':
+            return
+        if not pool.ready:
+            # Sin lifecycle.warm_up (flask run, tests): se arma en la primera request
+            pool.warm(app, db)
+        session_id, path = pool.acquire(request.cookies.get(SANDBOX_COOKIE))
+        g.db_engine = pool.engine_for(path)
+        # Cada sandbox numera sus usuarios desde 1: el token vale solo en el suyo
+        g.db_scope = f'{DEMO_SCOPE}:{session_id}'
+        g.sandbox_session = session_id
+
+    @app.after_request
+    def set_sandbox_cookie(response):
+        session_id = g.get('sandbox_session')
+        if session_id and session_id != request.cookies.get(SANDBOX_COOKIE):
+            response.set_cookie(
+                SANDBOX_COOKIE, session_id,
+                max_age=pool.ttl, httponly=True, samesite='Lax'
+            )
+        return response
+
+    return pool
@@ -1,5 +1,8 @@
-from marshmallow import Schema, fields, validates, ValidationError
+from marshmallow import Schema, fields, validates, validates_schema, ValidationError
 
+from app.services.catalog import get_catalog
+
+# Categorías iniciales del catálogo; las válidas se leen de la tabla categories
 VALID_CATEGORIES = {"deportes", "tecnología", "economía", "cultura"}
 
 class SubscriptionSchema(Schema):
@@ -7,6 +10,25 @@ class SubscriptionSchema(Schema):
 
     @validates('categories')
     def validate_categories(self, categories):
-        invalid = set(categories) - VALID_CATEGORIES
+        invalid = set(categories) - get_catalog().names()
+        if invalid:
+            raise ValidationError(f"Categorías inválidas: {', '.join(invalid)}")
+
+
+class SubscriptionPatchSchema(Schema):
+    add = fields.List(fields.Str(), load_default=list)
+    remove = fields.List(fields.Str(), load_default=list)
+
+    @validates_schema
+    def validate_changes(self, data, **kwargs):
+        add, remove = set(data['add']), set(data['remove'])
+        if not add and not remove:
+            raise ValidationError("Debe indicar categorías en 'add' o 'remove'")
+
+        invalid = (add | remove) - get_catalog().names()
         if invalid:
             raise ValidationError(f"Categorías inválidas: {', '.join(invalid)}")
+
+        overlap = add & remove
+        if overlap:
+            raise ValidationError(f"Categorías en 'add' y 'remove' a la vez: {', '.join(overlap)}")
@@ -33,6 +33,11 @@ swagger_template =  {
                 "type": "http",
                 "scheme": "bearer",
                 "bearerFormat": "JWT"
+            },
+            "ServiceKey": {
+                "type": "apiKey",
+                "in": "header",
+                "name": "X-Service-Key"
             }
         },
         "schemas": {
@@ -79,6 +84,21 @@ swagger_template =  {
                     }
                 }
             },
+            "SubscriptionPatchRequest": {
+                "type": "object",
+                "properties": {
+                    "add": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/SubscriptionRequest/properties/categories/items"},
+                        "example": ["cultura"]
+                    },
+                    "remove": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/SubscriptionRequest/properties/categories/items"},
+                        "example": ["deportes"]
+                    }
+                }
+            },
             "Error": {
                 "type": "object",
                 "properties": {
@@ -0,0 +1,207 @@
+# app/services/async_subscription.py
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.auth.models import UserRef
+from app.auth.services import USER_ID_CLAIM
+from app.binds import db_scope
+from app.errors.exceptions import ValidationError, NotFoundError
+from app.models import Subscription
+from app.services import queries
+from app.services.cache import user_cache
+from app.services.catalog import get_catalog
+from app.services.subscription import CategoryRow, SubscriptionService
+
+
+class AsyncSubscriptionService:
+    """Versión asyncio de SubscriptionService.
+
+    Mismas sentencias (app/services/queries.py), mismas transacciones y
+    mismas respuestas, ejecutadas sobre la AsyncSession que recibe cada
+    método: mientras la base responde, el event loop atiende otras requests.
+    La validación de los pedidos es la del servicio sync (no toca la base).
+    """
+
+    @classmethod
+    async def get_user_by_phone(cls, session, phone_number):
+        """Devuelve un UserRef (id, phone_number), con la misma cache que el servicio sync."""
+        key = (db_scope(), phone_number)
+        user = user_cache.get(key)
+        if user is not None:
+            return user
+
+        row = (await session.execute(queries.user_by_phone(phone_number))).first()
+        if not row:
+            raise NotFoundError("Usuario no encontrado")
+
+        user = UserRef(*row)
+        user_cache.set(key, user)
+        return user
+
+    @classmethod
+    async def get_current_user(cls, session):
+        """Como SubscriptionService.get_current_user: con "uid" no consulta nada."""
+        user_id = get_jwt().get(USER_ID_CLAIM)
+        phone_number = get_jwt_identity()
+        if user_id is None:
+            return await cls.get_user_by_phone(session, phone_number)
+        return UserRef(user_id, phone_number)
+
+    @classmethod
+    async def get_subscriptions_version(cls, session, user):
+        version = (await session.execute(
+            queries.subscriptions_version(user.id, user.phone_number)
+        )).scalar()
+        if version is None:
+            raise NotFoundError("Usuario no encontrado")
+        return version
+
+    @classmethod
+    async def get_subscriptions_with_version(cls, session, user):
+        rows = (await session.execute(
+            queries.subscriptions_with_version(user.id, user.phone_number)
+        )).all()
+        if not rows:
+            raise NotFoundError("Usuario no encontrado")
+        catalog = get_catalog()
+        return rows[0][0], [
+            CategoryRow(catalog.name_for(category_id)) for _, category_id in rows if category_id is not None
+        ]
+
+    @classmethod
+    async def create_subscription(cls, session, user, categories):
+        SubscriptionService.validate_categories(categories)
+
+        try:
+            await cls._bump_version(session, user)
+            new_subscriptions = await cls._insert_missing(session, user.id, get_catalog().ids_for(categories))
+            if not new_subscriptions:
+                await session.rollback()
+                raise ValidationError("No hay categorías nuevas para agregar")
+
+            await session.commit()
+            return new_subscriptions
+
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+
+    @classmethod
+    async def sync_subscriptions(cls, session, user, categories):
+        SubscriptionService.validate_categories(categories)
+        requested = list(dict.fromkeys(categories))
+        requested_ids = get_catalog().ids_for(requested)
+        rows = [CategoryRow(category) for category in requested]
+
+        try:
+            current = (await session.execute(
+                queries.subscriptions_with_version(user.id, user.phone_number)
+            )).all()
+            if not current:
+                raise NotFoundError("Usuario no encontrado")
+            current_ids = {category_id for _, category_id in current if category_id is not None}
+            stale_ids = list(current_ids.difference(requested_ids))
+            missing_ids = [category_id for category_id in requested_ids if category_id not in current_ids]
+            if not stale_ids and not missing_ids:
+                return rows, False
+
+            removed = 0
+            if stale_ids:
+                removed = (await session.execute(queries.delete_categories(user.id, stale_ids))).rowcount
+            added = await cls._insert_missing(session, user.id, missing_ids)
+
+            changed = bool(removed or added)
+            if changed:
+                await cls._bump_version(session, user)
+
+            await session.commit()
+            return rows, changed
+
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+
+    @classmethod
+    async def apply_changes(cls, session, user, data):
+        """Aplica un pedido ya validado (SubscriptionService.validate_changes)."""
+        catalog = get_catalog()
+        try:
+            await cls._bump_version(session, user)
+            removed = []
+            if data['remove']:
+                removed_ids = (await session.execute(
+                    queries.delete_categories(user.id, catalog.ids_for(data['remove']))
+                    .returning(Subscription.category_id)
+                )).scalars().all()
+                removed = [catalog.name_for(category_id) for category_id in removed_ids]
+
+            added = [
+                row.category
+                for row in await cls._insert_missing(session, user.id, catalog.ids_for(data['add']))
+            ]
+
+            current_ids = (await session.execute(queries.subscribed_category_ids(user.id))).scalars().all()
+            current = [catalog.name_for(category_id) for category_id in current_ids]
+
+            if added or removed:
+                await session.commit()
+            else:
+                await session.rollback()  # sin cambios la versión no sube
+            return {
+                'added': added,
+                'removed': removed,
+                'subscriptions': [CategoryRow(category) for category in current]
+            }
+
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+
+    @classmethod
+    async def delete_subscription(cls, session, user, category):
+        category_id = get_catalog().id_for(category)
+        if category_id is None:
+            raise NotFoundError("Suscripción no encontrada")
+
+        try:
+            await cls._bump_version(session, user)
+            deleted = (await session.execute(queries.delete_categories(user.id, [category_id]))).rowcount
+            if not deleted:
+                await session.rollback()
+                raise NotFoundError("Suscripción no encontrada")
+
+            await session.commit()
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+
+    @staticmethod
+    async def _bump_version(session, user):
+        """Sube la versión y verifica que el usuario del token exista (ver SubscriptionService)."""
+        bumped = (await session.execute(queries.bump_version(user.id, user.phone_number))).rowcount
+        if not bumped:
+            await session.rollback()
+            raise NotFoundError("Usuario no encontrado")
+
+    @staticmethod
+    async def _insert_missing(session, user_id, category_ids):
+        """Como SubscriptionService._insert_missing: CategoryRow insertadas, en orden de id."""
+        if not category_ids:
+            return []
+
+        catalog = get_catalog()
+        dialect = session.bind.dialect.name
+        if not queries.supports_upsert(dialect):
+            inserted = []
+            for category_id in dict.fromkeys(category_ids):
+                try:
+                    async with session.begin_nested():
+                        await session.execute(queries.insert_one(user_id, category_id))
+                except IntegrityError:
+                    continue  # ya estaba suscripto
+                inserted.append(CategoryRow(catalog.name_for(category_id)))
+            return inserted
+
+        stmt = queries.insert_missing(dialect, user_id, category_ids)
+        rows = sorted((await session.execute(stmt)).all(), key=lambda row: row.id)
+        return [CategoryRow(catalog.name_for(row.category_id)) for row in rows]
@@ -0,0 +1,109 @@
+# app/services/catalog.py
+import threading
+import time
+import zlib
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.category import Category
+
+
+class CategoryCatalog:
+    """Catálogo de categorías (nombre <-> id) cacheado en memoria.
+
+    La tabla es chica y casi nunca cambia, así que se carga entera. Cada
+    `refresh_interval` segundos se relee y se compara su versión (cantidad de
+    filas, id máximo y un checksum de los pares (id, nombre)); solo si cambió
+    se reemplazan los índices en memoria. Así una categoría agregada con
+    `flask categories add`, o renombrada con un UPDATE a mano, llega a todos
+    los workers sin redeploy.
+    """
+
+    def __init__(self, refresh_interval=30, clock=time.monotonic):
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._ids_by_name = {}
+        self._names_by_id = {}
+        self._version = None
+        self._checked_at = None
+
+    def names(self):
+        self._ensure_fresh()
+        return frozenset(self._ids_by_name)
+
+    def id_for(self, name):
+        self._ensure_fresh()
+        return self._ids_by_name.get(name)
+
+    def ids_for(self, names):
+        self._ensure_fresh()
+        return [self._ids_by_name[name] for name in names if name in self._ids_by_name]
+
+    def name_for(self, category_id):
+        """Nombre de la categoría, o None si no existe.
+
+        Un id desconocido puede ser una categoría agregada por otro worker
+        antes del próximo chequeo de versión: se recarga una vez y se
+        vuelve a buscar.
+        """
+        self._ensure_fresh()
+        name = self._names_by_id.get(category_id)
+        if name is None:
+            self.invalidate()
+            self._ensure_fresh()
+            name = self._names_by_id.get(category_id)
+        return name
+
+    def version(self):
+        """(cantidad de filas, id máximo, checksum) de la tabla en el último chequeo."""
+        self._ensure_fresh()
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = None
+            self._version = None
+
+    def _ensure_fresh(self):
+        now = self._clock()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < self.refresh_interval:
+            return
+
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+            # Siempre desde la base principal, aunque la request use otro bind
+            rows = db.session.execute(
+                select(Category.id, Category.name).order_by(Category.id),
+                bind_arguments={'bind': db.engine}
+            ).all()
+            version = _table_version(rows)
+            if version != self._version:
+                # Se reemplazan los dicts completos: los lectores nunca ven uno a medio armar
+                self._ids_by_name = {name: category_id for category_id, name in rows}
+                self._names_by_id = {category_id: name for category_id, name in rows}
+                self._version = version
+            self._checked_at = now
+
+
+def _table_version(rows):
+    """(cantidad, id máximo, CRC32 de los pares) de filas (id, name) ordenadas por id."""
+    checksum = zlib.crc32('\n'.join(f'{category_id}:{name}' for category_id, name in rows).encode('utf-8'))
+    return len(rows), rows[-1][0] if rows else None, checksum
+
+
+def get_catalog():
+    return current_app.extensions['category_catalog']
+
+
+def seed_categories(names):
+    """Inserta las categorías que falten (idempotente)."""
+    existing = set(db.session.execute(select(Category.name)).scalars())
+    for name in sorted(set(names) - existing):
+        db.session.add(Category(name=name))
+    db.session.commit()
+    get_catalog().invalidate()
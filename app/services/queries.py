@@ -0,0 +1,111 @@
+# app/services/queries.py
+"""Sentencias de suscripciones que usa SubscriptionService.
+
+Solo arman la consulta: la ejecución y la transacción quedan en el
+servicio. Las lecturas de cada request son lambda statements: SQLAlchemy
+arma y compila la consulta una sola vez y en las siguientes llamadas solo
+cambia el valor de los parámetros.
+"""
+from sqlalchemy import delete, insert, lambda_stmt, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.auth.models import User
+from app.models import Subscription
+
+# INSERT con soporte de ON CONFLICT según el dialecto de la base; el resto
+# usa insert_one fila por fila (ver SubscriptionService._insert_missing)
+DIALECT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def user_by_phone(phone_number):
+    return lambda_stmt(
+        lambda: select(User.id, User.phone_number).where(User.phone_number == phone_number)
+    )
+
+
+# Las consultas por usuario filtran por id y teléfono (los dos vienen del
+# token): si el usuario se borró, o el id ahora es de otro, no hay filas
+
+def subscriptions_version(user_id, phone_number):
+    return lambda_stmt(
+        lambda: select(User.subscriptions_version)
+        .where(User.id == user_id, User.phone_number == phone_number)
+    )
+
+
+def subscriptions_with_version(user_id, phone_number):
+    """(version, category_id) por suscripción; una fila con category_id None si no tiene."""
+    return lambda_stmt(
+        lambda: select(User.subscriptions_version, Subscription.category_id)
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .where(User.id == user_id, User.phone_number == phone_number)
+        .order_by(Subscription.id)
+    )
+
+
+def subscribed_category_ids(user_id):
+    return lambda_stmt(
+        lambda: select(Subscription.category_id)
+        .where(Subscription.user_id == user_id)
+        .order_by(Subscription.id)
+    )
+
+
+def category_subscribers(category_id, after_id, limit, inclusive=False):
+    """Página de (id, category_id, phone_number) de una categoría, en orden de id.
+
+    Es un rango del índice (category_id, id): la base no ordena nada.
+    """
+    return (
+        select(Subscription.id, Subscription.category_id, User.phone_number)
+        .join(User, User.id == Subscription.user_id)
+        .where(
+            Subscription.category_id == category_id,
+            Subscription.id >= after_id if inclusive else Subscription.id > after_id
+        )
+        .order_by(Subscription.id)
+        .limit(limit)
+    )
+
+
+def delete_categories(user_id, category_ids):
+    return delete(Subscription).where(
+        Subscription.user_id == user_id,
+        Subscription.category_id.in_(category_ids)
+    )
+
+
+def bump_version(user_id, phone_number):
+    return (
+        update(User)
+        .where(User.id == user_id, User.phone_number == phone_number)
+        .values(subscriptions_version=User.subscriptions_version + 1)
+    )
+
+
+def supports_upsert(dialect):
+    return dialect in DIALECT_INSERTS
+
+
+def insert_one(user_id, category_id):
+    """INSERT portable de una suscripción (falla si ya existe)."""
+    return insert(Subscription).values(user_id=user_id, category_id=category_id)
+
+
+def insert_missing(dialect, user_id, category_ids):
+    """INSERT ... ON CONFLICT DO NOTHING ... RETURNING (id, category_id).
+
+    Solo para dialectos con supports_upsert.
+    """
+    return (
+        DIALECT_INSERTS[dialect](Subscription)
+        .values([
+            {'user_id': user_id, 'category_id': category_id}
+            for category_id in dict.fromkeys(category_ids)
+        ])
+        .on_conflict_do_nothing(index_elements=['user_id', 'category_id'])
+        .returning(Subscription.id, Subscription.category_id)
+    )
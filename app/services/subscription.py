@@ -1,45 +1,128 @@
-from sqlalchemy.exc import SQLAlchemyError
+import heapq
+from collections import namedtuple
+from itertools import islice
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models import Subscription
-from app.auth.models import User
+from app.auth.models import UserRef
+from app.auth.services import USER_ID_CLAIM
+from app.binds import db_scope
 from app.extensions import db
+from app.instrumentation import phase
+from app.services import queries
+from app.services.cache import user_cache
+from app.services.catalog import get_catalog
+from app.sharding import get_shards, route_to_shard, scatter_gather
 from app.errors.exceptions import ValidationError, NotFoundError
-from app.schemas.subscription_schema import SubscriptionSchema
+from app.schemas.subscription_schema import SubscriptionSchema, SubscriptionPatchSchema
 from marshmallow import ValidationError as MarshmallowValidationError
 
+# Resultado liviano para respuestas que solo necesitan el nombre de la categoría
+CategoryRow = namedtuple('CategoryRow', ['category'])
+# Fila del fan-out; shard es None si no hay sharding
+SubscriberRow = namedtuple('SubscriberRow', ['id', 'category', 'phone_number', 'shard'])
+
+
+def _flatten_messages(messages):
+    """Mensajes de un ValidationError de marshmallow como lista plana.
+
+    Los errores por elemento vienen anidados por índice ({'add': {0: [...]}}).
+    """
+    if isinstance(messages, dict):
+        return [m for value in messages.values() for m in _flatten_messages(value)]
+    if isinstance(messages, (list, tuple)):
+        return [m for value in messages for m in _flatten_messages(value)]
+    return [str(messages)]
+
+
 class SubscriptionService:
     @classmethod
     def get_user_by_phone(cls, phone_number):
-        user = User.query.filter_by(phone_number=phone_number).first()
-        if not user:
+        """Devuelve un UserRef (id, phone_number), cacheado por proceso y base."""
+        route_to_shard(phone_number)
+        key = (db_scope(), phone_number)
+        user = user_cache.get(key)
+        if user is not None:
+            return user
+
+        row = db.session.execute(queries.user_by_phone(phone_number)).first()
+        if not row:
             raise NotFoundError("Usuario no encontrado")
+
+        user = UserRef(*row)
+        user_cache.set(key, user)
         return user
 
+    @classmethod
+    def get_current_user(cls):
+        """Resuelve el usuario del JWT de la request actual.
+
+        Con el claim "uid" no se consulta nada: el UserRef sale del token y la
+        existencia se verifica en la sentencia que la ruta corre igual (las
+        consultas y el UPDATE de versión filtran por id y teléfono, y sin
+        filas responden 404). Así un token de un usuario borrado, o de un
+        teléfono que se volvió a registrar con otro id, no sirve. Los tokens
+        sin "uid" se resuelven por teléfono con la cache.
+        """
+        user_id = get_jwt().get(USER_ID_CLAIM)
+        phone_number = get_jwt_identity()
+        if user_id is None:
+            return cls.get_user_by_phone(phone_number)
+        route_to_shard(phone_number)
+        return UserRef(user_id, phone_number)
+
+    @classmethod
+    def get_subscriptions(cls, user):
+        """Categorías del usuario como CategoryRow, en orden de alta."""
+        catalog = get_catalog()
+        category_ids = db.session.execute(queries.subscribed_category_ids(user.id)).scalars()
+        return [CategoryRow(catalog.name_for(category_id)) for category_id in category_ids]
+
+    @classmethod
+    def get_subscriptions_version(cls, user):
+        """Versión actual de las suscripciones del usuario, sin leer las filas."""
+        version = db.session.execute(queries.subscriptions_version(user.id, user.phone_number)).scalar()
+        if version is None:
+            raise NotFoundError("Usuario no encontrado")
+        return version
+
+    @classmethod
+    def get_subscriptions_with_version(cls, user):
+        """Versión y categorías en una sola consulta: (version, [CategoryRow])."""
+        rows = db.session.execute(queries.subscriptions_with_version(user.id, user.phone_number)).all()
+        if not rows:
+            raise NotFoundError("Usuario no encontrado")
+        catalog = get_catalog()
+        return rows[0][0], [
+            CategoryRow(catalog.name_for(category_id)) for _, category_id in rows if category_id is not None
+        ]
+
     @classmethod
     def validate_categories(cls, categories):
         try:
-            schema = SubscriptionSchema()
-            schema.load({'categories': categories})
+            with phase('validation'):
+                SubscriptionSchema().load({'categories': categories})
         except MarshmallowValidationError as e:
-            raise ValidationError(", ".join(e.messages.get('categories', [])))
+            raise ValidationError(", ".join(_flatten_messages(e.messages.get('categories', []))))
 
     @classmethod
     def create_subscription(cls, user, categories):
-        cls.validate_categories(categories)
+        """Agrega las categorías que el usuario todavía no tiene.
 
-        new_subscriptions = []
-        # existing_categories = {sub.category for sub in user.subscriptions}
-        # Consulta directa a la base de datos para evitar caché
-        existing_categories = {s.category for s in 
-                   Subscription.query.filter_by(user_id=user.id).all()}
+        Es un único INSERT ... ON CONFLICT DO NOTHING ... RETURNING, así que
+        dos requests concurrentes no chocan contra unique_user_category: cada
+        una devuelve solo las filas que realmente insertó. El UPDATE de
+        versión va primero: verifica que el usuario exista antes de insertar.
+        """
+        cls.validate_categories(categories)
 
         try:
-            for category in set(categories):
-                if category not in existing_categories:
-                    sub = Subscription(category=category, user_id=user.id)
-                    db.session.add(sub)
-                    new_subscriptions.append(sub)
-
+            cls._bump_version(user)
+            new_subscriptions = cls._insert_missing(user.id, get_catalog().ids_for(categories))
             if not new_subscriptions:
+                db.session.rollback()
                 raise ValidationError("No hay categorías nuevas para agregar")
 
             db.session.commit()
@@ -51,39 +134,247 @@ class SubscriptionService:
 
     @classmethod
     def replace_subscriptions(cls, user, categories):
+        subscriptions, _ = cls.sync_subscriptions(user, categories)
+        return subscriptions
+
+    @classmethod
+    def sync_subscriptions(cls, user, categories):
+        """Deja al usuario suscripto exactamente a `categories`.
+
+        Lee primero los ids guardados junto con el usuario (una consulta, que
+        también verifica que exista): si no cambió nada responde sin
+        escribir, así un PUT repetido no toma el lock de escritura. Si cambió, en una única transacción borra las
+        categorías que sobran e inserta con ON CONFLICT DO NOTHING las que
+        faltan. Devuelve (suscripciones, changed); changed es False cuando el
+        pedido no modificó nada.
+        """
         cls.validate_categories(categories)
+        requested = list(dict.fromkeys(categories))
+        requested_ids = get_catalog().ids_for(requested)
+        rows = [CategoryRow(category) for category in requested]
 
         try:
-            # Eliminar todas las suscripciones existentes
-            Subscription.query.filter_by(user_id=user.id).delete()
-            
-            # Crear nuevas suscripciones
-            new_subs = []
-            for category in set(categories):
-                sub = Subscription(category=category, user_id=user.id)
-                db.session.add(sub)
-                new_subs.append(sub)
+            current = db.session.execute(queries.subscriptions_with_version(user.id, user.phone_number)).all()
+            if not current:
+                raise NotFoundError("Usuario no encontrado")
+            current_ids = {category_id for _, category_id in current if category_id is not None}
+            stale_ids = list(current_ids.difference(requested_ids))
+            missing_ids = [category_id for category_id in requested_ids if category_id not in current_ids]
+            if not stale_ids and not missing_ids:
+                return rows, False
+
+            removed = 0
+            if stale_ids:
+                removed = db.session.execute(queries.delete_categories(user.id, stale_ids)).rowcount
+            added = cls._insert_missing(user.id, missing_ids)
+
+            changed = bool(removed or added)
+            if changed:
+                cls._bump_version(user)
 
             db.session.commit()
-            return new_subs
+            return rows, changed
 
         except SQLAlchemyError:
             db.session.rollback()
             raise
 
     @classmethod
-    def delete_subscription(cls, user, category):
-        sub = Subscription.query.filter_by(
-            user_id=user.id,
-            category=category
-        ).first()
+    def validate_changes(cls, changes):
+        """Valida todo un pedido {"add": [...], "remove": [...]} de una vez.
+
+        Devuelve el pedido normalizado, listo para apply_changes.
+        """
+        try:
+            with phase('validation'):
+                return SubscriptionPatchSchema().load(changes or {})
+        except MarshmallowValidationError as e:
+            raise ValidationError(", ".join(_flatten_messages(e.messages)), payload=e.messages)
+
+    @classmethod
+    def apply_changes(cls, user, data):
+        """Aplica un pedido ya validado (validate_changes) en una sola transacción.
+
+        Usa un DELETE y un INSERT en bloque, después del UPDATE de versión
+        (que verifica que el usuario exista); si al final no cambió nada se
+        deshace todo. Devuelve las categorías realmente agregadas/quitadas y
+        el estado final.
+        """
+        catalog = get_catalog()
+        try:
+            cls._bump_version(user)
+            removed = []
+            if data['remove']:
+                removed_ids = db.session.execute(
+                    queries.delete_categories(user.id, catalog.ids_for(data['remove']))
+                    .returning(Subscription.category_id)
+                ).scalars().all()
+                removed = [catalog.name_for(category_id) for category_id in removed_ids]
+
+            added = [
+                row.category
+                for row in cls._insert_missing(user.id, catalog.ids_for(data['add']))
+            ]
 
-        if not sub:
+            current_ids = db.session.execute(queries.subscribed_category_ids(user.id)).scalars().all()
+            current = [catalog.name_for(category_id) for category_id in current_ids]
+
+            if added or removed:
+                db.session.commit()
+            else:
+                db.session.rollback()  # sin cambios la versión no sube
+            return {
+                'added': added,
+                'removed': removed,
+                'subscriptions': [CategoryRow(category) for category in current]
+            }
+
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    def delete_subscription(cls, user, category):
+        category_id = get_catalog().id_for(category)
+        if category_id is None:
             raise NotFoundError("Suscripción no encontrada")
 
         try:
-            db.session.delete(sub)
+            cls._bump_version(user)
+            deleted = db.session.execute(queries.delete_categories(user.id, [category_id])).rowcount
+            if not deleted:
+                db.session.rollback()
+                raise NotFoundError("Suscripción no encontrada")
+
             db.session.commit()
         except SQLAlchemyError:
             db.session.rollback()
             raise
+
+    @classmethod
+    def iter_subscribers(cls, categories, batch_size=1000, after_id=0, after_shard=None, prefetch=2):
+        """Recorre los suscriptores de las categorías dadas en orden de id.
+
+        Usa keyset pagination sobre subscriptions.id, por categoría: cada
+        página es un rango del índice (category_id, id) acotado a batch_size
+        filas y nunca se materializan objetos ORM, así que la memoria se
+        mantiene constante (una página por categoría) sin importar cuántos
+        suscriptores haya. Devuelve SubscriberRow (id, category, phone_number, shard).
+
+        Con sharding se recorren todos los shards en paralelo y se mezclan por
+        (id, shard); para reanudar hay que pasar el id y el shard de la última
+        fila recibida.
+        """
+        cls.validate_categories(categories)
+        catalog = get_catalog()
+        category_ids = catalog.ids_for(categories)
+
+        shards = get_shards()
+        if shards is None:
+            for page in cls._subscriber_pages(db.session, category_ids, batch_size, after_id):
+                for sub_id, category_id, phone_number in page:
+                    yield SubscriberRow(sub_id, catalog.name_for(category_id), phone_number, None)
+            return
+
+        # Orden global (id, shard): después de (after_id, after_shard) vienen
+        # los ids mayores y, con el mismo id, los shards siguientes
+        sources = []
+        for index, engine in enumerate(shards.engines):
+            inclusive = after_shard is not None and index > after_shard
+            sources.append(cls._tag_pages(
+                cls._subscriber_pages(engine, category_ids, batch_size, after_id, inclusive),
+                index
+            ))
+
+        for sub_id, category_id, phone_number, shard in scatter_gather(
+            sources, key=lambda row: (row[0], row[3]), prefetch=prefetch
+        ):
+            yield SubscriberRow(sub_id, catalog.name_for(category_id), phone_number, shard)
+
+    @classmethod
+    def _subscriber_pages(cls, executor, category_ids, batch_size, after_id, inclusive=False):
+        """Páginas de (id, category_id, phone_number) de una sesión o engine.
+
+        Cada categoría se recorre por separado como un rango del índice
+        (category_id, id) y las categorías se mezclan por id con heapq.merge,
+        así ninguna página obliga a la base a ordenar las filas restantes.
+        """
+        rows = heapq.merge(*[
+            cls._category_rows(executor, category_id, batch_size, after_id, inclusive)
+            for category_id in dict.fromkeys(category_ids)
+        ], key=lambda row: row[0])
+
+        while True:
+            page = list(islice(rows, batch_size))
+            yield page
+            if len(page) < batch_size:
+                return
+
+    @staticmethod
+    def _category_rows(executor, category_id, batch_size, after_id, inclusive):
+        """Filas de una categoría, de a batch_size por consulta.
+
+        Con un engine cada página usa una conexión propia y corta, para poder
+        correr en otro thread sin tocar db.session.
+        """
+        last_id = after_id
+        while True:
+            stmt = queries.category_subscribers(category_id, last_id, batch_size, inclusive)
+            if isinstance(executor, Engine):
+                with executor.connect() as conn:
+                    rows = conn.execute(stmt).all()
+            else:
+                rows = executor.execute(stmt).all()
+
+            yield from rows
+
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+            inclusive = False
+
+    @staticmethod
+    def _tag_pages(pages, shard):
+        for page in pages:
+            yield [(*row, shard) for row in page]
+
+    @staticmethod
+    def _bump_version(user):
+        """Sube la versión dentro de la transacción de la mutación que lo llama.
+
+        Es también el chequeo de que el usuario del token existe: si el
+        UPDATE no toca ninguna fila se deshace la transacción.
+        """
+        bumped = db.session.execute(queries.bump_version(user.id, user.phone_number)).rowcount
+        if not bumped:
+            db.session.rollback()
+            raise NotFoundError("Usuario no encontrado")
+
+    @classmethod
+    def _insert_missing(cls, user_id, category_ids):
+        """Inserta (user_id, category_id) ignorando las que ya existen.
+
+        Con SQLite y PostgreSQL es un único INSERT ... ON CONFLICT DO NOTHING;
+        en otras bases, un INSERT por categoría dentro de un SAVEPOINT, y las
+        que chocan contra unique_user_category se saltean. Devuelve las filas
+        insertadas como CategoryRow, en orden de id.
+        """
+        if not category_ids:
+            return []
+
+        catalog = get_catalog()
+        dialect = db.session.get_bind(mapper=Subscription.__mapper__).dialect.name
+        if not queries.supports_upsert(dialect):
+            inserted = []
+            for category_id in dict.fromkeys(category_ids):
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(queries.insert_one(user_id, category_id))
+                except IntegrityError:
+                    continue  # ya estaba suscripto
+                inserted.append(CategoryRow(catalog.name_for(category_id)))
+            return inserted
+
+        stmt = queries.insert_missing(dialect, user_id, category_ids)
+        rows = sorted(db.session.execute(stmt).all(), key=lambda row: row.id)
+        return [CategoryRow(catalog.name_for(row.category_id)) for row in rows]
@@ -0,0 +1,100 @@
+# app/sharding.py
+import heapq
+import queue
+import threading
+import zlib
+
+from flask import current_app, g
+
+_DONE = object()
+
+
+class ShardSet:
+    """Engines de los shards de users/subscriptions/refresh_tokens.
+
+    El shard de un usuario sale de un hash de su teléfono, que es la identidad
+    del JWT y la clave del login: el "directorio" es una función, así que
+    cualquier request llega al shard correcto sin consultas previas. Los ids
+    son por shard (se repiten entre shards); el teléfono es único en todos.
+    """
+
+    def __init__(self, engines):
+        self.engines = list(engines)
+
+    def __len__(self):
+        return len(self.engines)
+
+    def index_for(self, phone_number):
+        return zlib.crc32(phone_number.encode('utf-8')) % len(self.engines)
+
+    def engine_for(self, phone_number):
+        return self.engines[self.index_for(phone_number)]
+
+
+def get_shards():
+    """ShardSet de la app actual, o None si no hay sharding."""
+    return current_app.extensions.get('shards')
+
+
+def route_to_shard(phone_number):
+    """Manda las consultas siguientes de este contexto al shard del usuario.
+
+    No hace nada sin sharding ni cuando la request ya tiene un engine fijo
+    (modo demo / sandbox).
+    """
+    shards = get_shards()
+    if shards is None or phone_number is None or g.get('db_engine') is not None:
+        return
+    g.shard_engine = shards.engine_for(phone_number)
+
+
+def _put(out, item, stop):
+    """Encola `item` salvo que el consumidor haya terminado. Devuelve False si terminó."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(pages, out, stop):
+    try:
+        for page in pages:
+            if not _put(out, page, stop):
+                return
+        _put(out, _DONE, stop)
+    except Exception as err:  # se re-lanza en el consumidor
+        _put(out, err, stop)
+
+
+def _consume(out):
+    while True:
+        page = out.get()
+        if page is _DONE:
+            return
+        if isinstance(page, Exception):
+            raise page
+        yield from page
+
+
+def scatter_gather(page_sources, key, prefetch=2):
+    """Recorre varios shards en paralelo y mezcla los resultados en orden.
+
+    `page_sources` son iterables de páginas (listas ya ordenadas por `key`),
+    uno por shard. Cada uno corre en su propio thread y deja hasta `prefetch`
+    páginas en cola, así la memoria queda acotada; la mezcla es un heapq.merge.
+    Si el consumidor deja de leer (cliente desconectado) los threads terminan.
+    """
+    stop = threading.Event()
+    streams = []
+    for pages in page_sources:
+        out = queue.Queue(maxsize=prefetch)
+        threading.Thread(target=_produce, args=(pages, out, stop), daemon=True).start()
+        streams.append(_consume(out))
+
+    try:
+        yield from heapq.merge(*streams, key=key)
+    finally:
+        stop.set()
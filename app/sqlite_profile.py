@@ -0,0 +1,57 @@
+# app/sqlite_profile.py
+from sqlalchemy import event, text
+
+# PRAGMA -> clave de configuración (se aplican en este orden en cada conexión)
+PRAGMAS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('cache_size', 'SQLITE_CACHE_SIZE'),
+    ('temp_store', 'SQLITE_TEMP_STORE'),
+)
+
+
+def is_file_sqlite(engine):
+    return engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:')
+
+
+def apply_sqlite_profile(engine, config):
+    """Aplica el perfil de SQLite a cada conexión nueva de `engine`.
+
+    WAL deja leer mientras otro proceso escribe, synchronous=NORMAL hace un
+    fsync por checkpoint en lugar de uno por commit, y busy_timeout hace que
+    un writer espere el lock en lugar de fallar con "database is locked".
+    No hace nada si el engine no es un archivo SQLite.
+    """
+    if not is_file_sqlite(engine):
+        return False
+
+    pragmas = [(name, config[key]) for name, key in PRAGMAS if config.get(key) is not None]
+    if engine.url.query.get('mode') == 'ro':
+        # Réplica de solo lectura: el journal_mode es del archivo y no se puede cambiar
+        pragmas = [(name, value) for name, value in pragmas if name != 'journal_mode']
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return True
+
+
+def checkpoint(engine, mode='TRUNCATE'):
+    """Pasa el WAL a la base y lo trunca. Devuelve (busy, páginas en el log, páginas copiadas)."""
+    with engine.connect() as conn:
+        return tuple(conn.execute(text(f'PRAGMA wal_checkpoint({mode})')).one())
+
+
+def analyze(engine):
+    """Actualiza las estadísticas que usa el planner para elegir índices."""
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+        conn.execute(text('PRAGMA optimize'))
@@ -0,0 +1,129 @@
+# tests/api/test_asgi.py
+# Entrypoint ASGI: /api/async en el event loop con pool persistente, el resto a Flask
+import pytest
+from sqlalchemy import event
+
+from app.auth.models import User
+from app.extensions import db
+from app.instrumentation import db_query_count
+
+SUBS = "/api/async/subscriptions"
+
+
+@pytest.fixture(scope="module")
+def asgi_app(make_file_app):
+    return make_file_app(ASYNC_POOL_SIZE=2, ASYNC_POOL_MAX_OVERFLOW=0, JWT_USER_ID_CLAIM=True)
+
+
+@pytest.fixture(scope="module")
+def client(asgi_app, asgi_client):
+    return asgi_client(asgi_app)
+
+
+@pytest.fixture
+def async_engine(asgi_app, client):
+    """Engine sync del engine async de la principal (lo abrió el lifespan)."""
+    [engine] = asgi_app.extensions["async_engines"]._engines.values()
+    return engine.sync_engine
+
+
+@pytest.fixture
+def signup(client, register_user):
+    return lambda phone=None: register_user(client, phone, prefix="/api/async")
+
+
+def listen(engine, name, fn):
+    event.listen(engine, name, fn)
+    return lambda: event.remove(engine, name, fn)
+
+
+def test_requests_reuse_the_pooled_connection(client, async_engine, signup):
+    connects = []
+    stop = listen(async_engine, "connect", lambda *args: connects.append(1))
+    try:
+        headers = signup()
+        for _ in range(5):
+            assert client.get(SUBS, headers=headers).status_code == 200
+    finally:
+        stop()
+
+    # El lifespan abrió la conexión y todas las requests la reusan
+    assert connects == []
+    assert async_engine.pool.checkedin() == 1
+
+
+def test_concurrent_requests_share_the_loop(client, async_engine, signup):
+    headers = signup()
+    state = {"out": 0, "max": 0}
+
+    def checkout(*args):
+        state["out"] += 1
+        state["max"] = max(state["max"], state["out"])
+
+    def checkin(*args):
+        state["out"] -= 1
+
+    stops = [listen(async_engine, "checkout", checkout), listen(async_engine, "checkin", checkin)]
+    try:
+        responses = client.gather(*[
+            ("PUT", SUBS, {"json": {"categories": [category]}, "headers": headers})
+            for category in ["deportes", "cultura", "economía", "deportes"] * 3
+        ])
+    finally:
+        for stop in stops:
+            stop()
+
+    assert {response.status_code for response in responses} == {200}
+    # Mientras una request esperaba a la base el loop atendió otra; nunca más que el pool
+    assert state["max"] == 2
+
+
+def test_errors_match_the_sync_routes(client, asgi_app):
+    sync = asgi_app.test_client()
+
+    for method, path in [("GET", "/subscriptions"), ("DELETE", "/subscriptions/deportes")]:
+        expected = sync.open(f"/api{path}", method=method)
+        response = client.open(method, f"/api/async{path}")
+        assert response.status_code == expected.status_code == 401
+        assert response.get_json() == expected.get_json()
+
+    response = client.post("/api/async/auth/login", json={"phone_number": "+1"})
+    assert response.status_code == 400
+    assert client.get("/api/async/no-existe").status_code == 404
+    assert client.post("/api/async/subscriptions/deportes").status_code == 405
+
+
+def test_deleted_user_token_is_rejected(client, asgi_app, signup):
+    headers = signup("+61000000001")
+    with asgi_app.app_context():
+        db.session.execute(db.delete(User).where(User.phone_number == "+61000000001"))
+        db.session.commit()
+
+    assert client.get(SUBS, headers=headers).status_code == 404
+    assert client.put(SUBS, json={"categories": ["deportes"]}, headers=headers).status_code == 404
+
+
+def test_other_routes_go_to_flask(client):
+    response = client.get("/api/subscriptions/categories")
+
+    assert response.status_code == 200
+    assert "deportes" in response.get_json()["categories"]
+    assert client.get("/internal/ready").status_code == 200  # el lifespan corrió warm_up
+
+
+def test_statements_are_measured(client, asgi_app, signup):
+    headers = signup()
+    asgi_app.config["REQUEST_METRICS_ENABLED"] = True
+    try:
+        response = client.get(SUBS, headers=headers)
+    finally:
+        asgi_app.config["REQUEST_METRICS_ENABLED"] = False
+
+    assert db_query_count(response) == 1
+
+
+def test_sharded_app_has_no_async_routes(make_file_app, asgi_client, tmp_path):
+    app = make_file_app(SHARD_DATABASE_URLS=[f"sqlite:///{tmp_path / 'shard0.db'}"])
+    client = asgi_client(app)
+
+    assert client.get(SUBS).status_code == 404
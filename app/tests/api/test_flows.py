@@ -0,0 +1,98 @@
+# tests/api/test_flows.py
+# Los mismos flujos de auth y suscripciones contra las vistas sync (/api, WSGI)
+# y las async (/api/async, por el entrypoint ASGI), sobre una base en archivo
+import pytest
+
+
+@pytest.fixture(scope="module", params=["sync", "async"])
+def api(request, make_file_app, asgi_client):
+    app = make_file_app()
+    if request.param == "sync":
+        return app.test_client(), "/api"
+    return asgi_client(app), "/api/async"
+
+
+@pytest.fixture
+def client(api):
+    return api[0]
+
+
+@pytest.fixture
+def prefix(api):
+    return api[1]
+
+
+@pytest.fixture
+def signup(client, prefix, register_user):
+    def signup(phone=None):
+        return register_user(client, phone, prefix=prefix)
+    return signup
+
+
+def test_register_duplicate_and_login(client, prefix, signup):
+    phone = "+60000000001"
+    signup(phone)
+
+    duplicate = client.post(f"{prefix}/auth/register", json={"phone_number": phone, "password": "password123"})
+    assert duplicate.status_code == 400
+
+    ok = client.post(f"{prefix}/auth/login", json={"phone_number": phone, "password": "password123"})
+    assert ok.status_code == 200
+    assert ok.get_json()["user"] == {"phone_number": phone}
+    assert ok.get_json()["refresh_token"]
+
+    wrong = client.post(f"{prefix}/auth/login", json={"phone_number": phone, "password": "incorrecta"})
+    assert wrong.status_code == 401
+
+
+def test_create_get_and_etag(client, prefix, signup):
+    headers = signup()
+
+    created = client.post(f"{prefix}/subscriptions", json={"categories": ["deportes", "cultura"]}, headers=headers)
+    assert created.status_code == 201
+    assert created.get_json() == [{"category": "deportes"}, {"category": "cultura"}]
+
+    again = client.post(f"{prefix}/subscriptions", json={"categories": ["deportes"]}, headers=headers)
+    assert again.status_code == 400
+
+    listed = client.get(f"{prefix}/subscriptions", headers=headers)
+    assert listed.get_json() == [{"category": "deportes"}, {"category": "cultura"}]
+    etag = listed.headers["ETag"]
+
+    cached = client.get(f"{prefix}/subscriptions", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_invalid_category(client, prefix, signup):
+    headers = signup()
+
+    response = client.post(f"{prefix}/subscriptions", json={"categories": ["invalida"]}, headers=headers)
+
+    assert response.status_code == 400
+
+
+def test_put_reports_changes(client, prefix, signup):
+    headers = signup()
+
+    first = client.put(f"{prefix}/subscriptions", json={"categories": ["economía"]}, headers=headers)
+    second = client.put(f"{prefix}/subscriptions", json={"categories": ["economía"]}, headers=headers)
+
+    assert first.get_json() == [{"category": "economía"}]
+    assert first.headers["X-Subscriptions-Changed"] == "true"
+    assert second.headers["X-Subscriptions-Changed"] == "false"
+
+
+def test_patch_and_delete(client, prefix, signup):
+    headers = signup()
+    client.post(f"{prefix}/subscriptions", json={"categories": ["deportes"]}, headers=headers)
+
+    patched = client.patch(f"{prefix}/subscriptions", json={"add": ["cultura"], "remove": ["deportes"]}, headers=headers)
+    assert patched.get_json() == {
+        "added": ["cultura"],
+        "removed": ["deportes"],
+        "subscriptions": [{"category": "cultura"}]
+    }
+
+    assert client.delete(f"{prefix}/subscriptions/cultura", headers=headers).status_code == 200
+    assert client.delete(f"{prefix}/subscriptions/cultura", headers=headers).status_code == 404
+    assert client.get(f"{prefix}/subscriptions", headers=headers).get_json() == []
@@ -0,0 +1,61 @@
+# tests/api/test_request_metrics.py
+# Headers X-DB-Queries / Server-Timing y el fixture query_budget
+import pytest
+
+from app.instrumentation import RequestMetrics, parse_server_timing
+
+
+def test_headers_are_off_by_default(test_client, auth_headers):
+    response = test_client.get("/api/subscriptions", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert "X-DB-Queries" not in response.headers
+    assert "Server-Timing" not in response.headers
+
+
+def test_get_reports_queries_and_phases(test_client, auth_headers, query_budget):
+    response = test_client.get("/api/subscriptions", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert query_budget(response, 2) >= 1
+    timings = parse_server_timing(response.headers["Server-Timing"])
+    assert {"db", "jwt", "serialize", "total"} <= set(timings)
+    assert timings["total"] >= timings["db"]
+
+
+def test_validation_phase_is_measured(test_client, auth_headers, query_budget):
+    response = test_client.post(
+        "/api/subscriptions", json={"categories": ["invalida"]}, headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert "validation" in parse_server_timing(response.headers["Server-Timing"])
+
+
+def test_categories_need_no_queries(test_client, query_budget):
+    test_client.get("/api/subscriptions/categories")  # carga el catálogo
+    response = test_client.get("/api/subscriptions/categories")
+
+    assert query_budget(response, 0) == 0
+
+
+def test_budget_fails_when_exceeded(test_client, auth_headers, query_budget):
+    test_client.post("/api/subscriptions", json={"categories": ["deportes"]}, headers=auth_headers)
+    response = test_client.get("/api/subscriptions", headers=auth_headers)
+
+    with pytest.raises(AssertionError, match="presupuesto"):
+        query_budget(response, 0)
+
+
+def test_server_timing_format():
+    ticks = iter([0.0, 0.010, 0.025, 0.050])
+    metrics = RequestMetrics(clock=lambda: next(ticks))
+    metrics.statements = 3
+    metrics.db_time = 0.004
+    metrics.start_phase("jwt")
+    metrics.end_phase("jwt")
+
+    header = metrics.server_timing()
+
+    assert header == 'db;dur=4.00;desc="3 queries", jwt;dur=15.00, total;dur=50.00'
+    assert parse_server_timing(header) == {"db": 4.0, "jwt": 15.0, "total": 50.0}
@@ -0,0 +1,89 @@
+# tests/api/test_statement_counts.py
+# Cantidad de sentencias SQL por endpoint para que no crezca
+import pytest
+from app.instrumentation import db_query_count
+from app.services.cache import user_cache
+
+SUBS = "/api/subscriptions"
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["uid-claim", "phone-only"])
+def counted_app(request, make_file_app):
+    return make_file_app(
+        JWT_USER_ID_CLAIM=request.param,
+        CATEGORY_CATALOG_REFRESH=3600,
+        REQUEST_METRICS_ENABLED=True
+    )
+
+
+@pytest.fixture
+def headers(counted_app, register_user):
+    client = counted_app.test_client()
+    headers = register_user(client)
+    # Deja cargados el catálogo y la cache de usuarios
+    client.get(SUBS, headers=headers)
+    return headers
+
+
+def run(client, method, url, **kwargs):
+    response = client.open(url, method=method, **kwargs)
+    assert response.status_code < 500, response.get_json()
+    return db_query_count(response), response
+
+
+def test_get_is_one_statement(counted_app, headers):
+    client = counted_app.test_client()
+    client.post(SUBS, json={"categories": ["deportes", "cultura"]}, headers=headers)
+
+    count, response = run(client, "GET", SUBS, headers=headers)
+    assert count == 1
+
+    count, response = run(client, "GET", SUBS, headers={**headers, "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert count == 1
+
+
+def test_cold_user_cache(counted_app, headers):
+    user_cache.clear()
+
+    count, response = run(counted_app.test_client(), "GET", SUBS, headers=headers)
+
+    assert response.status_code == 200
+    # Con "uid" no hay búsqueda por teléfono: el usuario se verifica en la misma consulta
+    assert count == (1 if counted_app.config["JWT_USER_ID_CLAIM"] else 2)
+
+
+def test_post_is_insert_plus_version(counted_app, headers):
+    count, _ = run(counted_app.test_client(), "POST", SUBS, json={"categories": ["deportes"]}, headers=headers)
+
+    assert count == 2
+
+
+def test_noop_put_is_a_single_read(counted_app, headers):
+    client = counted_app.test_client()
+    client.post(SUBS, json={"categories": ["deportes"]}, headers=headers)
+
+    count, response = run(client, "PUT", SUBS, json={"categories": ["cultura"]}, headers=headers)
+    assert response.headers["X-Subscriptions-Changed"] == "true"
+    assert count == 4  # lectura, DELETE, INSERT, versión
+
+    count, response = run(client, "PUT", SUBS, json={"categories": ["cultura"]}, headers=headers)
+    assert response.headers["X-Subscriptions-Changed"] == "false"
+    assert count == 1  # solo la lectura: sin cambios no se escribe
+
+
+def test_patch_and_delete(counted_app, headers):
+    client = counted_app.test_client()
+    client.post(SUBS, json={"categories": ["deportes"]}, headers=headers)
+
+    count, _ = run(client, "PATCH", SUBS, json={"add": ["cultura"], "remove": ["deportes"]}, headers=headers)
+    assert count == 4  # versión, DELETE, INSERT, estado final
+
+    count, _ = run(client, "DELETE", f"{SUBS}/cultura", headers=headers)
+    assert count == 2
+
+
+def test_categories_come_from_memory(counted_app, headers):
+    count, _ = run(counted_app.test_client(), "GET", "/api/subscriptions/categories")
+
+    assert count == 0
@@ -0,0 +1,82 @@
+# tests/auth/test_hashing.py
+import pytest
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.auth.hashing import PasswordHasher, build_method, password_hasher
+from app.auth.models import User
+from app.auth.services import AuthService
+from app.errors.exceptions import ServiceUnavailableError
+
+
+def test_build_method():
+    assert build_method("pbkdf2:sha256", 1000) == "pbkdf2:sha256:1000"
+    assert build_method("scrypt", 16384) == "scrypt:16384:8:1"
+    with pytest.raises(ValueError):
+        build_method("md5", 1)
+
+
+def test_hash_uses_configured_policy():
+    hasher = PasswordHasher()
+    hasher.configure({"PASSWORD_HASH_ALGORITHM": "pbkdf2:sha256", "PASSWORD_HASH_ITERATIONS": 1500})
+
+    pwhash = hasher.hash("secret123")
+
+    assert pwhash.startswith("pbkdf2:sha256:1500$")
+    assert hasher.verify(pwhash, "secret123")
+    assert not hasher.verify(pwhash, "otra")
+    assert not hasher.needs_rehash(pwhash)
+    assert hasher.needs_rehash(generate_password_hash("secret123", method="pbkdf2:sha256:500"))
+
+
+def test_default_policy_keeps_werkzeug_hashes():
+    hasher = PasswordHasher()
+    hasher.configure({})
+
+    assert not hasher.needs_rehash(generate_password_hash("secret123"))
+
+
+@pytest.mark.clean_users
+def test_login_rehashes_outdated_hash(test_app):
+    with test_app.app_context():
+        user = User(
+            phone_number="+6000000001",
+            password_hash=generate_password_hash("supersecret", method="pbkdf2:sha256:500")
+        )
+        db.session.add(user)
+        db.session.commit()
+
+        AuthService.authenticate_user("+6000000001", "supersecret")
+
+        db.session.refresh(user)
+        assert user.password_hash.startswith(password_hasher.method + "$")
+        assert user.check_password("supersecret")
+
+
+def test_pool_hashes_in_worker_process():
+    hasher = PasswordHasher()
+    hasher.configure({
+        "PASSWORD_HASH_ALGORITHM": "pbkdf2:sha256",
+        "PASSWORD_HASH_ITERATIONS": 1000,
+        "PASSWORD_HASH_POOL_SIZE": 1
+    })
+    try:
+        pwhash = hasher.hash("secret123")
+        assert hasher.verify(pwhash, "secret123")
+    finally:
+        hasher.shutdown()
+
+
+def test_pool_rejects_when_saturated():
+    hasher = PasswordHasher()
+    hasher.configure({
+        "PASSWORD_HASH_POOL_SIZE": 1,
+        "PASSWORD_HASH_MAX_PENDING": 1,
+        "PASSWORD_HASH_QUEUE_TIMEOUT": 0.01
+    })
+    hasher._slots.acquire()  # simula un hash en curso
+    try:
+        with pytest.raises(ServiceUnavailableError):
+            hasher.hash("secret123")
+    finally:
+        hasher._slots.release()
+        hasher.shutdown()
@@ -0,0 +1,108 @@
+# tests/auth/test_identity.py
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from app.extensions import db
+from app.auth.models import User
+from app.auth.services import AuthService, USER_ID_CLAIM
+from app.models import Subscription
+from app.services.cache import user_cache
+from app.services.subscription import SubscriptionService
+
+
+@pytest.fixture
+def user_id_claim(test_app, monkeypatch):
+    monkeypatch.setitem(test_app.config, "JWT_USER_ID_CLAIM", True)
+
+
+@pytest.fixture
+def user(db):
+    user = User(phone_number="+5000000001")
+    user.set_password("testpass")
+    db.session.add(user)
+    db.session.commit()
+    SubscriptionService.create_subscription(user, ["deportes"])
+    yield user
+    db.session.rollback()
+    db.session.execute(db.delete(Subscription))
+    db.session.execute(db.delete(User))
+    db.session.commit()
+
+
+def test_issue_access_token_without_claim_by_default(test_app, user):
+    with test_app.app_context():
+        claims = decode_token(AuthService.issue_access_token(user))
+        assert claims["sub"] == user.phone_number
+        assert USER_ID_CLAIM not in claims
+
+
+def test_issue_access_token_with_user_id_claim(test_app, user, user_id_claim):
+    with test_app.app_context():
+        claims = decode_token(AuthService.issue_access_token(user))
+        assert claims["sub"] == user.phone_number
+        assert claims[USER_ID_CLAIM] == user.id
+
+
+def test_user_id_token_skips_the_phone_lookup(test_app, test_client, user, user_id_claim, query_budget):
+    with test_app.app_context():
+        token = AuthService.issue_access_token(user)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.get("/api/subscriptions", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"category": "deportes"}]
+    # Cache fría: la existencia se verifica en la misma consulta de suscripciones
+    query_budget(response, 1)
+    assert user_cache.stats()["misses"] == 0
+
+
+def test_user_id_token_of_deleted_user_is_rejected(test_app, test_client, user, user_id_claim):
+    with test_app.app_context():
+        token = AuthService.issue_access_token(user)
+        db.session.execute(db.delete(Subscription))
+        db.session.execute(db.delete(User).where(User.id == user.id))
+        db.session.commit()
+        db.session.expunge_all()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.post("/api/subscriptions", json={"categories": ["cultura"]}, headers=headers)
+
+    assert response.status_code == 404
+    assert db.session.execute(db.select(Subscription)).all() == []
+    assert test_client.get("/api/subscriptions", headers=headers).status_code == 404
+    assert test_client.get("/api/subscriptions", headers={**headers, "If-None-Match": "*"}).status_code == 404
+    assert test_client.put("/api/subscriptions", json={"categories": []}, headers=headers).status_code == 404
+    assert test_client.patch("/api/subscriptions", json={"add": ["cultura"]}, headers=headers).status_code == 404
+    assert test_client.delete("/api/subscriptions/deportes", headers=headers).status_code == 404
+    assert db.session.execute(db.select(Subscription)).all() == []
+
+
+def test_user_id_token_not_valid_for_re_registered_phone(test_app, test_client, user, user_id_claim):
+    with test_app.app_context():
+        token = AuthService.issue_access_token(user)
+        phone_number = user.phone_number
+        db.session.execute(db.delete(Subscription))
+        db.session.execute(db.delete(User).where(User.id == user.id))
+        db.session.commit()
+        db.session.expunge_all()
+        # Otro alta antes, para que el teléfono no vuelva con el mismo id
+        AuthService.register_user("+5000000002", "otra-clave")
+        AuthService.register_user(phone_number, "otra-clave")
+
+    response = test_client.get("/api/subscriptions", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 404
+
+
+def test_legacy_phone_token_still_works(test_app, test_client, user, user_id_claim):
+    with test_app.app_context():
+        token = create_access_token(identity=user.phone_number)
+
+    response = test_client.get(
+        "/api/subscriptions",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"category": "deportes"}]
+    assert user_cache.stats()["misses"] == 1
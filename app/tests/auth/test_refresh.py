@@ -0,0 +1,106 @@
+# tests/auth/test_refresh.py
+from datetime import datetime
+
+import pytest
+from app.extensions import db
+from app.models import RefreshToken
+from app.services.cache import revoked_refresh_tokens
+
+PHONE = "+7000000001"
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def tokens(test_client):
+    response = test_client.post("api/auth/register", json={
+        "phone_number": PHONE,
+        "password": PASSWORD
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def refresh(test_client, refresh_token):
+    return test_client.post(
+        "api/auth/refresh",
+        headers={"Authorization": f"Bearer {refresh_token}"}
+    )
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.clean_users
+def test_refresh_rotates_tokens(test_client, tokens, mocker):
+    check_password = mocker.patch("app.auth.models.User.check_password")
+
+    response = refresh(test_client, tokens["refresh_token"])
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data["refresh_token"] != tokens["refresh_token"]
+    check_password.assert_not_called()
+
+    # El access token nuevo sirve para las rutas protegidas
+    response = test_client.get("/api/subscriptions", headers=bearer(data["access_token"]))
+    assert response.status_code == 200
+
+    # El refresh token usado quedó revocado en la base y en memoria
+    assert RefreshToken.query.filter_by(revoked=True).count() == 1
+    assert revoked_refresh_tokens.stats()["size"] == 1
+
+
+@pytest.mark.clean_users
+def test_refresh_token_reuse_revokes_family(test_client, tokens):
+    rotated = refresh(test_client, tokens["refresh_token"]).get_json()
+
+    reused = refresh(test_client, tokens["refresh_token"])
+    assert reused.status_code == 401
+    assert reused.get_json()["error"]["message"] == "Refresh token revocado"
+
+    # El token emitido en la rotación también quedó revocado
+    assert RefreshToken.query.filter_by(revoked=False).count() == 0
+    assert refresh(test_client, rotated["refresh_token"]).status_code == 401
+
+
+@pytest.mark.clean_users
+def test_refresh_token_reuse_detected_from_database(test_client, tokens):
+    refresh(test_client, tokens["refresh_token"])
+    # Simula otro worker, que no tiene el jti en su cache
+    revoked_refresh_tokens.clear()
+
+    reused = refresh(test_client, tokens["refresh_token"])
+
+    assert reused.status_code == 401
+    assert RefreshToken.query.filter_by(revoked=False).count() == 0
+
+
+@pytest.mark.clean_users
+def test_access_token_cannot_refresh(test_client, tokens):
+    response = refresh(test_client, tokens["access_token"])
+    assert response.status_code in (401, 422)
+
+    response = test_client.get("/api/subscriptions", headers=bearer(tokens["refresh_token"]))
+    assert response.status_code in (401, 422)
+
+
+def test_prune_command_deletes_expired_tokens(make_file_app, register_user):
+    app = make_file_app()
+    client = app.test_client()
+    register_user(client)
+    register_user(client)
+
+    with app.app_context():
+        expired = db.session.execute(db.select(RefreshToken.jti)).scalars().first()
+        db.session.execute(
+            db.update(RefreshToken).where(RefreshToken.jti == expired).values(expires_at=datetime(2000, 1, 1))
+        )
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["tokens", "prune"])
+
+        assert result.exit_code == 0, result.output
+        assert "borrados: 1" in result.output
+        remaining = db.session.execute(db.select(RefreshToken.jti)).scalars().all()
+        assert len(remaining) == 1 and expired not in remaining
@@ -0,0 +1,57 @@
+# tests/benchmarks/test_endpoints.py
+# La suite de benchmarks corre completa con un dataset mínimo y el gate compara bien
+import json
+
+from benchmarks.endpoints import DEFAULT_BASELINE, compare, run_suite
+
+ROUTES = {
+    "auth.register", "auth.login", "subscription.get_categories", "subscription.get_subscriptions",
+    "subscription.create_subscription", "subscription.update_subscriptions",
+    "subscription.patch_subscriptions", "subscription.delete_subscription",
+}
+
+
+def stats(p95_ms, throughput, errors=0):
+    return {"requests": 10, "errors": errors, "throughput": throughput,
+            "p50_ms": p95_ms / 2, "p95_ms": p95_ms, "p99_ms": p95_ms * 2}
+
+
+def test_every_route_is_measured_without_errors():
+    results = run_suite(users=3, subscriptions=5, requests=4, auth_requests=2, warmup=1, rounds=2)
+
+    assert set(results["routes"]) == ROUTES
+    for route, route_stats in results["routes"].items():
+        assert route_stats["errors"] == 0, route
+        assert route_stats["requests"] >= 4, route
+        assert route_stats["p50_ms"] <= route_stats["p95_ms"] <= route_stats["p99_ms"]
+    assert results["meta"]["rounds"] == 2
+
+
+def test_committed_baseline_covers_every_route():
+    with open(DEFAULT_BASELINE, encoding="utf-8") as f:
+        assert set(json.load(f)["routes"]) == ROUTES
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"routes": {"a": stats(10, 100), "b": stats(10, 100), "c": stats(10, 100)}}
+    results = {"routes": {
+        "a": stats(12, 90),               # dentro del 25%
+        "b": stats(14, 70),               # p95 +40%, throughput -30%
+        "d": stats(1, 1000, errors=1),    # ruta nueva: no se compara
+    }}
+
+    regressions = compare(results, baseline, threshold=0.25)
+
+    assert regressions == [
+        "b: p95_ms 10 -> 14 (+40%)",
+        "b: throughput 100 -> 70 (-30%)",
+        "c: no se midió",
+    ]
+
+
+def test_compare_flags_unexpected_statuses():
+    baseline = {"routes": {"a": stats(10, 100)}}
+
+    assert compare({"routes": {"a": stats(10, 100, errors=2)}}, baseline, 0.25) == [
+        "a: 2 respuestas con status inesperado"
+    ]
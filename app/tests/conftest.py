@@ -1,9 +1,21 @@
+import asyncio
+import itertools
+import os
+from json import dumps
+
 import pytest
+from flask import Response
 from app import create_app, db as _db
-from flask_jwt_extended import create_access_token
+from app.asgi import AsgiApp
 from app.auth.models import User
-from app.models import Subscription
-import random
+from app.models import Subscription, RefreshToken
+from app.services.cache import user_cache, revoked_refresh_tokens
+from app.services.catalog import get_catalog, seed_categories
+from app.schemas.subscription_schema import VALID_CATEGORIES
+from app.instrumentation import db_query_count
+
+# Teléfonos únicos para toda la sesión de tests (varios módulos comparten la app)
+_phone_numbers = itertools.count()
 
 # Este hook le avisa a pytest que usamos un marker custom
 def pytest_configure(config):
@@ -14,6 +26,7 @@ def clean_users_marker(request,db):
     if "clean_users" in request.keywords:
         # Limpiar todas las tablas relevantes
         db.session.execute(db.delete(Subscription))
+        db.session.execute(db.delete(RefreshToken))
         db.session.execute(db.delete(User))
         db.session.commit()
 
@@ -28,6 +41,9 @@ def db(test_app):
     """Crea y destruye la base de datos para los tests."""
     with test_app.app_context():
         _db.create_all()
+        seed_categories(VALID_CATEGORIES)
+        # Catálogo cargado de entrada: la primera request medida no paga su carga
+        get_catalog().names()
         yield _db
         _db.session.remove()
         _db.drop_all()
@@ -35,6 +51,8 @@ def db(test_app):
 @pytest.fixture(scope="function", autouse=True)
 def session(db):
     """Rollback automático para cada test (aislamiento)."""
+    user_cache.clear()
+    revoked_refresh_tokens.clear()
     db.session.begin_nested()
     yield db.session
     db.session.rollback()
@@ -44,6 +62,25 @@ def test_client(test_app):
     """Cliente para hacer requests de prueba."""
     return test_app.test_client()
 
+@pytest.fixture
+def query_budget(test_app):
+    """Activa X-DB-Queries/Server-Timing y devuelve un chequeo de presupuesto.
+
+    Uso: query_budget(response, 2) falla si la request corrió más de 2
+    sentencias SQL; devuelve la cantidad medida. Refresca el catálogo antes
+    para que su chequeo periódico no caiga dentro de la request medida.
+    """
+    get_catalog().names()
+    test_app.config['REQUEST_METRICS_ENABLED'] = True
+
+    def check(response, max_queries):
+        count = db_query_count(response)
+        assert count <= max_queries, f"{count} queries (presupuesto: {max_queries})"
+        return count
+
+    yield check
+    test_app.config['REQUEST_METRICS_ENABLED'] = False
+
 @pytest.fixture
 def new_user(db):
     """Usuario de prueba para login, etc."""
@@ -53,13 +90,160 @@ def new_user(db):
     db.session.commit()
     return user
 
+@pytest.fixture(scope="session")
+def make_file_app(tmp_path_factory):
+    """Fábrica de apps sobre un SQLite en archivo, con tablas y categorías.
+
+    Para tests que necesitan config propia o que varias conexiones (o
+    engines) vean la misma base, cosa que la base en memoria no permite.
+    """
+    def make(**overrides):
+        path = tmp_path_factory.mktemp("app") / "app.db"
+        app = create_app("testing", {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.abspath(path)}",
+            **overrides
+        })
+        with app.app_context():
+            _db.create_all()
+            seed_categories(VALID_CATEGORIES)
+        return app
+
+    return make
+
+@pytest.fixture(scope="session")
+def register_user():
+    """register_user(client, phone=None, prefix="/api") registra por la API y
+    devuelve los headers con el access token."""
+    def register(client, phone=None, prefix="/api"):
+        response = client.post(f"{prefix}/auth/register", json={
+            "phone_number": phone or f"+79{next(_phone_numbers):09d}",
+            "password": "password123"
+        })
+        assert response.status_code == 201, response.get_json()
+        return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+    return register
+
 @pytest.fixture
-def access_token(test_client):
-    """Genera un JWT con usuario único para cada test"""
-    phone = f"+1{random.randint(100000000, 999999999)}"  # Número único
-    user = User(phone_number=phone)
-    user.set_password("test123")
-    db.session.add(user)
-    db.session.commit()
-    return create_access_token(identity=phone)
+def auth_headers(test_client, register_user):
+    """Headers con el access token de un usuario nuevo registrado en test_app."""
+    return register_user(test_client)
+
+
+class AsgiClient:
+    """Cliente mínimo de una app ASGI, con la interfaz del test client de Flask.
+
+    Tiene su propio event loop, que vive lo que el cliente (como el de un
+    servidor): start() y close() mandan el lifespan, así que el pool async
+    sigue abierto entre requests. gather() manda varias a la vez.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.loop = asyncio.new_event_loop()
+        self._lifespan = None
+        self._lifespan_task = None
+        self._sent = None
+
+    def start(self):
+        self._lifespan = asyncio.Queue()
+        sent = asyncio.Queue()
+
+        async def receive():
+            return await self._lifespan.get()
+
+        async def send(message):
+            await sent.put(message)
+
+        async def startup():
+            self._lifespan_task = asyncio.ensure_future(self.application({"type": "lifespan"}, receive, send))
+            await self._lifespan.put({"type": "lifespan.startup"})
+            assert (await sent.get())["type"] == "lifespan.startup.complete"
+
+        self._sent = sent
+        self.loop.run_until_complete(startup())
+
+    def close(self):
+        async def shutdown():
+            await self._lifespan.put({"type": "lifespan.shutdown"})
+            assert (await self._sent.get())["type"] == "lifespan.shutdown.complete"
+            await self._lifespan_task
+
+        try:
+            self.loop.run_until_complete(shutdown())
+        finally:
+            self.loop.close()
+
+    async def request(self, method, path, json=None, headers=None):
+        body = b""
+        headers = dict(headers or {})
+        if json is not None:
+            body = dumps(json).encode()
+            headers["Content-Type"] = "application/json"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "client": ("127.0.0.1", 5000), "server": ("localhost", 80),
+            "headers": [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers.items()]
+        }
+        messages = [{"type": "http.request", "body": body}]
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await self.application(scope, receive, send)
+        start, *chunks = sent
+        return Response(
+            b"".join(chunk.get("body", b"") for chunk in chunks),
+            status=start["status"],
+            headers=[(name.decode("latin1"), value.decode("latin1")) for name, value in start["headers"]]
+        )
+
+    def gather(self, *requests):
+        """Corre varias requests (method, path, kwargs) a la vez en el loop."""
+        async def run():
+            return await asyncio.gather(*[
+                self.request(method, path, **kwargs) for method, path, kwargs in requests
+            ])
+
+        return self.loop.run_until_complete(run())
+
+    def open(self, method, path, **kwargs):
+        return self.loop.run_until_complete(self.request(method, path, **kwargs))
+
+    def get(self, path, **kwargs):
+        return self.open("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.open("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.open("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.open("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.open("DELETE", path, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def asgi_client():
+    """asgi_client(app) monta `app` detrás de AsgiApp (app/asgi.py) y devuelve
+    un AsgiClient ya arrancado; se cierra al terminar el módulo."""
+    clients = []
+
+    def make(app):
+        client = AsgiClient(AsgiApp(app))
+        client.start()
+        clients.append(client)
+        return client
 
+    yield make
+    for client in clients:
+        client.close()
@@ -0,0 +1,135 @@
+# tests/demo/test_routing.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+from app.binds import DEMO_BIND, get_engine
+from app.extensions import db
+
+DEMO = {"X-Demo-Mode": "true"}
+
+
+@pytest.fixture
+def make_app(make_file_app, tmp_path):
+    def make(**overrides):
+        return make_file_app(**{
+            "DEMO_DATABASE_URL": f"sqlite:///{tmp_path / 'demo.db'}",
+            "DEMO_MODE_ENABLED": True,
+            **overrides
+        })
+    return make
+
+
+def phones(app, bind=None):
+    with app.app_context():
+        engine = get_engine(bind) if bind else db.engine
+        with engine.connect() as conn:
+            return set(conn.execute(text("SELECT phone_number FROM users")).scalars())
+
+
+def register(client, phone, headers=None):
+    return client.post("/api/auth/register", json={
+        "phone_number": phone,
+        "password": "password123"
+    }, headers=headers or {})
+
+
+def test_demo_header_routes_to_demo_database(make_app):
+    app = make_app()
+    client = app.test_client()
+
+    assert register(client, "+10000000001", DEMO).status_code == 201
+    assert register(client, "+10000000002").status_code == 201
+
+    assert phones(app) == {"+10000000002"}
+    assert phones(app, DEMO_BIND) == {"+10000000001"}
+
+
+def test_demo_database_shares_category_ids(make_app):
+    app = make_app()
+    client = app.test_client()
+
+    token = register(client, "+10000000003", DEMO).get_json()["access_token"]
+    response = client.post(
+        "/api/subscriptions",
+        json={"categories": ["deportes"]},
+        headers={**DEMO, "Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 201
+    response = client.get("/api/subscriptions", headers={**DEMO, "Authorization": f"Bearer {token}"})
+    assert response.get_json() == [{"category": "deportes"}]
+
+
+def test_concurrent_requests_do_not_share_sessions(make_app):
+    app = make_app()
+    client = app.test_client()
+
+    def run(i):
+        headers = DEMO if i % 2 else None
+        return register(client, f"+2000000{i:04d}", headers).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(run, range(40)))
+
+    assert set(statuses) == {201}
+    assert phones(app) == {f"+2000000{i:04d}" for i in range(0, 40, 2)}
+    assert phones(app, DEMO_BIND) == {f"+2000000{i:04d}" for i in range(1, 40, 2)}
+
+
+def test_demo_header_ignored_when_disabled(make_app):
+    app = make_app(DEMO_MODE_ENABLED=False)
+
+    assert register(app.test_client(), "+10000000004", DEMO).status_code == 201
+    assert phones(app) == {"+10000000004"}
+
+
+def bearer(token, headers=None):
+    return {**(headers or {}), "Authorization": f"Bearer {token}"}
+
+
+def test_demo_token_rejected_on_primary_and_back(make_app):
+    app = make_app()
+    client = app.test_client()
+    # El mismo teléfono registrado por dos personas distintas
+    prod_token = register(client, "+10000000005").get_json()["access_token"]
+    demo_token = register(client, "+10000000005", DEMO).get_json()["access_token"]
+
+    assert client.get("/api/subscriptions", headers=bearer(demo_token)).status_code == 401
+    assert client.get("/api/subscriptions", headers=bearer(prod_token, DEMO)).status_code == 401
+    assert client.get("/api/subscriptions", headers=bearer(prod_token)).status_code == 200
+    assert client.get("/api/subscriptions", headers=bearer(demo_token, DEMO)).status_code == 200
+
+
+def test_demo_refresh_token_rejected_on_primary(make_app):
+    app = make_app()
+    client = app.test_client()
+    refresh_token = register(client, "+10000000006", DEMO).get_json()["refresh_token"]
+
+    response = client.post("/api/auth/refresh", headers=bearer(refresh_token))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("uid_claim", [False, True], ids=["phone-only", "uid-claim"])
+def test_user_cache_is_per_database(make_app, uid_claim):
+    app = make_app(JWT_USER_ID_CLAIM=uid_claim)
+    client = app.test_client()
+    # Ids distintos para el mismo teléfono en cada base
+    register(client, "+10000000007")
+    register(client, "+10000000008")
+    prod_token = register(client, "+10000000009").get_json()["access_token"]
+    demo_token = register(client, "+10000000009", DEMO).get_json()["access_token"]
+
+    # Carga la cache con el usuario de la principal
+    client.post("/api/subscriptions", json={"categories": ["deportes"]}, headers=bearer(prod_token))
+    response = client.post("/api/subscriptions", json={"categories": ["cultura"]},
+                           headers=bearer(demo_token, DEMO))
+
+    assert response.status_code == 201
+    with app.app_context():
+        with get_engine(DEMO_BIND).connect() as conn:
+            rows = conn.execute(text(
+                "SELECT u.phone_number FROM subscriptions s JOIN users u ON u.id = s.user_id"
+            )).scalars().all()
+    assert rows == ["+10000000009"]
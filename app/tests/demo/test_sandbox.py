@@ -0,0 +1,181 @@
+# tests/demo/test_sandbox.py
+import os
+
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.sandbox import SANDBOX_COOKIE, SandboxPool
+from app.lifecycle import warm_up
+from app.services.catalog import seed_categories
+
+DEMO = {"X-Demo-Mode": "true"}
+
+
+@pytest.fixture
+def sandbox_app(make_file_app, tmp_path):
+    app = make_file_app(
+        DEMO_MODE_ENABLED=True,
+        DEMO_SANDBOX_ENABLED=True,
+        DEMO_SANDBOX_DIR=str(tmp_path / "sandboxes"),
+        DEMO_SANDBOX_POOL_SIZE=2,
+        DEMO_SANDBOX_SWEEP_INTERVAL=3600
+    )
+    yield app
+    app.extensions["sandbox_pool"].stop()
+
+
+def register(client, phone, headers=None):
+    return client.post("/api/auth/register", json={
+        "phone_number": phone,
+        "password": "password123"
+    }, headers=headers or {})
+
+
+def phones(path):
+    return {phone for phone, in _rows(path, "SELECT phone_number FROM users")}
+
+
+def _rows(path, sql):
+    from sqlalchemy import create_engine
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(sql)).all()
+    finally:
+        engine.dispose()
+
+
+def test_each_session_gets_its_own_sandbox(sandbox_app):
+    pool = sandbox_app.extensions["sandbox_pool"]
+    alice, bob = sandbox_app.test_client(), sandbox_app.test_client()
+
+    assert register(alice, "+30000000001", DEMO).status_code == 201
+    assert register(bob, "+30000000002", DEMO).status_code == 201
+    # La cookie mantiene a alice en el mismo sandbox
+    assert register(alice, "+30000000003", DEMO).status_code == 201
+
+    alice_id = alice.get_cookie(SANDBOX_COOKIE).value
+    bob_id = bob.get_cookie(SANDBOX_COOKIE).value
+    assert alice_id != bob_id
+    assert phones(pool.session_path(alice_id)) == {"+30000000001", "+30000000003"}
+    assert phones(pool.session_path(bob_id)) == {"+30000000002"}
+    assert phones(sandbox_app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///")) == set()
+
+
+def test_sandbox_is_seeded_with_categories(sandbox_app):
+    client = sandbox_app.test_client()
+    token = register(client, "+30000000004", DEMO).get_json()["access_token"]
+    headers = {**DEMO, "Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/subscriptions", json={"categories": ["deportes"]}, headers=headers).status_code == 201
+    assert client.get("/api/subscriptions", headers=headers).get_json() == [{"category": "deportes"}]
+
+
+def test_acquire_takes_a_prewarmed_clone(sandbox_app):
+    pool = sandbox_app.extensions["sandbox_pool"]
+    with sandbox_app.app_context():
+        pool.ensure_template(db)
+    pool.refill()
+    assert len(pool._ready_files()) == 2
+
+    session_id, path = pool.acquire()
+
+    assert len(pool._ready_files()) == 1
+    assert path == pool.session_path(session_id)
+    assert os.path.exists(path)
+
+
+def test_unknown_or_malformed_cookie_gets_a_new_sandbox(sandbox_app):
+    pool = sandbox_app.extensions["sandbox_pool"]
+    with sandbox_app.app_context():
+        pool.ensure_template(db)
+
+    session_id, path = pool.acquire("../../primary")
+
+    assert session_id != "../../primary"
+    assert os.path.dirname(path) == pool.directory
+
+
+def test_sweep_evicts_expired_and_least_recently_used(tmp_path, sandbox_app):
+    now = [10_000.0]
+    pool = SandboxPool(str(tmp_path / "sandboxes"), size=0, max_sessions=2, ttl=100, lease=5,
+                       clock=lambda: now[0])
+    with sandbox_app.app_context():
+        pool.ensure_template(db)
+
+    paths = []
+    for age in (500, 30, 20, 10):
+        _, path = pool.acquire()
+        os.utime(path, (now[0] - age, now[0] - age))
+        paths.append(path)
+
+    pool.sweep()
+
+    # El vencido (TTL) y el menos usado de los restantes (max_sessions=2)
+    assert [os.path.exists(p) for p in paths] == [False, False, True, True]
+
+
+def test_sweep_keeps_leased_sandboxes(tmp_path, sandbox_app):
+    now = [10_000.0]
+    pool = SandboxPool(str(tmp_path / "sandboxes"), size=0, max_sessions=1, ttl=100, lease=60,
+                       clock=lambda: now[0])
+    with sandbox_app.app_context():
+        pool.ensure_template(db)
+
+    paths = []
+    for age in (40, 20):
+        _, path = pool.acquire()
+        os.utime(path, (now[0] - age, now[0] - age))
+        paths.append(path)
+
+    pool.sweep()
+    # Sobran (max_sessions=1) pero se usaron dentro del lease: otro worker puede tenerlos abiertos
+    assert all(os.path.exists(p) for p in paths)
+
+    now[0] += 30
+    pool.sweep()
+    assert [os.path.exists(p) for p in paths] == [False, True]
+
+
+def test_template_is_rebuilt_when_the_catalog_changes(sandbox_app):
+    pool = sandbox_app.extensions["sandbox_pool"]
+    with sandbox_app.app_context():
+        pool.ensure_template(db)
+        pool.refill()
+        old_template, old_ready = pool.template_path, pool._ready_files()
+
+        seed_categories(["policiales"])
+        pool.ensure_template(db)
+
+    assert pool.template_path != old_template
+    assert pool._ready_files() == []
+    pool.refill()
+    _, path = pool.acquire()
+    assert "policiales" in {name for name, in _rows(path, "SELECT name FROM categories")}
+
+    pool.lease = 0
+    pool.sweep()
+    assert not os.path.exists(old_template)
+    assert not any(os.path.exists(p) for p in old_ready)
+
+
+def test_token_is_bound_to_its_sandbox(sandbox_app):
+    alice, mallory = sandbox_app.test_client(), sandbox_app.test_client()
+    token = register(alice, "+30000000005", DEMO).get_json()["access_token"]
+    # Mismo id de usuario (1) en el otro sandbox
+    register(mallory, "+30000000006", DEMO)
+    headers = {**DEMO, "Authorization": f"Bearer {token}"}
+
+    assert alice.get("/api/subscriptions", headers=headers).status_code == 200
+    assert mallory.get("/api/subscriptions", headers=headers).status_code == 401
+    assert alice.get("/api/subscriptions", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_warm_up_builds_the_template_before_traffic(sandbox_app):
+    pool = sandbox_app.extensions["sandbox_pool"]
+    assert not pool.ready
+
+    warm_up(sandbox_app)
+
+    assert pool.ready
+    assert os.path.exists(pool.template_path)
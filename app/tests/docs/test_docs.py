@@ -0,0 +1,62 @@
+# tests/docs/test_docs.py
+import gzip
+
+import pytest
+from app import create_app
+from flasgger.base import APISpecsView
+from app.routes.docs import warm_docs_cache
+
+UI_PATH = "/api/swagger/"
+
+
+@pytest.fixture
+def docs_client():
+    # App propia: la cache de documentos vive en las vistas de cada app
+    return create_app("testing").test_client()
+
+
+def test_apispec_is_built_once(docs_client, mocker):
+    loader = mocker.spy(APISpecsView, "get")
+
+    first = docs_client.get("/apispec.json")
+    second = docs_client.get("/apispec.json")
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert "/api/subscriptions" in first.get_json()["paths"]
+    assert loader.call_count == 1
+
+
+def test_apispec_gzip_etag_and_cache_control(docs_client):
+    response = docs_client.get("/apispec.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b'"openapi"' in gzip.decompress(response.data)
+    assert "max-age=" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    etag = response.headers["ETag"]
+    not_modified = docs_client.get("/apispec.json", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    # Los proxies que recomprimen devuelven el ETag como débil
+    assert docs_client.get("/apispec.json", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+
+def test_swagger_ui_is_patched_with_demo_header(docs_client):
+    response = docs_client.get(UI_PATH)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    html = response.get_data(as_text=True)
+    assert "req.headers['X-Demo-Mode'] = 'true'" in html
+    assert html.count("requestInterceptor") == 1
+
+
+def test_warm_docs_cache_builds_before_first_request(mocker):
+    app = create_app("testing")
+    warm_docs_cache(app)
+
+    loader = mocker.spy(APISpecsView, "get")
+    assert app.test_client().get("/apispec.json").status_code == 200
+    loader.assert_not_called()
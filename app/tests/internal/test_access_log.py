@@ -0,0 +1,112 @@
+# tests/internal/test_access_log.py
+import json
+import logging
+import queue
+
+import pytest
+
+from app.access_log import DroppingQueueHandler, JsonLinesHandler, _valid_request_id
+from app.lifecycle import shutdown
+
+
+@pytest.fixture
+def logged_app(make_file_app, tmp_path):
+    return make_file_app(
+        ACCESS_LOG_ENABLED=True,
+        ACCESS_LOG_FILE=str(tmp_path / "access.log"),
+        JWT_USER_ID_CLAIM=True
+    )
+
+
+def read_lines(app, tmp_path):
+    app.extensions["access_log"].stop()
+    with open(tmp_path / "access.log", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_one_json_line_per_request(logged_app, tmp_path):
+    client = logged_app.test_client()
+    response = client.post("/api/auth/register", json={"phone_number": "+5491100000024", "password": "password123"})
+    token = response.get_json()["access_token"]
+    response = client.get("/api/subscriptions", headers={"Authorization": f"Bearer {token}", "X-Request-ID": "abc-123"})
+
+    assert response.headers["X-Request-ID"] == "abc-123"
+    register, subscriptions = read_lines(logged_app, tmp_path)
+    assert register["status"] == 201
+    assert len(register["request_id"]) == 32
+    assert subscriptions["request_id"] == "abc-123"
+    assert subscriptions["route"] == "/api/subscriptions"
+    assert subscriptions["endpoint"] == "subscription.get_subscriptions"
+    assert subscriptions["level"] == "INFO"
+    assert subscriptions["user_id"] is not None
+    assert subscriptions["db_queries"] >= 1
+    assert subscriptions["latency_ms"] >= subscriptions["db_ms"] >= 0
+    # El access log no agrega los headers de instrumentación
+    assert "X-DB-Queries" not in response.headers
+
+
+def test_invalid_request_id_is_replaced_and_errors_are_warnings(logged_app, tmp_path):
+    response = logged_app.test_client().get("/no-existe", headers={"X-Request-ID": "mal id"})
+
+    [line] = read_lines(logged_app, tmp_path)
+    assert line["request_id"] == response.headers["X-Request-ID"] != "mal id"
+    assert line["status"] == 404
+    assert line["level"] == "WARNING"
+    assert line["route"] is None
+    assert line["user_id"] is None
+
+
+@pytest.mark.parametrize("request_id", ["abc-123\n", "\nabc-123", "a" * 129, ""])
+def test_request_id_must_match_entirely(request_id):
+    assert _valid_request_id.fullmatch(request_id) is None
+
+
+def test_shutdown_flushes_pending_lines(logged_app, tmp_path):
+    client = logged_app.test_client()
+    for _ in range(5):
+        client.get("/internal/live")
+
+    shutdown(logged_app)
+
+    with open(tmp_path / "access.log", encoding="utf-8") as f:
+        assert len(f.readlines()) == 5
+
+
+def record(level):
+    return logging.LogRecord("access", level, __file__, 0, "access", None, None)
+
+
+def test_low_priority_lines_are_dropped_first():
+    log_queue = queue.Queue(maxsize=4)
+    handler = DroppingQueueHandler(log_queue, high_water=0.5)
+
+    for level in (logging.INFO, logging.INFO, logging.INFO, logging.ERROR, logging.ERROR, logging.ERROR):
+        handler.handle(record(level))
+
+    assert [r.levelno for r in list(log_queue.queue)] == [logging.INFO, logging.INFO, logging.ERROR, logging.ERROR]
+    assert handler.dropped == 2
+
+
+class CountingStream:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def flush(self):
+        pass
+
+
+def test_lines_are_written_in_batches():
+    stream = CountingStream()
+    handler = JsonLinesHandler(stream, batch_size=3)
+
+    for status in range(7):
+        item = record(logging.INFO)
+        item.access = {"status": status}
+        handler.handle(item)
+    handler.flush()
+
+    assert [data.count("\n") for data in stream.writes] == [3, 3, 1]
+    assert json.loads(stream.writes[0].splitlines()[0])["status"] == 0
@@ -0,0 +1,52 @@
+# tests/internal/test_lifecycle.py
+import pytest
+from app.extensions import db
+from app.lifecycle import dispose_engines, shutdown, warm_up
+
+
+@pytest.fixture
+def fresh_app(make_file_app):
+    return make_file_app()
+
+
+def test_live_always_ok(fresh_app):
+    assert fresh_app.test_client().get("/internal/live").status_code == 200
+
+
+def test_not_ready_until_warm_up(fresh_app):
+    client = fresh_app.test_client()
+
+    assert client.get("/internal/ready").status_code == 503
+
+    warm_up(fresh_app)
+
+    response = client.get("/internal/ready")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ready"}
+
+
+def test_warm_up_builds_docs_and_opens_pool(fresh_app, mocker):
+    from flasgger.base import APISpecsView
+    loader = mocker.spy(APISpecsView, "get")
+
+    warm_up(fresh_app)
+
+    with fresh_app.app_context():
+        assert db.engine.pool.checkedin() == 1
+    assert fresh_app.test_client().get("/apispec.json").status_code == 200
+    assert loader.call_count == 1
+
+
+def test_shutdown_marks_not_ready(fresh_app):
+    warm_up(fresh_app)
+    shutdown(fresh_app)
+
+    assert fresh_app.test_client().get("/internal/ready").status_code == 503
+
+
+def test_dispose_after_fork_forgets_connections(fresh_app):
+    warm_up(fresh_app)
+    dispose_engines(fresh_app, close=False)
+
+    with fresh_app.app_context():
+        assert db.engine.pool.checkedin() == 0
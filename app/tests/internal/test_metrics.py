@@ -0,0 +1,134 @@
+# tests/internal/test_metrics.py
+import os
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from app.auth.hashing import password_hasher
+from app.metrics import update_pool_gauges
+from app.pool import InstrumentedQueuePool
+from app.services.cache import user_cache
+
+KEY = {"X-Service-Key": "test-service-key"}
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_require_service_key(test_client):
+    assert test_client.get("/internal/metrics").status_code == 401
+
+
+def test_latency_histogram_per_endpoint(test_client):
+    before = sample("http_request_duration_seconds_count",
+                    endpoint="subscription.get_categories", method="GET")
+
+    test_client.get("/api/subscriptions/categories")
+    response = test_client.get("/internal/metrics", headers=KEY)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{endpoint="subscription.get_categories"' in body
+    assert sample("http_request_duration_seconds_count",
+                  endpoint="subscription.get_categories", method="GET") == before + 1
+    assert sample("http_requests_total", endpoint="subscription.get_categories",
+                  method="GET", status="200") >= 1
+
+
+def test_errors_by_type(test_client):
+    validation = sample("api_errors_total", error_type="ValidationError")
+    not_found = sample("api_errors_total", error_type="NotFound")
+
+    test_client.post("/api/auth/login", json={"phone_number": "123"})
+    test_client.get("/no-existe")
+
+    assert sample("api_errors_total", error_type="ValidationError") == validation + 1
+    assert sample("api_errors_total", error_type="NotFound") == not_found + 1
+    assert sample("http_requests_total", endpoint="<unmatched>", method="GET", status="404") >= 1
+
+
+def scraped(test_client, error_type):
+    body = test_client.get("/internal/metrics", headers=KEY).get_data(as_text=True)
+    prefix = f'api_errors_total{{error_type="{error_type}"}} '
+    return next((float(line[len(prefix):]) for line in body.splitlines() if line.startswith(prefix)), 0.0)
+
+
+def test_route_errors_are_counted(test_client, auth_headers):
+    # Estas rutas responden sus propios errores y el 401 sin token sale de
+    # flask-jwt-extended: ninguno pasa por los handlers de app/errors
+    validation = scraped(test_client, "ValidationError")
+    not_found = scraped(test_client, "NotFoundError")
+    auth = scraped(test_client, "AuthError")
+
+    invalid = test_client.post("/api/subscriptions", json={"categories": ["invalida"]}, headers=auth_headers)
+    missing = test_client.delete("/api/subscriptions/deportes", headers=auth_headers)
+    no_token = test_client.get("/api/subscriptions")
+
+    assert (invalid.status_code, missing.status_code, no_token.status_code) == (400, 404, 401)
+    assert no_token.get_json()["error"]["type"] == "AuthError"
+    assert scraped(test_client, "ValidationError") == validation + 1
+    assert scraped(test_client, "NotFoundError") == not_found + 1
+    assert scraped(test_client, "AuthError") == auth + 1
+
+
+def test_user_cache_stats(test_client, auth_headers):
+    test_client.get("/api/subscriptions", headers=auth_headers)
+    test_client.get("/api/subscriptions", headers=auth_headers)
+
+    body = test_client.get("/internal/metrics", headers=KEY).get_data(as_text=True)
+
+    stats = user_cache.stats()
+    assert stats["hits"] >= 1
+    for name, key in (("cache_hits", "hits"), ("cache_misses", "misses"),
+                      ("cache_evictions", "evictions"), ("cache_entries", "size")):
+        assert f'{name}{{cache="users"}} {float(stats[key])}' in body
+
+
+def test_password_hash_timings():
+    before = sample("password_hash_duration_seconds_count", operation="verify")
+
+    password_hasher.verify(password_hasher.hash("secreto123"), "secreto123")
+
+    assert sample("password_hash_duration_seconds_count", operation="verify") == before + 1
+    assert sample("password_hash_duration_seconds_count", operation="hash") >= 1
+
+
+def test_pool_gauges(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=2, max_overflow=0)
+    with engine.connect():
+        update_pool_gauges({"metrics-test": engine})
+        assert sample("db_pool_connections", engine="metrics-test", state="checked_out") == 1
+
+    update_pool_gauges({"metrics-test": engine})
+    assert sample("db_pool_connections", engine="metrics-test", state="checked_out") == 0
+    assert sample("db_pool_checkouts", engine="metrics-test") == 1
+    engine.dispose()
+
+
+WORKER = """
+from app.metrics import REQUESTS
+for _ in range({n}):
+    REQUESTS.labels("auth.login", "POST", "200").inc()
+"""
+
+SCRAPE = """
+from app.metrics import render_metrics
+print(render_metrics()[0].decode())
+"""
+
+
+def test_workers_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for n in (3, 4):
+        subprocess.run([sys.executable, "-c", WORKER.format(n=n)], cwd=ROOT, env=env, check=True)
+
+    output = subprocess.run([sys.executable, "-c", SCRAPE], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+
+    assert 'http_requests_total{endpoint="auth.login",method="POST",status="200"} 7.0' in output
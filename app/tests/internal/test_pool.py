@@ -0,0 +1,95 @@
+# tests/internal/test_pool.py
+import threading
+
+import pytest
+from sqlalchemy import exc, text
+from app import create_app
+from app.extensions import db
+from app.pool import InstrumentedQueuePool
+from config import _engine_options
+
+SERVICE = {"X-Service-Key": "test-service-key"}
+
+
+@pytest.fixture
+def pooled_app(make_file_app):
+    return make_file_app(SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 2, "max_overflow": 1, "pool_timeout": 1})
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "8")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "3")
+
+    options = _engine_options()
+
+    assert options["pool_size"] == 8
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+    assert options["pool_timeout"] == 3
+
+
+def test_file_database_uses_instrumented_pool(pooled_app):
+    with pooled_app.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
+        assert db.engine.pool.size() == 2
+
+
+def test_in_memory_database_ignores_pool_sizing():
+    app = create_app("testing", {"SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": 2, "max_overflow": 1}})
+
+    with app.app_context():
+        assert type(db.engine.pool).__name__ == "StaticPool"
+
+
+def test_stats_track_overflow_and_wait_time(pooled_app):
+    with pooled_app.app_context():
+        engine = db.engine
+        # make_file_app ya usó el pool para crear las tablas
+        before = engine.pool.stats()["checkouts"]
+        held = [engine.connect() for _ in range(3)]
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 3
+        assert stats["overflow"] == 1
+
+        # Pool lleno: la cuarta conexión espera a que se libere una
+        threading.Timer(0.2, held.pop().close).start()
+        with engine.connect():
+            pass
+        for conn in held:
+            conn.close()
+
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] - before == 4
+        assert stats["timeouts"] == 0
+        assert stats["wait_seconds_max"] >= 0.2
+
+
+def test_stats_count_timeouts(pooled_app):
+    with pooled_app.app_context():
+        engine = db.engine
+        held = [engine.connect() for _ in range(3)]
+        try:
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        finally:
+            for conn in held:
+                conn.close()
+
+        assert engine.pool.stats()["timeouts"] == 1
+
+
+def test_pool_endpoint_requires_service_key(pooled_app):
+    client = pooled_app.test_client()
+
+    assert client.get("/internal/pool").status_code == 401
+
+    with pooled_app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    response = client.get("/internal/pool", headers=SERVICE)
+    assert response.status_code == 200
+    assert response.get_json()["primary"]["checkouts"] >= 1
@@ -0,0 +1,97 @@
+# tests/internal/test_profiling.py
+import os
+import time
+
+import pytest
+
+from app import create_app
+from app.profiling import ProfileStore, sign_token, verify_token
+
+SECRET = "profiler-secret"
+
+
+def make_app(tmp_path, **overrides):
+    return create_app("testing", {
+        "PROFILER_ENABLED": True,
+        "PROFILER_SAMPLE_RATE": 0.0,
+        "PROFILER_SECRET": SECRET,
+        "PROFILER_DIR": str(tmp_path),
+        **overrides
+    })
+
+
+def test_disabled_registers_no_hooks(tmp_path):
+    app = create_app("testing", {"PROFILER_DIR": str(tmp_path)})
+
+    app.test_client().get("/internal/live")
+
+    assert "profile_store" not in app.extensions
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampled_requests_are_saved_with_endpoint_and_latency(tmp_path):
+    app = make_app(tmp_path, PROFILER_SAMPLE_RATE=1.0)
+
+    app.test_client().get("/internal/live")
+
+    [name] = os.listdir(tmp_path)
+    assert "_internal.live_" in name
+    assert name.endswith(f"ms_{os.getpid()}.prof")
+
+
+def test_signed_header_forces_a_profile(tmp_path):
+    app = make_app(tmp_path)
+    client = app.test_client()
+
+    client.get("/internal/live")
+    client.get("/internal/live", headers={"X-Profile-Token": sign_token("otra", int(time.time()) + 60)})
+    assert os.listdir(tmp_path) == []
+
+    client.get("/internal/live", headers={"X-Profile-Token": sign_token(SECRET, int(time.time()) + 60)})
+    assert len(os.listdir(tmp_path)) == 1
+
+
+@pytest.mark.parametrize("token, valid", [
+    (sign_token(SECRET, 2000), True),
+    (sign_token(SECRET, 999), False),  # vencido
+    (sign_token("otra", 2000), False),
+    ("2000.abc", False),
+    ("basura", False),
+])
+def test_verify_token(token, valid):
+    assert verify_token(SECRET, token, now=1000) is valid
+
+
+def test_rotation_keeps_newest_files(tmp_path):
+    app = make_app(tmp_path, PROFILER_SAMPLE_RATE=1.0, PROFILER_MAX_FILES=2)
+    client = app.test_client()
+
+    for _ in range(4):
+        client.get("/internal/live")
+
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_report_aggregates_hotspots(tmp_path):
+    app = make_app(tmp_path, PROFILER_SAMPLE_RATE=1.0)
+    client = app.test_client()
+    client.get("/internal/live")
+    client.get("/no-existe")
+
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["profiles", "report", "--top", "5", "--endpoint", "internal.live"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("1 perfiles")
+    assert "live" in result.output
+    assert ProfileStore(str(tmp_path)).report(endpoint="auth.login") == (None, 0)
+
+
+def test_token_command(tmp_path):
+    app = make_app(tmp_path)
+
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["profiles", "token", "--ttl", "60"])
+
+    assert result.exit_code == 0
+    assert verify_token(SECRET, result.output.strip())
@@ -0,0 +1,183 @@
+# tests/replica/test_routing.py
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.replica import ReplicaRouter, refresh_sqlite_replica
+
+
+@pytest.fixture
+def make_app(make_file_app, tmp_path):
+    def make(replica_file="replica.db", **overrides):
+        return make_file_app(**{
+            "REPLICA_DATABASE_URL": f"sqlite:///file:{tmp_path / replica_file}?mode=ro&uri=true",
+            **overrides
+        })
+    return make
+
+
+def refresh(app):
+    with app.app_context():
+        refresh_sqlite_replica(db.engine.url, app.config["REPLICA_DATABASE_URL"])
+
+
+def signup(client, phone):
+    response = client.post("/api/auth/register", json={"phone_number": phone, "password": "password123"})
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+
+def subscribe(client, headers, category):
+    response = client.post("/api/subscriptions", json={"categories": [category]}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_get_reads_from_replica(make_app):
+    app = make_app(REPLICA_STICKY_SECONDS=0)
+    refresh(app)
+    client = app.test_client()
+    headers = signup(client, "+40000000001")
+    refresh(app)
+
+    subscribe(client, headers, "deportes")
+
+    # La réplica todavía no tiene la suscripción nueva
+    assert client.get("/api/subscriptions", headers=headers).get_json() == []
+
+    refresh(app)
+    assert client.get("/api/subscriptions", headers=headers).get_json() == [{"category": "deportes"}]
+
+
+def test_user_reads_own_writes_within_sticky_window(make_app):
+    app = make_app(REPLICA_STICKY_SECONDS=60)
+    refresh(app)
+    client = app.test_client()
+
+    # Recién registrado: todavía no está en la réplica
+    headers = signup(client, "+40000000002")
+    subscribe(client, headers, "deportes")
+
+    assert client.get("/api/subscriptions", headers=headers).get_json() == [{"category": "deportes"}]
+
+
+def test_other_clients_still_read_from_replica(make_app):
+    app = make_app(REPLICA_STICKY_SECONDS=60)
+    refresh(app)
+    writer_client, reader_client = app.test_client(), app.test_client()
+    writer = signup(writer_client, "+40000000003")
+    reader = signup(app.test_client(), "+40000000004")
+    refresh(app)
+
+    subscribe(writer_client, writer, "deportes")
+
+    assert writer_client.get("/api/subscriptions", headers=writer).get_json() == [{"category": "deportes"}]
+    # Otro cliente sin marca de escritura lee de la réplica (que no tiene a writer al día)
+    assert reader_client.get("/api/subscriptions", headers=writer).get_json() == []
+    assert reader_client.get("/api/subscriptions", headers=reader).get_json() == []
+
+
+def test_last_write_header_is_honoured_by_any_worker(make_app):
+    app = make_app(REPLICA_STICKY_SECONDS=60)
+    refresh(app)
+    client = app.test_client()
+    headers = signup(client, "+40000000006")
+    refresh(app)
+
+    response = client.post("/api/subscriptions", json={"categories": ["cultura"]}, headers=headers)
+    last_write = response.headers["X-Last-Write"]
+
+    # Un cliente sin cookies (o atendido por otro worker) que devuelve el header
+    other = app.test_client()
+    assert other.get("/api/subscriptions", headers=headers).get_json() == []
+    assert other.get("/api/subscriptions", headers={**headers, "X-Last-Write": last_write}) \
+        .get_json() == [{"category": "cultura"}]
+
+
+def test_stale_or_future_last_write_reads_from_replica():
+    now = [1_000.0]
+    router = ReplicaRouter(create_engine("sqlite://"), sticky_seconds=5, clock=lambda: now[0])
+
+    assert router.wrote_recently(998.0)
+    assert not router.wrote_recently(990.0)
+    assert not router.wrote_recently(5_000.0)
+    assert not router.wrote_recently(None)
+
+
+def test_reads_do_not_probe_the_replica_once_verified(make_app, mocker):
+    app = make_app(REPLICA_STICKY_SECONDS=0)
+    refresh(app)
+    client = app.test_client()
+    headers = signup(client, "+40000000007")
+    refresh(app)
+    router = app.extensions["replica_router"]
+    client.get("/api/subscriptions", headers=headers)
+    probe = mocker.spy(router, "_probe")
+
+    for _ in range(3):
+        assert client.get("/api/subscriptions", headers=headers).status_code == 200
+
+    assert probe.call_count == 0
+    assert router.engine.pool._pre_ping is False
+
+
+def test_falls_back_to_primary_when_replica_is_down(make_app):
+    # mode=ro no crea el archivo: la réplica no se puede abrir
+    app = make_app(replica_file="missing.db", REPLICA_STICKY_SECONDS=0)
+    client = app.test_client()
+    headers = signup(client, "+40000000005")
+    subscribe(client, headers, "deportes")
+
+    response = client.get("/api/subscriptions", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"category": "deportes"}]
+    assert app.extensions["replica_router"].available is False
+
+
+def test_refresh_command(make_app, tmp_path):
+    app = make_app()
+
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["replica", "refresh"])
+
+    assert result.exit_code == 0, result.output
+    assert os.path.exists(tmp_path / "replica.db")
+
+
+def test_connection_error_marks_replica_down(make_app, tmp_path):
+    app = make_app(REPLICA_STICKY_SECONDS=0)
+    refresh(app)
+    client = app.test_client()
+    headers = signup(client, "+40000000008")
+    refresh(app)
+    router = app.extensions["replica_router"]
+    assert client.get("/api/subscriptions", headers=headers).status_code == 200
+
+    # La réplica desaparece con el pool ya verificado
+    router.engine.dispose()
+    os.remove(tmp_path / "replica.db")
+    client.get("/api/subscriptions", headers=headers)
+
+    assert router.available is False
+    assert client.get("/api/subscriptions", headers=headers).status_code == 200
+
+
+def test_ready_checks_the_primary(make_app):
+    app = make_app()
+    refresh(app)
+    app.extensions["ready"] = True
+    client = app.test_client()
+    assert client.get("/internal/ready").status_code == 200
+
+    def primary_down(*args):
+        raise OperationalError("SELECT 1", {}, Exception("primary down"))
+
+    # La réplica sigue respondiendo, pero la principal no
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", primary_down)
+    response = client.get("/internal/ready")
+
+    assert response.status_code == 503
+    assert response.get_json() == {"status": "database unavailable"}
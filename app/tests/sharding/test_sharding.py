@@ -0,0 +1,144 @@
+# tests/sharding/test_sharding.py
+import json
+from itertools import count
+
+import pytest
+from sqlalchemy import text
+from app.auth.services import AuthService
+from app.extensions import db
+from app.sharding import scatter_gather
+
+SHARDS = 3
+SERVICE = {"X-Service-Key": "test-service-key"}
+
+
+@pytest.fixture
+def sharded_app(make_file_app, tmp_path):
+    app = make_file_app(
+        SHARD_DATABASE_URLS=[f"sqlite:///{tmp_path / f'shard{i}.db'}" for i in range(SHARDS)],
+        JWT_USER_ID_CLAIM=True,
+        FANOUT_BATCH_SIZE=2
+    )
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["shards", "init"])
+        assert result.exit_code == 0, result.output
+    return app
+
+
+def phones_on(app, shard, n):
+    """Primeros n teléfonos de prueba que caen en `shard`."""
+    shards = app.extensions["shards"]
+    phones = (f"+5000000{i:04d}" for i in count())
+    result = []
+    for phone in phones:
+        if shards.index_for(phone) == shard:
+            result.append(phone)
+            if len(result) == n:
+                return result
+
+
+def shard_phones(app, shard):
+    engine = app.extensions["shards"].engines[shard]
+    with engine.connect() as conn:
+        return set(conn.execute(text("SELECT phone_number FROM users")).scalars())
+
+
+def signup(client, phone):
+    response = client.post("/api/auth/register", json={"phone_number": phone, "password": "password123"})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def auth(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_users_are_stored_on_their_shard_only(sharded_app):
+    client = sharded_app.test_client()
+    expected = {shard: set(phones_on(sharded_app, shard, 2)) for shard in range(SHARDS)}
+    for phones in expected.values():
+        for phone in phones:
+            signup(client, phone)
+
+    for shard in range(SHARDS):
+        assert shard_phones(sharded_app, shard) == expected[shard]
+
+    with sharded_app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM users")).scalar() == 0
+
+
+def test_same_user_ids_on_different_shards_do_not_mix(sharded_app):
+    client = sharded_app.test_client()
+    first, second = phones_on(sharded_app, 0, 1)[0], phones_on(sharded_app, 1, 1)[0]
+    first_tokens, second_tokens = signup(client, first), signup(client, second)
+
+    # Los dos son el usuario 1 de su shard
+    assert client.post("/api/subscriptions", json={"categories": ["deportes"]},
+                       headers=auth(first_tokens)).status_code == 201
+    assert client.post("/api/subscriptions", json={"categories": ["cultura"]},
+                       headers=auth(second_tokens)).status_code == 201
+
+    assert client.get("/api/subscriptions", headers=auth(first_tokens)).get_json() == [{"category": "deportes"}]
+    assert client.get("/api/subscriptions", headers=auth(second_tokens)).get_json() == [{"category": "cultura"}]
+
+
+def test_login_and_refresh_go_to_the_user_shard(sharded_app):
+    client = sharded_app.test_client()
+    phone = phones_on(sharded_app, 2, 1)[0]
+    signup(client, phone)
+
+    response = client.post("/api/auth/login", json={"phone_number": phone, "password": "password123"})
+    assert response.status_code == 200
+
+    refresh = response.get_json()["refresh_token"]
+    response = client.post("/api/auth/refresh", headers={"Authorization": f"Bearer {refresh}"})
+    assert response.status_code == 200
+
+
+def test_prune_refresh_tokens_on_every_shard(sharded_app):
+    client = sharded_app.test_client()
+    for shard in range(SHARDS):
+        signup(client, phones_on(sharded_app, shard, 1)[0])
+    for engine in sharded_app.extensions["shards"].engines:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE refresh_tokens SET expires_at = '2000-01-01 00:00:00'"))
+
+    with sharded_app.app_context():
+        assert AuthService.prune_refresh_tokens() == SHARDS
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_fanout_gathers_all_shards_in_order_and_resumes(sharded_app):
+    client = sharded_app.test_client()
+    phones = [phone for shard in range(SHARDS) for phone in phones_on(sharded_app, shard, 3)]
+    for phone in phones:
+        client.post("/api/subscriptions", json={"categories": ["deportes"]}, headers=auth(signup(client, phone)))
+
+    rows = read_ndjson(client.get("/api/service/subscribers?category=deportes", headers=SERVICE))
+
+    assert sorted(row["phone_number"] for row in rows) == sorted(phones)
+    assert [(r["id"], r["shard"]) for r in rows] == sorted((r["id"], r["shard"]) for r in rows)
+
+    last = rows[3]
+    resumed = read_ndjson(client.get(
+        f"/api/service/subscribers?category=deportes&after_id={last['id']}&after_shard={last['shard']}",
+        headers=SERVICE
+    ))
+    assert resumed == rows[4:]
+
+
+def test_scatter_gather_merges_and_propagates_errors():
+    pages = [[[(1, 0), (4, 0)], [(6, 0)]], [[(2, 1), (3, 1)]], []]
+    merged = list(scatter_gather([iter(p) for p in pages], key=lambda row: row))
+    assert merged == [(1, 0), (2, 1), (3, 1), (4, 0), (6, 0)]
+
+    def broken():
+        yield [(1, 0)]
+        raise RuntimeError("shard caído")
+
+    with pytest.raises(RuntimeError, match="shard caído"):
+        list(scatter_gather([broken(), iter([[(2, 1)]])], key=lambda row: row))
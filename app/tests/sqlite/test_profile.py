@@ -0,0 +1,57 @@
+# tests/sqlite/test_profile.py
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+
+
+def pragma(app, name):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_profile_sets_pragmas_on_every_connection(make_file_app):
+    app = make_file_app(SQLITE_PROFILE_ENABLED=True, SQLITE_BUSY_TIMEOUT=1234)
+
+    assert pragma(app, "journal_mode") == "wal"
+    assert pragma(app, "synchronous") == 1  # NORMAL
+    assert pragma(app, "busy_timeout") == 1234
+    assert pragma(app, "temp_store") == 2  # MEMORY
+    assert pragma(app, "cache_size") == app.config["SQLITE_CACHE_SIZE"]
+
+
+def test_profile_is_opt_in(make_file_app):
+    app = make_file_app()
+
+    assert pragma(app, "journal_mode") == "delete"
+    assert pragma(app, "synchronous") == 2  # FULL
+
+
+def test_profile_skips_in_memory_database():
+    app = create_app("testing", {"SQLITE_PROFILE_ENABLED": True})
+
+    assert pragma(app, "journal_mode") == "memory"
+
+
+def test_maintenance_commands(make_file_app):
+    app = make_file_app(SQLITE_PROFILE_ENABLED=True)
+    runner = app.test_cli_runner()
+
+    # El fixture de sesión deja pusheado el contexto de otra app
+    with app.app_context():
+        result = runner.invoke(args=["sqlite", "maintain"])
+        assert result.exit_code == 0, result.output
+        assert "ANALYZE ok" in result.output
+
+        result = runner.invoke(args=["sqlite", "checkpoint"])
+        assert result.exit_code == 0, result.output
+        assert "Checkpoint" in result.output
+
+
+def test_maintenance_requires_file_database():
+    app = create_app("testing")
+
+    result = app.test_cli_runner().invoke(args=["sqlite", "analyze"])
+
+    assert result.exit_code != 0
+    assert "no es un archivo SQLite" in result.output
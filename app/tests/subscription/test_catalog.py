@@ -0,0 +1,131 @@
+# tests/subscription/test_catalog.py
+import pytest
+from app.extensions import db
+from app.models import Category, Subscription
+from app.schemas.subscription_schema import VALID_CATEGORIES
+from app.services.catalog import CategoryCatalog, get_catalog, seed_categories
+from app.services.subscription import SubscriptionService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def extra_category(db):
+    yield "ciencia"
+    db.session.rollback()
+    db.session.execute(db.delete(Category).where(Category.name == "ciencia"))
+    db.session.commit()
+    get_catalog().invalidate()
+
+
+def test_catalog_loads_seeded_categories(test_app):
+    with test_app.app_context():
+        catalog = get_catalog()
+        assert catalog.names() == VALID_CATEGORIES
+        category_id = catalog.id_for("deportes")
+        assert catalog.name_for(category_id) == "deportes"
+
+
+def test_catalog_reloads_only_when_version_changes(test_app, extra_category):
+    clock = FakeClock()
+    catalog = CategoryCatalog(refresh_interval=10, clock=clock)
+    with test_app.app_context():
+        assert extra_category not in catalog.names()
+
+        db.session.add(Category(name=extra_category))
+        db.session.commit()
+
+        # Dentro del intervalo se sigue usando la copia en memoria
+        clock.now = 5
+        assert extra_category not in catalog.names()
+
+        clock.now = 10
+        assert extra_category in catalog.names()
+
+
+def test_catalog_reloads_after_a_rename(test_app, extra_category):
+    clock = FakeClock()
+    catalog = CategoryCatalog(refresh_interval=10, clock=clock)
+    with test_app.app_context():
+        seed_categories([extra_category])
+        category_id = catalog.id_for(extra_category)
+
+        # Misma cantidad de filas y mismo id máximo: solo cambia el nombre
+        db.session.execute(db.update(Category).where(Category.id == category_id).values(name="astronomía"))
+        db.session.commit()
+        clock.now = 10
+
+        assert catalog.name_for(category_id) == "astronomía"
+        assert extra_category not in catalog.names()
+        db.session.execute(db.update(Category).where(Category.id == category_id).values(name=extra_category))
+        db.session.commit()
+
+
+def test_new_category_usable_without_redeploy(test_app, test_client, extra_category):
+    with test_app.app_context():
+        seed_categories([extra_category])
+
+    response = test_client.get("/api/subscriptions/categories")
+    assert extra_category in response.get_json()["categories"]
+
+    SubscriptionService.validate_categories([extra_category])
+
+
+@pytest.mark.clean_users
+def test_subscriptions_store_small_integer_keys(test_app):
+    with test_app.app_context():
+        from app.auth.models import User
+        user = User(phone_number="+9000000001")
+        user.set_password("testpass")
+        db.session.add(user)
+        db.session.commit()
+
+        SubscriptionService.create_subscription(user, ["economía"])
+
+        sub = Subscription.query.filter_by(category="economía").one()
+        assert sub.category_id == get_catalog().id_for("economía")
+        assert sub.category == "economía"
+
+
+def test_unknown_id_reloads_the_catalog_once(test_app, extra_category):
+    clock = FakeClock()
+    catalog = CategoryCatalog(refresh_interval=3600, clock=clock)
+    with test_app.app_context():
+        catalog.names()
+        # Agregada por otro worker, antes del próximo chequeo de versión
+        category = Category(name=extra_category)
+        db.session.add(category)
+        db.session.commit()
+
+        assert catalog.name_for(category.id) == extra_category
+        assert catalog.name_for(10**6) is None
+
+
+@pytest.mark.clean_users
+def test_stale_catalog_does_not_break_get(test_app, test_client, extra_category):
+    with test_app.app_context():
+        category = Category(name=extra_category)
+        db.session.add(category)
+        db.session.commit()
+        from app.auth.models import User
+        from app.auth.services import AuthService
+        user = User(phone_number="+9000000002")
+        user.set_password("testpass")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Subscription(user_id=user.id, category_id=category.id))
+        db.session.commit()
+        token = AuthService.issue_access_token(user)
+        # El catálogo del proceso todavía no vio la categoría nueva
+        get_catalog()._names_by_id.pop(category.id, None)
+
+    response = test_client.get("/api/subscriptions", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"category": extra_category}]
@@ -0,0 +1,48 @@
+# tests/subscription/test_concurrency.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.auth.models import User
+from app.models import Subscription
+from app.schemas.subscription_schema import VALID_CATEGORIES
+
+
+@pytest.fixture
+def file_app(make_file_app):
+    """App con SQLite en archivo: la base en memoria no soporta escrituras concurrentes."""
+    app = make_file_app()
+    with app.app_context():
+        user = User(phone_number="+8000000001")
+        user.set_password("testpass")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_parallel_creates_never_fail_with_500(file_app):
+    with file_app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='+8000000001')}"}
+
+    categories = sorted(VALID_CATEGORIES)
+    client = file_app.test_client()
+
+    def post(_):
+        payload = {"categories": random.sample(categories, k=random.randint(1, len(categories)))}
+        return client.post("/api/subscriptions", json=payload, headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(post, range(64)))
+
+    assert 500 not in statuses
+    assert set(statuses) <= {201, 400}
+    assert 201 in statuses
+
+    with file_app.app_context():
+        stored = {s.category for s in Subscription.query.all()}
+        assert stored <= VALID_CATEGORIES
+        assert Subscription.query.count() == len(stored)
@@ -0,0 +1,134 @@
+# tests/subscription/test_fanout.py
+import json
+
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.auth.models import User
+from app.models import Subscription
+from app.services import queries
+from app.services.subscription import SubscriptionService
+
+SERVICE_HEADERS = {"X-Service-Key": "test-service-key"}
+
+
+@pytest.fixture(autouse=True)
+def cleanup_after(db):
+    # Estos tests commitean datos: los borramos para no afectar a otros módulos
+    yield
+    db.session.rollback()
+    db.session.execute(db.delete(Subscription))
+    db.session.execute(db.delete(User))
+    db.session.commit()
+
+
+def create_user(phone, categories):
+    user = User(phone_number=phone)
+    user.set_password("testpass")
+    db.session.add(user)
+    db.session.commit()
+    SubscriptionService.create_subscription(user, categories)
+    return user
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.clean_users
+def test_stream_subscribers_by_category(test_client):
+    create_user("+2000000001", ["deportes", "cultura"])
+    create_user("+2000000002", ["deportes"])
+    create_user("+2000000003", ["economía"])
+
+    response = test_client.get(
+        "/api/service/subscribers?category=deportes",
+        headers=SERVICE_HEADERS
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = read_ndjson(response)
+    assert [r["phone_number"] for r in rows] == ["+2000000001", "+2000000002"]
+    assert all(r["category"] == "deportes" for r in rows)
+
+
+@pytest.mark.clean_users
+def test_stream_subscribers_multiple_categories_and_resume(test_client):
+    create_user("+2000000004", ["deportes", "cultura"])
+    create_user("+2000000005", ["cultura"])
+
+    response = test_client.get(
+        "/api/service/subscribers?category=deportes,cultura",
+        headers=SERVICE_HEADERS
+    )
+    rows = read_ndjson(response)
+    assert len(rows) == 3
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+
+    resumed = test_client.get(
+        f"/api/service/subscribers?category=deportes&category=cultura&after_id={rows[0]['id']}",
+        headers=SERVICE_HEADERS
+    )
+    assert read_ndjson(resumed) == rows[1:]
+
+
+@pytest.mark.clean_users
+def test_iter_subscribers_pages_with_small_batches(test_app):
+    with test_app.app_context():
+        for i in range(5):
+            create_user(f"+300000000{i}", ["tecnología"])
+
+        rows = list(SubscriptionService.iter_subscribers(["tecnología"], batch_size=2))
+        assert len(rows) == 5
+        assert len({r[0] for r in rows}) == 5
+
+
+def test_stream_subscribers_requires_service_key(test_client):
+    response = test_client.get("/api/service/subscribers?category=deportes")
+    assert response.status_code == 401
+
+    response = test_client.get(
+        "/api/service/subscribers?category=deportes",
+        headers={"X-Service-Key": "otra"}
+    )
+    assert response.status_code == 401
+
+
+def test_stream_subscribers_invalid_category(test_client):
+    response = test_client.get(
+        "/api/service/subscribers?category=invalida",
+        headers=SERVICE_HEADERS
+    )
+    assert response.status_code == 400
+
+    response = test_client.get("/api/service/subscribers", headers=SERVICE_HEADERS)
+    assert response.status_code == 400
+
+
+def test_subscriber_page_is_an_index_range(test_app):
+    # Cada página sale ordenada del índice (category_id, id): sin sort en memoria
+    with test_app.app_context():
+        sql = queries.category_subscribers(1, 100, 1000).compile(
+            db.engine, compile_kwargs={"literal_binds": True}
+        )
+        plan = " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "USING INDEX ix_subscriptions_category_id_id (category_id=? AND id>?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.clean_users
+def test_iter_subscribers_merges_categories_by_id(test_app):
+    with test_app.app_context():
+        for i in range(6):
+            create_user(f"+300000001{i}", ["cultura"] if i % 2 else ["deportes", "economía"])
+
+        rows = list(SubscriptionService.iter_subscribers(["deportes", "cultura", "economía"], batch_size=2))
+
+        assert len(rows) == 9
+        assert [r.id for r in rows] == sorted(r.id for r in rows)
+        resumed = list(SubscriptionService.iter_subscribers(
+            ["deportes", "cultura", "economía"], batch_size=2, after_id=rows[4].id
+        ))
+        assert resumed == rows[5:]
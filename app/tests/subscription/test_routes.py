@@ -1,9 +1,12 @@
 # tests/subscription/test_subscription_service.py
 
 import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
 from app.auth.models import User
 from app.models import Subscription
+from app.services import queries
 from app.services.subscription import SubscriptionService
 from app.errors.exceptions import ValidationError, NotFoundError
 from app.schemas.subscription_schema import VALID_CATEGORIES
@@ -37,6 +40,11 @@ def test_validate_categories_invalid():
         SubscriptionService.validate_categories(["invalida"])
         assert "Categorías inválidas" in str(exc.value)
 
+def test_validate_categories_non_string():
+    # Los errores por elemento vienen anidados por índice
+    with pytest.raises(ValidationError):
+        SubscriptionService.validate_categories([1])
+
 def test_create_subscription_success(test_app):
     with test_app.app_context():
         user = create_user("+1000000002")
@@ -89,3 +97,146 @@ def test_delete_subscription_not_found(test_app):
         user = create_user("+1000000008")
         with pytest.raises(NotFoundError):
             SubscriptionService.delete_subscription(user, "no-existe")
+
+def test_update_subscriptions_reports_changes(test_app, test_client):
+    with test_app.app_context():
+        user = create_user("+1000000009")
+        token = create_access_token(identity=user.phone_number)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.put("/api/subscriptions", json={"categories": ["cultura"]}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Subscriptions-Changed"] == "true"
+
+    response = test_client.put("/api/subscriptions", json={"categories": ["cultura"]}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == [{"category": "cultura"}]
+    assert response.headers["X-Subscriptions-Changed"] == "false"
+
+def test_patch_subscriptions_adds_and_removes(test_app, test_client):
+    with test_app.app_context():
+        user = create_user("+1000000010")
+        SubscriptionService.create_subscription(user, ["deportes", "tecnología"])
+        token = create_access_token(identity=user.phone_number)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.patch("/api/subscriptions", json={
+        "add": ["cultura", "tecnología"],
+        "remove": ["deportes", "economía"]
+    }, headers=headers)
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["added"] == ["cultura"]
+    assert data["removed"] == ["deportes"]
+    assert data["subscriptions"] == [{"category": "tecnología"}, {"category": "cultura"}]
+
+
+@pytest.mark.clean_users
+@pytest.mark.parametrize("payload", [
+    {},
+    {"add": ["invalida"]},
+    {"add": ["cultura"], "remove": ["cultura"]},
+    {"add": [1]},
+])
+def test_patch_subscriptions_invalid_payload(test_app, test_client, payload):
+    with test_app.app_context():
+        user = create_user("+1000000010")
+        token = create_access_token(identity=user.phone_number)
+
+    response = test_client.patch(
+        "/api/subscriptions",
+        json=payload,
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+
+
+def test_patch_validates_before_resolving_the_user(test_client, mocker):
+    get_user = mocker.patch.object(SubscriptionService, "get_current_user")
+    token = create_access_token(identity="+1000000012")
+
+    response = test_client.patch(
+        "/api/subscriptions",
+        json={"add": ["invalida"]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 400
+    get_user.assert_not_called()
+
+
+def test_apply_changes_is_atomic(test_app, mocker):
+    with test_app.app_context():
+        user = create_user("+1000000011")
+        SubscriptionService.create_subscription(user, ["deportes"])
+        mocker.patch.object(
+            SubscriptionService, "_insert_missing",
+            side_effect=SQLAlchemyError("boom")
+        )
+
+        with pytest.raises(SQLAlchemyError):
+            SubscriptionService.apply_changes(user, {"add": ["cultura"], "remove": ["deportes"]})
+
+        # El DELETE se deshizo junto con el INSERT fallido
+        assert [s.category for s in SubscriptionService.get_subscriptions(user)] == ["deportes"]
+
+
+def test_get_subscriptions_conditional_etag(test_app, test_client, mocker):
+    with test_app.app_context():
+        user = create_user("+1000000012")
+        SubscriptionService.create_subscription(user, ["deportes"])
+        token = create_access_token(identity=user.phone_number)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.get("/api/subscriptions", headers=headers)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert not etag.startswith("W/")
+
+    # Mismo ETag: 304 sin leer las filas de suscripciones
+    load_rows = mocker.spy(SubscriptionService, "get_subscriptions_with_version")
+    response = test_client.get("/api/subscriptions", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    load_rows.assert_not_called()
+
+    # If-None-Match compara en forma débil: un proxy que lo devuelve como W/ también da 304
+    response = test_client.get("/api/subscriptions", headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+    # Una mutación cambia la versión
+    test_client.post("/api/subscriptions", json={"categories": ["cultura"]}, headers=headers)
+    response = test_client.get("/api/subscriptions", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json() == [{"category": "deportes"}, {"category": "cultura"}]
+
+
+def test_noop_replace_keeps_etag(test_app, test_client):
+    with test_app.app_context():
+        user = create_user("+1000000013")
+        SubscriptionService.create_subscription(user, ["deportes"])
+        token = create_access_token(identity=user.phone_number)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    etag = test_client.get("/api/subscriptions", headers=headers).headers["ETag"]
+    test_client.put("/api/subscriptions", json={"categories": ["deportes"]}, headers=headers)
+
+    response = test_client.get("/api/subscriptions", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_insert_without_upsert_uses_savepoints(test_app, mocker):
+    # Dialecto sin ON CONFLICT: un INSERT por categoría en un SAVEPOINT
+    mocker.patch.dict(queries.DIALECT_INSERTS, clear=True)
+    with test_app.app_context():
+        user = create_user("+1000000014")
+        SubscriptionService.create_subscription(user, ["deportes"])
+
+        added = SubscriptionService.create_subscription(user, ["deportes", "cultura", "cultura"])
+
+        assert [s.category for s in added] == ["cultura"]
+        assert [s.category for s in SubscriptionService.get_subscriptions(user)] == ["deportes", "cultura"]
+        with pytest.raises(ValidationError):
+            SubscriptionService.create_subscription(user, ["cultura"])
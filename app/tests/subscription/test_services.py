@@ -101,4 +101,26 @@ def test_get_user_by_phone(test_app):
 
         # Test usuario no encontrado
         with pytest.raises(NotFoundError):
-            SubscriptionService.get_user_by_phone("+000000000")
\ No newline at end of file
+            SubscriptionService.get_user_by_phone("+000000000")
+
+@pytest.mark.clean_users
+def test_sync_subscriptions_only_touches_differences(test_app):
+    with test_app.app_context():
+        user = User(phone_number="+444444444")
+        user.set_password("testpass")
+        db.session.add(user)
+        db.session.commit()
+
+        SubscriptionService.create_subscription(user, ["deportes", "tecnología"])
+        kept_id = Subscription.query.filter_by(category="deportes").one().id
+
+        subs, changed = SubscriptionService.sync_subscriptions(user, ["deportes", "cultura"])
+        assert changed is True
+        assert [s.category for s in subs] == ["deportes", "cultura"]
+        # La fila que no cambió no se borra ni se reinserta
+        assert Subscription.query.filter_by(category="deportes").one().id == kept_id
+        assert {s.category for s in Subscription.query.all()} == {"deportes", "cultura"}
+
+        subs, changed = SubscriptionService.sync_subscriptions(user, ["cultura", "deportes"])
+        assert changed is False
+        assert Subscription.query.count() == 2
@@ -0,0 +1,81 @@
+# tests/subscription/test_user_cache.py
+import pytest
+from app.extensions import db
+from app.auth.models import User
+from app.auth.services import AuthService
+from app.binds import PRIMARY_SCOPE
+from app.services.cache import LRUTTLCache, user_cache
+from app.services.subscription import SubscriptionService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" pasa a ser el más reciente
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    cache = LRUTTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_never_stores():
+    cache = LRUTTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.clean_users
+def test_get_user_by_phone_hits_cache(test_app):
+    with test_app.app_context():
+        user = User(phone_number="+4000000001")
+        user.set_password("testpass")
+        db.session.add(user)
+        db.session.commit()
+
+        first = SubscriptionService.get_user_by_phone("+4000000001")
+        second = SubscriptionService.get_user_by_phone("+4000000001")
+
+        assert first == second == (user.id, "+4000000001")
+        stats = user_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+
+@pytest.mark.clean_users
+def test_user_cache_invalidated_on_delete_and_register(test_app):
+    with test_app.app_context():
+        user = AuthService.register_user("+4000000002", "password123")
+        cached = SubscriptionService.get_user_by_phone("+4000000002")
+        assert cached.id == user.id
+
+        db.session.delete(user)
+        db.session.commit()
+        assert user_cache.get((PRIMARY_SCOPE, "+4000000002")) is None
+
+        new_user = AuthService.register_user("+4000000002", "password123")
+        assert SubscriptionService.get_user_by_phone("+4000000002").id == new_user.id
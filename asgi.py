@@ -0,0 +1,8 @@
+# asgi.py
+# Punto de entrada ASGI (/api/async en el event loop): uvicorn asgi:application
+import os
+
+from app import create_app
+from app.asgi import AsgiApp
+
+application = AsgiApp(create_app(os.getenv('APP_CONFIG', 'default')))
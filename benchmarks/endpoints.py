@@ -0,0 +1,297 @@
+"""Benchmark de cada endpoint de la API con gate de regresión.
+
+Uso:
+    python -m benchmarks.endpoints
+    python -m benchmarks.endpoints --users 1000 --subscriptions 3 --requests 500 \\
+        --output benchmark-results.json --baseline benchmarks/baseline_endpoints.json
+    python -m benchmarks.endpoints --update-baseline
+
+Crea una base SQLite temporal con --users usuarios × --subscriptions
+suscripciones cada uno (se agregan categorías "bench-NN" si hacen falta) y
+mide, con el test client de create_app("testing"), latencia p50/p95/p99 y
+requests por segundo de un cliente secuencial para register, login, las
+rutas de suscripciones y /categories. Las mutaciones se hacen de a pares
+(agregar/quitar) para que cada usuario vuelva al estado sembrado.
+
+Se corren --rounds vueltas completas (base nueva cada vez) y los
+percentiles salen de todas las muestras juntas, para que una vuelta con la
+máquina ocupada no decida el resultado. El resultado se guarda en --output y se compara con --baseline:
+sale con código 1 si alguna ruta empeoró más de --threshold (p95 más alto o
+throughput más bajo). La línea base depende de la máquina; regenerarla con
+--update-baseline en la misma máquina que corre el gate.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app import create_app
+from app.auth.hashing import password_hasher
+from app.auth.models import User, UserRef
+from app.auth.services import AuthService
+from app.extensions import db
+from app.models import Subscription
+from app.services.catalog import get_catalog, seed_categories
+from app.schemas.subscription_schema import VALID_CATEGORIES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_endpoints.json")
+PASSWORD = "benchmark-pass"
+# Métricas que entran en el gate: (clave, True si más alto es peor)
+GATED = (("p95_ms", True), ("throughput", False))
+
+
+def seed(app, users, subscriptions):
+    """Siembra usuarios y suscripciones; devuelve (usuarios, categorías ordenadas)."""
+    with app.app_context():
+        seed_categories(VALID_CATEGORIES)
+        # Hacen falta subscriptions + 2 categorías: las sembradas y dos extra
+        missing = subscriptions + 2 - len(get_catalog().names())
+        seed_categories([f"bench-{i:02d}" for i in range(max(missing, 0))])
+        catalog = get_catalog()
+        categories = sorted(catalog.names())
+
+        # Un solo hash para todos: login mide la verificación, no la siembra
+        password_hash = password_hasher.hash(PASSWORD)
+        db.session.execute(User.__table__.insert(), [
+            {"phone_number": f"+59{i:09d}", "password_hash": password_hash, "subscriptions_version": 0}
+            for i in range(users)
+        ])
+        rows = db.session.execute(db.select(User.id, User.phone_number).order_by(User.id)).all()
+        seeded_ids = catalog.ids_for(categories[:subscriptions])
+        if seeded_ids:
+            db.session.execute(Subscription.__table__.insert(), [
+                {"user_id": user_id, "category_id": category_id}
+                for user_id, _ in rows for category_id in seeded_ids
+            ])
+        db.session.commit()
+
+        seeded = []
+        for user_id, phone in rows:
+            user = UserRef(user_id, phone)
+            token = AuthService.issue_access_token(user)
+            seeded.append((user, {"Authorization": f"Bearer {token}"}))
+    return seeded, categories
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors):
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+class Recorder:
+    """Latencias por ruta; en cada vuelta las primeras `warmup` llamadas de
+    cada ruta no cuentan."""
+
+    def __init__(self, warmup):
+        self.warmup = warmup
+        self.latencies = {}
+        self.errors = {}
+        self._seen = {}
+
+    def new_round(self):
+        self._seen = {}
+
+    def call(self, route, expected, fn):
+        start = time.perf_counter()
+        response = fn()
+        elapsed = time.perf_counter() - start
+        seen = self._seen[route] = self._seen.get(route, 0) + 1
+        if seen > self.warmup:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if response.status_code != expected:
+                self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+    def results(self):
+        return {
+            route: summarize(latencies, self.errors.get(route, 0))
+            for route, latencies in sorted(self.latencies.items())
+        }
+
+
+def run_suite(users=200, subscriptions=2, requests=200, auth_requests=20, warmup=10, rounds=1,
+              overrides=None):
+    """Corre todas las rutas y devuelve {"meta": ..., "routes": {endpoint: stats}}.
+
+    Las latencias de todas las vueltas se juntan antes de calcular los
+    percentiles.
+    """
+    recorder = Recorder(warmup)
+    for _ in range(max(rounds, 1)):
+        recorder.new_round()
+        _run_round(recorder, users, subscriptions, requests, auth_requests, warmup, overrides)
+
+    return {
+        "meta": {
+            "users": users,
+            "subscriptions": subscriptions,
+            "requests": requests,
+            "auth_requests": auth_requests,
+            "rounds": max(rounds, 1),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+        },
+        "routes": recorder.results(),
+    }
+
+
+def _run_round(recorder, users, subscriptions, requests, auth_requests, warmup, overrides):
+    """Una vuelta completa sobre una base nueva."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app("testing", {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            **(overrides or {})
+        })
+        with app.app_context():
+            db.create_all()
+        seeded, categories = seed(app, users, subscriptions)
+        client = app.test_client()
+
+        current = categories[:subscriptions]
+        extra = categories[subscriptions]
+        shifted = categories[1:subscriptions + 1] if subscriptions else [extra]
+        first = current[:1]
+
+        def user(i):
+            return seeded[i % len(seeded)]
+
+        # PUT y PATCH van de a pares (cambio y vuelta atrás): dos llamadas por vuelta
+        pairs = (warmup + requests + 1) // 2
+
+        for i in range(warmup + requests):
+            recorder.call("subscription.get_categories", 200,
+                          lambda: client.get("/api/subscriptions/categories"))
+
+        for i in range(warmup + requests):
+            _, headers = user(i)
+            recorder.call("subscription.get_subscriptions", 200,
+                          lambda: client.get("/api/subscriptions", headers=headers))
+
+        for i in range(warmup + requests):
+            _, headers = user(i)
+            recorder.call("subscription.create_subscription", 201, lambda: client.post(
+                "/api/subscriptions", json={"categories": [extra]}, headers=headers))
+            recorder.call("subscription.delete_subscription", 200, lambda: client.delete(
+                f"/api/subscriptions/{extra}", headers=headers))
+
+        for i in range(pairs):
+            _, headers = user(i)
+            for target in (shifted, current):
+                recorder.call("subscription.update_subscriptions", 200, lambda: client.put(
+                    "/api/subscriptions", json={"categories": target}, headers=headers))
+
+        for i in range(pairs):
+            _, headers = user(i)
+            for add, remove in (([extra], first), (first, [extra])):
+                recorder.call("subscription.patch_subscriptions", 200, lambda: client.patch(
+                    "/api/subscriptions", json={"add": add, "remove": remove}, headers=headers))
+
+        for i in range(warmup + auth_requests):
+            recorder.call("auth.register", 201, lambda: client.post("/api/auth/register", json={
+                "phone_number": f"+58{i:09d}", "password": PASSWORD}))
+
+        for i in range(warmup + auth_requests):
+            phone = user(i)[0].phone_number
+            recorder.call("auth.login", 200, lambda: client.post("/api/auth/login", json={
+                "phone_number": phone, "password": PASSWORD}))
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+def compare(results, baseline, threshold):
+    """Regresiones de `results` contra `baseline` (lista de mensajes)."""
+    regressions = []
+    for route, base in baseline["routes"].items():
+        current = results["routes"].get(route)
+        if current is None:
+            regressions.append(f"{route}: no se midió")
+            continue
+        if current["errors"]:
+            regressions.append(f"{route}: {current['errors']} respuestas con status inesperado")
+        for key, higher_is_worse in GATED:
+            if not base[key]:
+                continue
+            change = (current[key] - base[key]) / base[key]
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(f"{route}: {key} {base[key]} -> {current[key]} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results, baseline=None):
+    print(f"{'endpoint':<36}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vs p95':>9}{'errores':>9}")
+    for route, stats in results["routes"].items():
+        base = (baseline or {}).get("routes", {}).get(route)
+        delta = f"{(stats['p95_ms'] - base['p95_ms']) / base['p95_ms']:+.0%}" if base and base["p95_ms"] else "-"
+        print(f"{route:<36}{stats['throughput']:>10.1f}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{delta:>9}{stats['errors']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--subscriptions", type=int, default=2, help="Suscripciones por usuario.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidas por ruta.")
+    parser.add_argument("--auth-requests", type=int, default=20,
+                        help="Requests medidas de register/login (dominadas por el hashing).")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3, help="Vueltas completas sobre una base nueva.")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Empeoramiento tolerado (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Guarda el resultado como nueva línea base en lugar de comparar.")
+    args = parser.parse_args()
+
+    results = run_suite(args.users, args.subscriptions, args.requests, args.auth_requests,
+                        args.warmup, args.rounds)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print_table(results)
+        print(f"Línea base actualizada: {args.baseline}")
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if baseline is None:
+        print(f"Sin línea base en {args.baseline}; correr con --update-baseline")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegresiones (umbral {args.threshold:.0%}):")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"\nSin regresiones (umbral {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark de logins por segundo según la política de hashing.
+
+Uso:
+    python -m benchmarks.password_hashing
+    python -m benchmarks.password_hashing --settings pbkdf2:sha256:600000 scrypt:32768 \\
+        --pool-sizes 0 4 --logins 200 --threads 8
+
+Cada setting es "<algoritmo>:<iteraciones>" (para scrypt, el factor N). Para
+cada combinación de setting y tamaño de pool se registra un usuario y se
+hacen --logins requests a /api/auth/login repartidas en --threads threads.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.extensions import db
+from app.auth.hashing import password_hasher
+from app.auth.services import AuthService
+
+DEFAULT_SETTINGS = ["pbkdf2:sha256:100000", "pbkdf2:sha256:600000", "scrypt:16384", "scrypt:32768"]
+PHONE = "+5490000000001"
+PASSWORD = "benchmark-pass"
+
+
+def parse_setting(setting):
+    algorithm, iterations = setting.rsplit(":", 1)
+    return algorithm, int(iterations)
+
+
+def run(setting, pool_size, logins, threads):
+    algorithm, iterations = parse_setting(setting)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app("testing", {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "PASSWORD_HASH_ALGORITHM": algorithm,
+            "PASSWORD_HASH_ITERATIONS": iterations,
+            "PASSWORD_HASH_POOL_SIZE": pool_size,
+            "PASSWORD_HASH_MAX_PENDING": max(threads, 1),
+        })
+        with app.app_context():
+            db.create_all()
+            AuthService.register_user(PHONE, PASSWORD)
+
+        client = app.test_client()
+
+        def login(_):
+            response = client.post("/api/auth/login", json={"phone_number": PHONE, "password": PASSWORD})
+            return response.status_code
+
+        # Calienta el pool de procesos para no medir su arranque
+        login(None)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+
+        password_hasher.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+
+    errors = sum(1 for status in statuses if status != 200)
+    return logins / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--settings", nargs="+", default=DEFAULT_SETTINGS)
+    parser.add_argument("--pool-sizes", nargs="+", type=int, default=[0, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'setting':<26}{'pool':>6}{'logins/s':>12}{'errores':>10}")
+    for setting in args.settings:
+        for pool_size in args.pool_sizes:
+            rate, errors = run(setting, pool_size, args.logins, args.threads)
+            print(f"{setting:<26}{pool_size:>6}{rate:>12.1f}{errors:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,158 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _engine_options(pool_size=5, max_overflow=10):
+    """SQLALCHEMY_ENGINE_OPTIONS desde el entorno.
+
+    DB_POOL_SIZE + DB_MAX_OVERFLOW deberían cubrir los threads de cada worker
+    (GUNICORN_THREADS); si no, las requests esperan una conexión libre hasta
+    DB_POOL_TIMEOUT segundos.
+    """
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    }
+
+
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'secreto')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))
+    # Incluye el id numérico del usuario en el token (claim "uid"): las rutas
+    # no buscan al usuario por teléfono y el token deja de valer si el
+    # teléfono se vuelve a registrar con otro usuario
+    JWT_USER_ID_CLAIM = _env_bool('JWT_USER_ID_CLAIM')
+    # Refresh tokens (30 días) y cache en memoria de los revocados
+    JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES', 2592000))
+    REVOKED_TOKEN_CACHE_MAXSIZE = int(os.getenv('REVOKED_TOKEN_CACHE_MAXSIZE', 100000))
+    # Clave compartida para los endpoints de servicio (workers del bot)
+    SERVICE_API_KEY = os.getenv('SERVICE_API_KEY')
+    # Filas por página en el streaming de suscriptores (keyset pagination)
+    FANOUT_BATCH_SIZE = int(os.getenv('FANOUT_BATCH_SIZE', 1000))
+    # Modo demo: las requests con el header X-Demo-Mode: true (las que hace
+    # Swagger UI) usan una base separada
+    DEMO_MODE_ENABLED = _env_bool('DEMO_MODE_ENABLED')
+    DEMO_MODE_HEADER = 'X-Demo-Mode'
+    DEMO_DATABASE_URL = os.getenv('DATABASE_SWAGGER_URL', 'sqlite:///db_swagger.db')
+    DEMO_POOL_SIZE = int(os.getenv('DEMO_POOL_SIZE', 5))
+    DEMO_POOL_MAX_OVERFLOW = int(os.getenv('DEMO_POOL_MAX_OVERFLOW', 5))
+    # Sandbox SQLite por sesión de Swagger, clonados de un template
+    DEMO_SANDBOX_ENABLED = _env_bool('DEMO_SANDBOX_ENABLED')
+    DEMO_SANDBOX_DIR = os.getenv(
+        'DEMO_SANDBOX_DIR', os.path.join(tempfile.gettempdir(), 'news_bot_sandboxes')
+    )
+    DEMO_SANDBOX_POOL_SIZE = int(os.getenv('DEMO_SANDBOX_POOL_SIZE', 4))
+    DEMO_SANDBOX_MAX_SESSIONS = int(os.getenv('DEMO_SANDBOX_MAX_SESSIONS', 200))
+    DEMO_SANDBOX_TTL = int(os.getenv('DEMO_SANDBOX_TTL', 1800))
+    DEMO_SANDBOX_SWEEP_INTERVAL = int(os.getenv('DEMO_SANDBOX_SWEEP_INTERVAL', 30))
+    # Segundos desde el último uso en los que un sandbox no se borra (puede tenerlo abierto otro worker)
+    DEMO_SANDBOX_LEASE = int(os.getenv('DEMO_SANDBOX_LEASE', 60))
+    # Sharding: URLs separadas por coma; users, subscriptions y refresh_tokens
+    # se reparten por hash del teléfono (vacío = todo en la base principal)
+    SHARD_DATABASE_URLS = [
+        url.strip() for url in os.getenv('SHARD_DATABASE_URLS', '').split(',') if url.strip()
+    ]
+    SHARD_POOL_SIZE = int(os.getenv('SHARD_POOL_SIZE', 5))
+    SHARD_POOL_MAX_OVERFLOW = int(os.getenv('SHARD_POOL_MAX_OVERFLOW', 5))
+    # Páginas por shard que el fan-out lee por adelantado
+    FANOUT_SHARD_PREFETCH = int(os.getenv('FANOUT_SHARD_PREFETCH', 2))
+    # Entrypoint ASGI (asgi.py): /api/async corre en el event loop del
+    # servidor sobre un engine asyncio con pool propio. Vacío = la principal
+    # con driver async (sqlite+aiosqlite, postgresql+asyncpg)
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+    ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', 10))
+    ASYNC_POOL_MAX_OVERFLOW = int(os.getenv('ASYNC_POOL_MAX_OVERFLOW', 10))
+    # Réplica de lectura: los GET leen de acá salvo que el cliente haya
+    # escrito hace menos de REPLICA_STICKY_SECONDS (read-your-writes)
+    REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+    REPLICA_POOL_SIZE = int(os.getenv('REPLICA_POOL_SIZE', 5))
+    REPLICA_POOL_MAX_OVERFLOW = int(os.getenv('REPLICA_POOL_MAX_OVERFLOW', 5))
+    REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+    # Perfil de SQLite (WAL, pragmas) para bases en archivo; opt-in
+    SQLITE_PROFILE_ENABLED = _env_bool('SQLITE_PROFILE_ENABLED')
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # ms
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # bytes
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -65536))  # negativo = KiB
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    # Headers X-DB-Queries y Server-Timing (queries, tiempo en la base y
+    # fases: jwt, validation, serialize); pensado para desarrollo y tests
+    REQUEST_METRICS_ENABLED = _env_bool('REQUEST_METRICS_ENABLED')
+    # /internal/metrics (Prometheus): latencia por endpoint, errores, pools,
+    # caches y hashing. Bajo gunicorn se agregan los workers vía PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED = _env_bool('METRICS_ENABLED', True)
+    # Cada cuántos segundos se refrescan los gauges de pools y caches
+    METRICS_POOL_INTERVAL = int(os.getenv('METRICS_POOL_INTERVAL', 5))
+    # Profiler de requests (cProfile): una fracción al azar o las que traigan
+    # un X-Profile-Token firmado con PROFILER_SECRET (`flask profiles token`)
+    PROFILER_ENABLED = _env_bool('PROFILER_ENABLED')
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0.0))
+    PROFILER_SECRET = os.getenv('PROFILER_SECRET')
+    PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(tempfile.gettempdir(), 'news_bot_profiles'))
+    PROFILER_MAX_FILES = int(os.getenv('PROFILER_MAX_FILES', 200))
+    # Access log JSON (una línea por request) por una cola y un thread
+    # escritor; con la cola sobre ACCESS_LOG_HIGH_WATER se descartan las
+    # líneas de requests exitosas. ACCESS_LOG_FILE "-" = stdout
+    ACCESS_LOG_ENABLED = _env_bool('ACCESS_LOG_ENABLED')
+    ACCESS_LOG_FILE = os.getenv('ACCESS_LOG_FILE', '-')
+    ACCESS_LOG_QUEUE_SIZE = int(os.getenv('ACCESS_LOG_QUEUE_SIZE', 10000))
+    ACCESS_LOG_BATCH_SIZE = int(os.getenv('ACCESS_LOG_BATCH_SIZE', 100))
+    ACCESS_LOG_HIGH_WATER = float(os.getenv('ACCESS_LOG_HIGH_WATER', 0.8))
+    # Cache-Control max-age de /apispec.json y la página de Swagger
+    DOCS_CACHE_MAX_AGE = int(os.getenv('DOCS_CACHE_MAX_AGE', 300))
+    # Segundos entre chequeos de versión del catálogo de categorías
+    CATEGORY_CATALOG_REFRESH = int(os.getenv('CATEGORY_CATALOG_REFRESH', 30))
+    # Cache por proceso de teléfono -> usuario (0 deshabilita)
+    USER_CACHE_MAXSIZE = int(os.getenv('USER_CACHE_MAXSIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+    # Política de hashing de contraseñas (ver app/auth/hashing.py). Los hashes
+    # con parámetros distintos se recalculan en el próximo login exitoso.
+    # El default es el de werkzeug (scrypt, N=32768)
+    PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'scrypt')
+    PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 32768))
+    # Procesos dedicados al hashing (0 = en el mismo thread de la request)
+    PASSWORD_HASH_POOL_SIZE = int(os.getenv('PASSWORD_HASH_POOL_SIZE', 0))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
 
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///news_bot1.db')
     DEBUG = bool(os.getenv('FLASK_DEBUG', False))
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options()
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///news_bot1.db')
+    DEBUG = False
+    ACCESS_LOG_ENABLED = _env_bool('ACCESS_LOG_ENABLED', True)
+    # Una conexión por thread de gunicorn y un margen chico de overflow
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(
+        pool_size=int(os.getenv('GUNICORN_THREADS', 4)),
+        max_overflow=2
+    )
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SERVICE_API_KEY = "test-service-key"
+    # Hashes baratos para que la suite no pase el tiempo hasheando
+    PASSWORD_HASH_ALGORITHM = 'pbkdf2:sha256'
+    PASSWORD_HASH_ITERATIONS = 1000
 class DemoConfig:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -22,10 +160,13 @@ class DemoConfig:
 class SwaggerConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_SWAGGER_URL', 'sqlite:///db_swagger1.db')
     DEBUG = True
+    DEMO_MODE_ENABLED = True
+    DEMO_SANDBOX_ENABLED = True
 
 
 config = {
     'development': DevelopmentConfig,
+    'production': ProductionConfig,
     'testing': TestingConfig,
     'swagger': SwaggerConfig,
     'default': DevelopmentConfig
@@ -0,0 +1,72 @@
+# gunicorn.conf.py
+# Configuración de gunicorn para producción. Todo se ajusta por variables
+# de entorno para usar la misma imagen en máquinas con distinta cantidad de cores.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+# Métricas de Prometheus compartidas entre workers (archivos mmap). Tiene
+# que estar en el entorno antes de importar la app
+if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'news_bot_metrics')
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8080')}")
+
+# Workers: por defecto (2 x cores) + 1 con threads; las vistas esperan a la
+# base y al pool de hashing la mayor parte del tiempo, así que gthread rinde
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# La app se importa una sola vez en el master y los workers la heredan por fork
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Las métricas de una corrida anterior no deben sumarse a las nuevas
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Las conexiones abiertas en el master (si las hubo) no se comparten entre procesos
+    from wsgi import app
+    from app.lifecycle import dispose_engines
+    dispose_engines(app, close=False)
+
+
+def post_worker_init(worker):
+    # Pools, catálogo y Swagger listos antes de aceptar la primera request
+    from wsgi import app
+    from app.lifecycle import warm_up
+    warm_up(app)
+    worker.log.info("Worker %s listo", worker.pid)
+
+
+def worker_exit(server, worker):
+    from wsgi import app
+    from app.lifecycle import shutdown
+    shutdown(app)
+
+
+def child_exit(server, worker):
+    # Saca de los gauges "livesum" al worker que terminó
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,29 @@
+"""indice fanout por categoria
+
+Revision ID: 5b2e9d7c1a40
+Revises: 0c4aaf2df3c2
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e9d7c1a40'
+down_revision = '0c4aaf2df3c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_subscriptions_category_id_id',
+        'subscriptions',
+        ['category', 'id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_subscriptions_category_id_id', table_name='subscriptions')
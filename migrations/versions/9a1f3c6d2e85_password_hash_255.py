@@ -0,0 +1,37 @@
+"""password_hash 255
+
+Revision ID: 9a1f3c6d2e85
+Revises: 5b2e9d7c1a40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1f3c6d2e85'
+down_revision = '5b2e9d7c1a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los hashes scrypt de werkzeug superan los 128 caracteres
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'password_hash',
+            existing_type=sa.String(length=128),
+            type_=sa.String(length=255),
+            existing_nullable=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'password_hash',
+            existing_type=sa.String(length=255),
+            type_=sa.String(length=128),
+            existing_nullable=False
+        )
@@ -0,0 +1,28 @@
+"""subscriptions version
+
+Revision ID: e7b4a2c9d1f3
+Revises: c3d8e1f4a6b2
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b4a2c9d1f3'
+down_revision = 'c3d8e1f4a6b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(
+            sa.Column('subscriptions_version', sa.Integer(), nullable=False, server_default='0')
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('subscriptions_version')
@@ -0,0 +1,77 @@
+"""catalogo de categorias
+
+Revision ID: f2a6c8e0b4d7
+Revises: e7b4a2c9d1f3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6c8e0b4d7'
+down_revision = 'e7b4a2c9d1f3'
+branch_labels = None
+depends_on = None
+
+# Mismo orden que seed_categories para que los ids coincidan entre entornos
+DEFAULT_CATEGORIES = ['cultura', 'deportes', 'economía', 'tecnología']
+
+
+def upgrade():
+    categories = op.create_table('categories',
+    sa.Column('id', sa.SmallInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.bulk_insert(categories, [{'name': name} for name in DEFAULT_CATEGORIES])
+
+    # Categorías que existan en suscripciones pero no en el catálogo inicial
+    op.execute(
+        "INSERT INTO categories (name) "
+        "SELECT DISTINCT category FROM subscriptions "
+        "WHERE category NOT IN (SELECT name FROM categories) "
+        "ORDER BY category"
+    )
+
+    with op.batch_alter_table('subscriptions') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.SmallInteger(), nullable=True))
+
+    op.execute(
+        "UPDATE subscriptions SET category_id = "
+        "(SELECT id FROM categories WHERE categories.name = subscriptions.category)"
+    )
+
+    with op.batch_alter_table('subscriptions') as batch_op:
+        batch_op.drop_index('ix_subscriptions_category_id_id')
+        batch_op.drop_constraint('unique_user_category', type_='unique')
+        batch_op.drop_column('category')
+        batch_op.alter_column('category_id', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_subscriptions_category_id_categories', 'categories', ['category_id'], ['id']
+        )
+        batch_op.create_unique_constraint('unique_user_category', ['user_id', 'category_id'])
+        batch_op.create_index('ix_subscriptions_category_id_id', ['category_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('subscriptions') as batch_op:
+        batch_op.add_column(sa.Column('category', sa.String(length=50), nullable=True))
+
+    op.execute(
+        "UPDATE subscriptions SET category = "
+        "(SELECT name FROM categories WHERE categories.id = subscriptions.category_id)"
+    )
+
+    with op.batch_alter_table('subscriptions') as batch_op:
+        batch_op.drop_index('ix_subscriptions_category_id_id')
+        batch_op.drop_constraint('unique_user_category', type_='unique')
+        batch_op.drop_constraint('fk_subscriptions_category_id_categories', type_='foreignkey')
+        batch_op.drop_column('category_id')
+        batch_op.alter_column('category', existing_type=sa.String(length=50), nullable=False)
+        batch_op.create_unique_constraint('unique_user_category', ['user_id', 'category'])
+        batch_op.create_index('ix_subscriptions_category_id_id', ['category', 'id'], unique=False)
+
+    op.drop_table('categories')
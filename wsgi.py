@@ -0,0 +1,7 @@
+# wsgi.py
+# Punto de entrada de producción: gunicorn -c gunicorn.conf.py
+import os
+
+from app import create_app
+
+app = create_app(os.getenv('APP_CONFIG', 'default'))